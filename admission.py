@@ -0,0 +1,141 @@
+"""
+Admission control and load shedding per resource class.
+
+Each ResourceLimiter bounds how many requests may use a resource at once and
+how many may wait for it. When the wait queue is full, or a queued request
+waits past its deadline, Overloaded is raised so the API can answer 503 with
+Retry-After immediately instead of piling up work nobody is waiting for.
+Queued requests whose client has hung up are cancelled with ClientDisconnected.
+"""
+
+import os # Limit configuration and CPU count
+import select # Non-blocking socket readability check
+import socket # MSG_PEEK for disconnect detection
+import threading # Condition variable guarding slot counts
+import time # Queue deadlines
+from contextlib import contextmanager # slot() context manager
+
+import metrics
+
+_POLL_INTERVAL = 0.1  # Seconds between disconnect checks while queued
+
+
+class Overloaded(Exception):
+    """The resource is saturated; the caller should retry after `retry_after` seconds."""
+    def __init__(self, resource, reason, retry_after):
+        super().__init__(f"{resource} is overloaded ({reason})")
+        self.resource = resource
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ClientDisconnected(Exception):
+    """The client went away while its request was still queued."""
+
+
+def client_disconnected(environ):
+    """
+    True if the request's client socket has been closed by the peer.
+    Needs the socket exposed by the server (gunicorn sets gunicorn.socket);
+    elsewhere this always returns False.
+    """
+    sock = environ.get('gunicorn.socket')
+    if sock is None:
+        return False
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+        if not readable:
+            return False
+        # Readable with zero bytes pending means the peer sent FIN
+        return sock.recv(1, socket.MSG_PEEK) == b''
+    except ValueError:
+        return False  # e.g. SSLSocket refuses MSG_PEEK: state unknown, assume connected
+    except OSError:
+        return True
+
+
+class ResourceLimiter:
+    """Bounded concurrency plus a bounded, deadline-limited wait queue for one resource class."""
+    def __init__(self, name, max_concurrency, max_queue, queue_timeout, retry_after=None):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after if retry_after is not None else max(1, int(round(queue_timeout)))
+        self._active = 0
+        self._waiting = 0
+        self._cond = threading.Condition()
+        self._active_gauge = metrics.ADMISSION_ACTIVE.labels(name)
+        self._queue_gauge = metrics.ADMISSION_QUEUE_DEPTH.labels(name)
+
+    def _reject(self, reason):
+        metrics.ADMISSION_REJECTED.labels(self.name, reason).inc()
+        return Overloaded(self.name, reason, self.retry_after)
+
+    @contextmanager
+    def slot(self, disconnected=None):
+        """
+        Holds one unit of this resource for the duration of the block.
+
+        Args:
+            disconnected: Optional zero-arg callable; when it returns True while
+                          queued, the wait is abandoned with ClientDisconnected.
+        """
+        with self._cond:
+            if self._active >= self.max_concurrency or self._waiting:
+                if self._waiting >= self.max_queue:
+                    raise self._reject("queue_full")
+                self._waiting += 1
+                self._queue_gauge.set(self._waiting)
+                deadline = time.monotonic() + self.queue_timeout
+                try:
+                    while self._active >= self.max_concurrency:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise self._reject("queue_timeout")
+                        self._cond.wait(min(remaining, _POLL_INTERVAL))
+                        if disconnected is not None and disconnected():
+                            metrics.ADMISSION_REJECTED.labels(self.name, "client_disconnected").inc()
+                            raise ClientDisconnected(self.name)
+                finally:
+                    self._waiting -= 1
+                    self._queue_gauge.set(self._waiting)
+            self._active += 1
+            self._active_gauge.set(self._active)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._active_gauge.set(self._active)
+                self._cond.notify()
+
+    def snapshot(self):
+        return {"active": self._active, "queued": self._waiting,
+                "max_concurrency": self.max_concurrency, "max_queue": self.max_queue}
+
+
+def _limiter_from_env(name, concurrency, queue, timeout):
+    prefix = f"ADMISSION_{name.upper()}_"
+    return ResourceLimiter(
+        name,
+        max_concurrency=int(os.environ.get(prefix + "CONCURRENCY", concurrency)),
+        max_queue=int(os.environ.get(prefix + "QUEUE", queue)),
+        queue_timeout=float(os.environ.get(prefix + "TIMEOUT_S", timeout)),
+    )
+
+
+_CPUS = os.cpu_count() or 1
+
+# Per-process limits; override with ADMISSION_<RESOURCE>_{CONCURRENCY,QUEUE,TIMEOUT_S}
+LIMITERS = {
+    "cpu_inference": _limiter_from_env("cpu_inference", max(2, _CPUS), 32, 10),
+    "pdf_parse": _limiter_from_env("pdf_parse", max(2, _CPUS), 16, 10),
+    "groq": _limiter_from_env("groq", 8, 32, 20),
+    "youtube": _limiter_from_env("youtube", 4, 16, 10),
+}
+
+
+def snapshot():
+    """Active and queued counts for every resource class."""
+    return {name: limiter.snapshot() for name, limiter in LIMITERS.items()}
@@ -3,13 +3,14 @@ Main Flask backend application handling API routes for resume processing,
 career analysis, chatbot interactions, and study plan generation.
 """
 
-from flask import Flask, request, jsonify, send_from_directory # Web framework and request handling
+from flask import Flask, request, jsonify, send_from_directory, send_file, abort, g, Response # Web framework and request handling
 from flask_cors import CORS # Cross-origin resource sharing support
 import fitz  # PDF parsing (PyMuPDF)
-from docx import Document # MS Word document parsing
 import os # OS-level directory and environment management
 import re # Regular expressions for text cleaning
 import json # JSON data serialization and parsing
+import time # Request latency timing
+import functools # Memoised chatbot prompt
 from werkzeug.utils import secure_filename # Secure file upload handling
 from groq import Groq # Interface for Groq AI models
 from dotenv import load_dotenv # Environment variable loader
@@ -22,12 +23,33 @@ print(f"DEBUG: Groq Key found: {os.getenv('GROQ_API_KEY')[:5] if os.getenv('GROQ
 print(f"DEBUG: YouTube Key found: {os.getenv('YOUTUBE_API_KEY')[:8] if os.getenv('YOUTUBE_API_KEY') else 'NOT SET – will use static fallback'}")
 
 # --- IMPORT YOUR TRAINED AI LOGIC ---
-from predictor import analyze_skill_gap, extract_skills_from_text, analyze_confused_paths, CAREER_METADATA, validate_domain_input
-from extract_data import extract_chatbot_context
+from predictor import extract_skill_ids, career_domains, current_predictor, validate_domain_input, predict_skills_for_title, model_version
+from extract_data import extract_resume_profile, chatbot_context_from_profile
 from study_plan import ResourceBroker
+from docx_text import extract_docx_text
+from resume_compaction import compact_resume
+import metrics
+import profiling
+import serving
+import hot_reload
+import memory_report
+import candidate_index
+import cohort_analytics
+import delta_analysis
+import static_assets
+import responses
+import session_store
+from cache import canonical_key, skill_set_key
+from shared_cache import TieredCache
+from singleflight import SingleFlight, FlightTimeout
+import admission
+from admission import Overloaded, ClientDisconnected
 
 app = Flask(__name__)
 CORS(app)
+# orjson-backed jsonify; gzip registered first so it runs after every other after_request hook
+app.json = responses.FastJSONProvider(app)
+app.after_request(responses.compress)
 
 UPLOAD_FOLDER = 'uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -35,18 +57,239 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 # --- GROQ CLIENT FOR CHATBOT ---
 GROQ_API_KEY = os.environ.get('GROQ_API_KEY', '')
 YOUTUBE_API_KEY = os.environ.get('YOUTUBE_API_KEY', '')
+# Optional endpoint override (e.g. the local stand-in from loadtest/fake_services.py)
+GROQ_BASE_URL = os.environ.get('GROQ_BASE_URL') or None
 groq_client = None
 if GROQ_API_KEY:
-    groq_client = Groq(api_key=GROQ_API_KEY)
+    groq_client = Groq(api_key=GROQ_API_KEY, base_url=GROQ_BASE_URL)
 
-# Use metadata from predictor instead of legacy JSON
-CAREER_DOMAINS_SUMMARY = ", ".join(CAREER_METADATA.keys())
+# --- ADMISSION CONTROL ---
+def admit(resource):
+    """Holds a slot of the given resource class; sheds load with Overloaded when saturated."""
+    return admission.LIMITERS[resource].slot(
+        disconnected=lambda: admission.client_disconnected(request.environ))
 
+# --- SINGLE-FLIGHT GROUPS ---
+# Identical concurrent requests (demos, cohort onboarding) share one computation.
+# The leader takes the admission slot; if it is shed or its client hangs up,
+# followers retry (one becomes the new leader) instead of inheriting that error.
+SINGLEFLIGHT_TIMEOUT = float(os.environ.get('SINGLEFLIGHT_TIMEOUT_S', '60'))
+_LEADER_ERRORS = (Overloaded, ClientDisconnected)
+analysis_flights = SingleFlight("analysis", timeout=SINGLEFLIGHT_TIMEOUT, retry_on=_LEADER_ERRORS)
+study_plan_flights = SingleFlight("study_plan", timeout=SINGLEFLIGHT_TIMEOUT, retry_on=_LEADER_ERRORS)
+context_flights = SingleFlight("chatbot_context", timeout=SINGLEFLIGHT_TIMEOUT, retry_on=_LEADER_ERRORS)
+
+# --- ANALYSIS RESULT CACHE ---
+# /api/analyze and /api/confused are pure functions of (skills, domain, model version).
+# Shared across workers and nodes when SHARED_CACHE_URL is set (see shared_cache.py).
+RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', '2048'))
+result_cache = TieredCache("analysis_results", maxsize=RESULT_CACHE_SIZE, flights=analysis_flights)
+_result_cache_version = None
+
+def cached_result(route, user_skills, domain, compute, on_payload=None, view=None, predictor=None):
+    """
+    Serves a cached analysis payload with an ETag, or computes and caches it.
+    Answers 304 when the client's If-None-Match already holds this result.
+    `on_payload` sees every payload actually sent (cached or fresh, not 304s).
+    `view` reshapes the cached payload for this caller (e.g. compact mode) and gets its own ETag.
+    `predictor` is the one the request read (default: the live one); the cache key uses its version.
+    """
+    global _result_cache_version
+    version = (predictor or current_predictor()).version
+    if version != _result_cache_version:
+        # New model or knowledge: every cached payload is stale (shared entries are keyed by version)
+        result_cache.clear_local()
+        _result_cache_version = version
+
+    key = canonical_key(route, skill_set_key(user_skills), domain, version)
+    etag = key[:32] + ('-' + view.__name__ if view else '')
+    # Weak comparison: gzipped responses carry the weak form of the ETag
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        def admitted_compute():
+            with admit('cpu_inference'):
+                return compute()
+        payload = result_cache.get_or_compute(key, admitted_compute)
+        if on_payload is not None:
+            on_payload(payload)
+        response = jsonify(view(payload) if view else payload)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def analysis_payload(analysis, handle):
+    """The /api/analyze response body for an analyze()-shaped result."""
+    return {
+        'score': round(float(analysis['score']), 2),
+        'status_text': analysis['status_text'],
+        'warning': analysis['warning'],
+        'master_msg': analysis['master_msg'],
+        'found_skills': analysis['found_skills'],
+        'missing_skills': analysis['missing_skills'],
+        'roadmap': analysis['roadmap'],
+        'missing_by_tier': analysis['missing_by_tier'],
+        'all_skills_by_tier': analysis.get('all_skills_by_tier', {}),
+        'alt_domain': analysis['alt_domain'],
+        'alt_missing_by_tier': analysis.get('alt_missing_by_tier', {}),
+        'description': analysis.get('description', ''),
+        'analysis_handle': handle,
+    }
+
+def cohort_recorder(data, domain, predictor):
+    """
+    on_payload hook counting one analysis in cohort analytics, or None when analytics is off.
+    The skill set is keyed by the payload's analysis handle (the skills that can affect it), so a
+    full analysis and a delta edit reaching the same skills land in the same row.
+    """
+    analytics = cohort_analytics.get_analytics()
+    if analytics is None:
+        return None
+    cohort = data.get('cohort') or request.headers.get('X-Cohort') or cohort_analytics.DEFAULT_COHORT
+    return lambda payload: analytics.record(cohort, domain, canonical_key('skills', payload['analysis_handle']),
+                                            payload, predictor.version)
+
+# Per-domain data that does not depend on the skills; compact responses reference /api/roadmaps instead
+ROADMAP_FIELDS = ('all_skills_by_tier', 'description')
+
+def compact_analysis(domain, predictor):
+    """View for compact /api/analyze responses: roadmap fields replaced by roadmap refs."""
+    def compact(payload):
+        catalog = predictor.roadmaps
+        body = {k: v for k, v in payload.items() if k not in ROADMAP_FIELDS}
+        body['domain'] = domain
+        body['roadmap_ref'] = catalog.ref(domain)
+        body['alt_roadmap_ref'] = catalog.ref(payload['alt_domain']) if payload['alt_domain'] else None
+        return body
+    return compact
+
+def compact_matches(predictor):
+    """View for compact /api/confused responses: each match references its roadmap."""
+    def compact(payload):
+        catalog = predictor.roadmaps
+        matches = [dict({k: v for k, v in m.items() if k not in ROADMAP_FIELDS}, roadmap_ref=catalog.ref(m['domain']))
+                   for m in payload['matches']]
+        return dict(payload, matches=matches)
+    return compact
+
+@metrics.timed("clean_text")
 def clean_text(text):
     """Sanitizes raw text by removing special characters and extra spaces."""
     text = text.replace('|', ' ').replace(':', ' ').replace('/', ' ')
     return re.sub(r'\s+', ' ', text).strip()
 
+# --- REQUEST METRICS ---
+
+@app.before_request
+def _start_request_metrics():
+    """Marks the request in flight and starts its latency timer."""
+    g.metrics_route = request.url_rule.rule if request.url_rule else 'unmatched'
+    g.metrics_start = time.perf_counter()
+    metrics.HTTP_IN_FLIGHT.labels(g.metrics_route).inc()
+
+@app.after_request
+def _count_request(response):
+    """Counts the finished request by route, method and status."""
+    route = g.get('metrics_route', 'unmatched')
+    metrics.HTTP_REQUESTS.labels(route, request.method, str(response.status_code)).inc()
+    return response
+
+@app.teardown_request
+def _finish_request_metrics(exc):
+    """Records latency and releases the in-flight slot, even when the view raised."""
+    route = g.pop('metrics_route', None)
+    if route is None:
+        return
+    metrics.HTTP_IN_FLIGHT.labels(route).dec()
+    metrics.HTTP_LATENCY.labels(route).observe(time.perf_counter() - g.pop('metrics_start'))
+
+# --- OPT-IN REQUEST PROFILING ---
+
+@app.before_request
+def _start_profile():
+    """Starts a profiler only for /api/* requests that opted in (admin header or PROFILE_API_REQUESTS)."""
+    mode = profiling.requested_mode(request.path, request.headers)
+    if mode:
+        g.profile = profiling.start(mode, g.metrics_route)
+
+@app.after_request
+def _finish_profile(response):
+    """Writes the profile and tells the caller which file it landed in."""
+    session = g.pop('profile', None)
+    if session is not None:
+        name = session.stop()
+        if name:
+            response.headers['X-Profile-File'] = name
+    return response
+
+@app.teardown_request
+def _abort_profile(exc):
+    """Releases the profiler if after_request never ran."""
+    session = g.pop('profile', None)
+    if session is not None:
+        session.stop()
+
+@app.errorhandler(Overloaded)
+def _overloaded(e):
+    """Fast rejection instead of unbounded queueing when a resource class is saturated."""
+    response = jsonify({'error': 'overloaded', 'resource': e.resource,
+                        'message': 'The server is busy. Please retry shortly.'})
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 503
+
+@app.errorhandler(ClientDisconnected)
+def _client_disconnected(e):
+    """The client left while queued; nobody will read this response."""
+    logging.info(f"[ADMISSION] Dropped queued request for {e} – client disconnected")
+    return '', 499
+
+@app.errorhandler(FlightTimeout)
+def _flight_timeout(e):
+    """A coalesced request waited too long on the identical in-flight one."""
+    return jsonify({'error': 'upstream_timeout', 'message': str(e)}), 504
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Exposes this worker's counters, gauges and histograms in Prometheus text format."""
+    return Response(metrics.render(), mimetype=metrics.CONTENT_TYPE)
+
+@app.route('/healthz')
+def healthz():
+    """Liveness probe: the process is up and serving HTTP."""
+    return jsonify({'status': 'ok'})
+
+@app.route('/readyz')
+def readyz():
+    """Readiness probe: 200 only once this worker's warmup pass has completed."""
+    status = serving.readiness()
+    status['load'] = admission.snapshot()
+    return jsonify(status), (200 if serving.is_ready() else 503)
+
+@app.route('/api/admin/reload', methods=['GET', 'POST'])
+def admin_reload():
+    """
+    POST: rebuild the predictor from the model directory in the background and swap it in.
+    GET: status of the last reload. Both require X-Admin-Token.
+    """
+    if not profiling.is_admin(request.headers.get('X-Admin-Token', '')):
+        return jsonify({'error': 'forbidden'}), 403
+    reloader = hot_reload.reloader
+    if request.method == 'GET':
+        return jsonify(reloader.status())
+    # Other workers follow through their artifact watchers (on by default under gunicorn.conf.py);
+    # GET reports only the worker that answers it
+    hot_reload.touch_trigger(reloader.model_path)
+    if not reloader.request('admin'):
+        return jsonify({'error': 'reload_in_progress', 'status': reloader.status()}), 409
+    return jsonify({'accepted': True, 'status': reloader.status()}), 202
+
+@app.route('/api/admin/memory')
+def admin_memory():
+    """This worker's resident/shared/private memory split by model, tokenizer, vocabulary and caches."""
+    if not profiling.is_admin(request.headers.get('X-Admin-Token', '')):
+        return jsonify({'error': 'forbidden'}), 403
+    return jsonify(memory_report.report(current_predictor()))
+
 # --- ROUTES ---
 
 @app.route('/api/upload', methods=['POST'])
@@ -61,32 +304,124 @@ def upload_resume():
     
     file_ext = filename.rsplit('.', 1)[1].lower()
     try:
-        if file_ext == 'pdf':
-            with fitz.open(path) as d:
-                text = "".join([page.get_text() for page in d])
-        else:
-            text = "\n".join([p.text for p in Document(path).paragraphs])
+        with admit('pdf_parse'):
+            if file_ext == 'pdf':
+                with metrics.stage("parse_pdf"), fitz.open(path) as d:
+                    text = "".join([page.get_text() for page in d])
+            else:
+                with metrics.stage("parse_docx"):
+                    text = extract_docx_text(path)
         
         # Use the logic from predictor.py to intelligently find skills in the text
-        clean_resume_text = clean_text(text)
-        skills = extract_skills_from_text(clean_resume_text)
+        with admit('cpu_inference'):
+            clean_resume_text = clean_text(text)
+            predictor = current_predictor()
+            skill_ids = extract_skill_ids(clean_resume_text, predictor)
+            skills = [predictor.ontology.name(i) for i in skill_ids]
         
-        # Extract chatbot context from resume using Groq
+        # Section-prioritized excerpt within RESUME_TOKEN_BUDGET, for the LLM and the chatbot
+        excerpt = compact_resume(text)
+
+        # One Groq call for the whole profile; its skills are merged in through the ontology
         chatbot_context = None
         if GROQ_API_KEY:
-            chatbot_context = extract_chatbot_context(text, GROQ_API_KEY)
+            def extract_profile():
+                with admit('groq'):
+                    try:
+                        return extract_resume_profile(excerpt, GROQ_API_KEY)
+                    except (Overloaded, ClientDisconnected):
+                        raise
+                    except Exception as e:
+                        print(f"[Resume Profile Extraction Error]: {e}")
+                        return {}
+            profile = context_flights.do(canonical_key('resume_profile', excerpt), extract_profile)
+            if profile:
+                skill_ids, other_skills = predictor.ontology.merge(skill_ids, profile.get('skills') or [])
+                skills = [predictor.ontology.name(i) for i in skill_ids]
+                chatbot_context = chatbot_context_from_profile(profile)
+                chatbot_context['skills'] = skills + other_skills
         
+        # Opt-in: remember this resume's skill set for recruiter search (skills only, no text)
+        index = candidate_index.get_index()
+        if index is not None:
+            index.add(candidate_index.content_hash(text), skills)
+
+        # Chat turns reference this session instead of re-sending the resume context
+        session = session_store.sessions.create({'skills': (chatbot_context or {}).get('skills') or skills,
+                                                 'chatbotContext': chatbot_context})
+
         os.remove(path)
         return jsonify({
             'success': True,
+            'sessionId': session.id,
             'skills': skills,
-            'resumeText': text[:3000],  # First 3000 chars for chatbot context
+            'skill_ids': skill_ids,  # Canonical ontology IDs, parallel to 'skills'
+            'resumeText': excerpt,  # Compacted resume for chatbot context
             'chatbotContext': chatbot_context
         })
     except Exception as e:
         if os.path.exists(path): os.remove(path)
+        if isinstance(e, (Overloaded, ClientDisconnected, FlightTimeout)):
+            raise
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/candidates/search', methods=['POST'])
+def search_candidates():
+    """
+    Finds stored resumes by skills. Body: {all, any, none, atLeast: {skills, k}, domain, limit}.
+    With a domain, results are ranked by tier-weighted coverage of that domain's skills.
+    """
+    if not profiling.is_admin(request.headers.get('X-Admin-Token', '')):
+        return jsonify({'error': 'forbidden'}), 403
+    index = candidate_index.get_index()
+    if index is None:
+        return jsonify({'error': 'candidate_index_disabled',
+                        'message': 'Set CANDIDATE_INDEX_PATH to store and search resumes.'}), 404
+
+    data = request.json or {}
+    at_least = data.get('atLeast')
+    if at_least:
+        at_least = (at_least.get('skills', []), int(at_least.get('k', 1)))
+
+    domain_tiers = None
+    domain = (data.get('domain') or '').strip()
+    if domain:
+        predictor = current_predictor()
+        validation = validate_domain_input(domain, predictor)
+        if not validation['valid']:
+            return jsonify({'error': 'domain_not_found', 'similarity': validation['score']}), 400
+        domain = validation['matched_domain']
+        domain_tiers = predictor.structured_data.get(domain, {})
+
+    with admit('cpu_inference'):
+        result = index.search(all_of=data.get('all', []), any_of=data.get('any', []),
+                              none_of=data.get('none', []), at_least=at_least,
+                              domain_tiers=domain_tiers, limit=data.get('limit', 50))
+    result['domain'] = domain or None
+    return jsonify(result)
+
+@app.route('/api/analytics/cohort')
+def cohort_report():
+    """
+    Cohort skill-gap analytics from the precomputed aggregates.
+    ?cohort=<id>[&domain=<domain>&top=10]: without a domain, per-domain totals.
+    """
+    if not profiling.is_admin(request.headers.get('X-Admin-Token', '')):
+        return jsonify({'error': 'forbidden'}), 403
+    analytics = cohort_analytics.get_analytics()
+    if analytics is None:
+        return jsonify({'error': 'cohort_analytics_disabled',
+                        'message': 'Set COHORT_ANALYTICS_PATH to record and query cohort analytics.'}), 404
+    cohort = request.args.get('cohort', cohort_analytics.DEFAULT_COHORT)
+    domain = request.args.get('domain', '').strip()
+    if not domain:
+        return jsonify(analytics.cohort_overview(cohort))
+    validation = validate_domain_input(domain)
+    if not validation['valid']:
+        return jsonify({'error': 'domain_not_found', 'similarity': validation['score']}), 400
+    top = max(1, min(request.args.get('top', 10, type=int), 100))
+    return jsonify(analytics.domain_report(cohort, validation['matched_domain'], top))
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze_career():
     """Performs detailed skill gap analysis between user skills and target domain."""
@@ -94,10 +429,12 @@ def analyze_career():
     # These are the skills returned by the upload route
     user_skills = data.get('skills', [])
     target_job = data.get('domain', '').strip()
+    # One predictor for the whole request, even if a hot reload swaps it meanwhile
+    predictor = current_predictor()
 
     # --- INPUT VALIDATION GUARDRAIL ---
     # Reject gibberish / unrecognised domains before touching the AI model.
-    validation = validate_domain_input(target_job)
+    validation = validate_domain_input(target_job, predictor)
     if not validation["valid"]:
         logging.warning(
             f"[VALIDATION REJECTED] Input: '{target_job}' "
@@ -123,119 +460,203 @@ def analyze_career():
     )
 
     # --- USE THE TRAINED AI ENGINE ---
-    analysis = analyze_skill_gap(user_skills, target_job, pre_validated_domain)
+    def compute():
+        analysis = predictor.analyze(user_skills, target_job, pre_validated_domain)
+        handle = delta_analysis.handle_for(predictor, user_skills, pre_validated_domain)
+        return analysis_payload(analysis, handle)
 
-    return jsonify({
-        'score': round(float(analysis['score']), 2),
-        'status_text': analysis['status_text'],
-        'warning': analysis['warning'],
-        'master_msg': analysis['master_msg'],
-        'found_skills': analysis['found_skills'],
-        'missing_skills': analysis['missing_skills'],
-        'roadmap': analysis['roadmap'],
-        'missing_by_tier': analysis['missing_by_tier'],
-        'all_skills_by_tier': analysis.get('all_skills_by_tier', {}),
-        'alt_domain': analysis['alt_domain'],
-        'alt_missing_by_tier': analysis.get('alt_missing_by_tier', {}),
-        'description': analysis.get('description', '')
-    })
+    # Opt-in cohort analytics: every analysis is counted, persisted off the request thread
+    record = cohort_recorder(data, pre_validated_domain, predictor)
+
+    # The chat session (if any) now targets the matched domain and the edited skill list
+    if data.get('sessionId'):
+        session_store.sessions.update_context(data['sessionId'], skills=user_skills, domain=pre_validated_domain)
+
+    view = compact_analysis(pre_validated_domain, predictor) if responses.wants_compact(data) else None
+    return cached_result('analyze', user_skills, pre_validated_domain, compute, on_payload=record, view=view,
+                         predictor=predictor)
+
+@app.route('/api/roadmaps', methods=['GET'])
+def roadmap_index():
+    """Refs of every current roadmap document."""
+    catalog = current_predictor().roadmaps
+    if request.if_none_match.contains_weak(catalog.version):
+        response = Response(status=304)
+    else:
+        response = jsonify({'version': catalog.version, 'roadmaps': catalog.index()})
+    response.set_etag(catalog.version)
+    response.headers['Cache-Control'] = 'public, no-cache'
+    return response
+
+@app.route('/api/roadmaps/<roadmap_id>/<version>', methods=['GET'])
+def roadmap_document(roadmap_id, version):
+    """One domain's roadmap; a given (id, version) never changes, so it is cached as immutable."""
+    catalog = current_predictor().roadmaps
+    document = catalog.document(roadmap_id, version)
+    if document is None:
+        current = catalog.document(roadmap_id, catalog.version)
+        return jsonify({'error': 'roadmap_not_found',
+                        'current': catalog.ref(current.domain) if current else None}), 404
+    gzipped = bool(request.accept_encodings['gzip'])
+    response = Response(document.gzip_body if gzipped else document.body, mimetype='application/json')
+    if gzipped:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    response.set_etag(document.etag + ('.gz' if gzipped else ''))
+    response.headers['Cache-Control'] = static_assets.IMMUTABLE_CACHE_CONTROL
+    return response.make_conditional(request)
+
+@app.route('/api/analyze/delta', methods=['POST'])
+def analyze_delta():
+    """
+    Re-analyses a previous /api/analyze result after skills were added/removed.
+    Body: {handle, add: [...], remove: [...], cohort?}. Returns {analysis_handle, patch}; 409 when
+    the handle is stale (new model/knowledge) and the client should re-post the full list.
+    With cohort analytics on, each edit is counted as an analysis.
+    """
+    data = request.json or {}
+    handle = data.get('handle', '')
+    predictor = current_predictor()
+    try:
+        with admit('cpu_inference'):
+            new_handle, old, new = delta_analysis.apply_delta(
+                predictor, handle, data.get('add', []), data.get('remove', []))
+        domain = delta_analysis.handle_domain(predictor, new_handle)
+    except delta_analysis.StaleHandle as e:
+        return jsonify({'error': 'stale_handle', 'message': str(e)}), 409
+    payload = analysis_payload(new, new_handle)
+    # Each edit is a new analysis for cohort analytics, like a full /api/analyze
+    record = cohort_recorder(data, domain, predictor)
+    if record is not None:
+        record(payload)
+    patch = delta_analysis.diff(analysis_payload(old, handle), payload)
+    return jsonify({'analysis_handle': new_handle, 'patch': patch})
 
 @app.route('/api/confused', methods=['POST'])
 def career_confused():
     """Suggests potential career paths based on existing skills match (>30%)."""
     data = request.json
     user_skills = data.get('skills', [])
-    
+    # One predictor for the whole request: cache key, matches and roadmap refs agree across a hot reload
+    predictor = current_predictor()
+
     # Analyze all paths > 30% match
-    from predictor import analyze_confused_paths
-    matches = analyze_confused_paths(user_skills)
-    
-    return jsonify({
-        'success': True,
-        'matches': matches
-    })
+    return cached_result('confused', user_skills, None,
+                         lambda: {'success': True, 'matches': predictor.analyze_confused(user_skills)},
+                         view=compact_matches(predictor) if responses.wants_compact(data) else None,
+                         predictor=predictor)
 
-@app.route('/api/chatbot', methods=['POST'])
-def chatbot():
-    """Manages AI career advisor conversation using Groq and resume context."""
-    if not groq_client:
-        return jsonify({'error': 'Groq API key not configured. Set GROQ_API_KEY in your .env file.'}), 500
-    
-    data = request.json
-    messages = data.get('messages', [])
-    resume_context = data.get('resumeContext', None)
-    
-    # Build the system instruction
-    system_parts = [
+@app.route('/api/title-skills', methods=['POST'])
+def title_skills():
+    """Returns the skills the model predicts for any free-text job title."""
+    data = request.json or {}
+    title = (data.get('title') or '').strip()
+    if not title:
+        return jsonify({'error': 'title is required'}), 400
+    return jsonify({'title': title, 'skills': predict_skills_for_title(title[:200])})
+
+CHATBOT_MODEL = "llama-3.3-70b-versatile"
+
+@functools.lru_cache(maxsize=4)
+def chatbot_base_prompt(version):
+    """The context-independent part of the advisor's system prompt, built once per model version."""
+    return "\n".join([
         "You are a warm, knowledgeable career advisor specializing in technology careers.",
         "Your tone is encouraging, direct, and practical — like a wise mentor who genuinely cares.",
         "Keep replies concise (3-5 sentences max unless the user asks for detail).",
         "Use bullet points for lists. Never use markdown headers or bold formatting.",
-        f"You have deep expertise in these career domains: {CAREER_DOMAINS_SUMMARY}.",
+        f"You have deep expertise in these career domains: {', '.join(career_domains())}.",
         "When giving advice, reference specific skills, tools, certifications, and realistic timelines.",
         "Always ask a follow-up question to keep the conversation going and understand the user better.",
-    ]
-    
-    if resume_context and resume_context.get('skills'):
-        skills_str = ", ".join(resume_context['skills'])
-        domain = resume_context.get('domain', 'technology')
-        
-        chatbot_ctx = resume_context.get('chatbotContext', {})
-        ctx_parts = []
-        if chatbot_ctx:
-            if chatbot_ctx.get('name'):
-                ctx_parts.append(f"Name: {chatbot_ctx['name']}")
-            if chatbot_ctx.get('current_status'):
-                ctx_parts.append(f"Status: {chatbot_ctx['current_status']}")
-            if chatbot_ctx.get('years_experience') is not None:
-                ctx_parts.append(f"Experience: {chatbot_ctx['years_experience']} years")
-            if chatbot_ctx.get('education'):
-                ctx_parts.append(f"Education: {', '.join(chatbot_ctx['education'])}")
-            if chatbot_ctx.get('career_interests'):
-                ctx_parts.append(f"Interests: {', '.join(chatbot_ctx['career_interests'])}")
-        
-        context_str = ". ".join(ctx_parts) if ctx_parts else ""
-        
-        system_parts.append(
+    ])
+
+def chatbot_system_prompt(skills_str, domain, context_str):
+    """Full system prompt from the session's precomputed resume fragments."""
+    if skills_str:
+        resume_part = (
             f"The user has uploaded a resume. Their extracted skills are: [{skills_str}]. "
-            f"Their target career domain is: {domain}. "
+            f"Their target career domain is: {domain or 'technology'}. "
             f"{('Additional context from their resume: ' + context_str + '. ') if context_str else ''}"
             "Use this context to personalize your advice. You already know their background — "
             "don't ask them to list their skills again. Instead, dive straight into career guidance."
         )
     else:
-        system_parts.append(
+        resume_part = (
             "The user has NOT uploaded a resume yet. Start by understanding their situation. "
             "Ask whether they are a student, working professional, or on a gap year. "
             "Then ask about their interests, experience level, and career goals before giving advice."
         )
+    return chatbot_base_prompt(model_version()) + "\n" + resume_part
+
+@app.route('/api/chatbot', methods=['POST'])
+def chatbot():
+    """
+    Manages AI career advisor conversation using Groq and resume context.
+
+    Session mode: {sessionId, message, historyLength} — the server holds the
+    resume context and history. historyLength is how many messages the client
+    held before `message`; a shorter count (the back button) truncates the
+    stored history. Answers 409 history_out_of_sync when the server cannot
+    follow (the client re-posts {sessionId, messages}) and 410 session_expired
+    for unknown sessions (the client re-posts the legacy body with startSession).
+    Legacy mode: {messages, resumeContext[, startSession]}.
+    """
+    if not groq_client:
+        return jsonify({'error': 'Groq API key not configured. Set GROQ_API_KEY in your .env file.'}), 500
     
-    system_instruction = "\n".join(system_parts)
+    data = request.json or {}
+    session_id = data.get('sessionId')
+    if session_id:
+        session = session_store.sessions.get(session_id)
+        if session is None:
+            return jsonify({'error': 'session_expired'}), 410
+        if 'messages' in data:
+            session.set_messages(data.get('messages') or [])
+        else:
+            if not session.truncate(data.get('historyLength', session.total)):
+                return jsonify({'error': 'history_out_of_sync', 'historyLength': session.total}), 409
+            message = str(data.get('message') or '').strip()
+            if message:
+                session.append('user', message)
+    else:
+        resume_context = data.get('resumeContext', None)
+        if data.get('startSession'):
+            session = session_store.sessions.create(resume_context, data.get('messages') or [])
+        else:
+            # Stateless: a throwaway session, never stored
+            session = session_store.ChatSession(None, *session_store.context_fragments(resume_context))
+            session.set_messages(data.get('messages', []))
     
     # Build contents for Groq
-    groq_messages = [{"role": "system", "content": system_instruction}]
-    for msg in messages:
-        role = 'user' if msg.get('role') == 'user' else 'assistant'
-        groq_messages.append({"role": role, "content": msg.get('text', '')})
+    groq_messages = [{"role": "system",
+                      "content": chatbot_system_prompt(session.skills, session.domain, session.context)}]
+    groq_messages.extend({"role": role, "content": text} for role, text in session.history)
     
     if len(groq_messages) <= 1:
         return jsonify({'reply': "I'd love to help! Could you tell me a bit more about yourself?"})
     
     try:
-        response = groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=groq_messages,
-            temperature=0.7,
-            max_tokens=500,
-        )
+        with admit('groq'), metrics.stage("groq_chatbot"):
+            response = groq_client.chat.completions.create(
+                model=CHATBOT_MODEL,
+                messages=groq_messages,
+                temperature=0.7,
+                max_tokens=500,
+            )
         reply = response.choices[0].message.content.strip()
-        return jsonify({'reply': reply})
+    except (Overloaded, ClientDisconnected):
+        raise
     except Exception as e:
         print(f"[CHATBOT ERROR]: {e}")
         error_str = str(e)
-        if '429' in error_str:
-            return jsonify({'reply': "I'm currently at my response limit. Please wait a moment and try again."}), 200
-        return jsonify({'error': f'Chatbot error: {error_str}'}), 500
+        if '429' not in error_str:
+            return jsonify({'error': f'Chatbot error: {error_str}'}), 500
+        reply = "I'm currently at my response limit. Please wait a moment and try again."
+    if session.id is None:
+        return jsonify({'reply': reply})
+    session.append('assistant', reply)
+    session_store.sessions.save(session)
+    return jsonify({'reply': reply, 'sessionId': session.id, 'historyLength': session.total})
 
 @app.route('/api/study-plan', methods=['POST'])
 def get_study_plan():
@@ -251,25 +672,59 @@ def get_study_plan():
         return jsonify({'success': True, 'weeks': [], 'skill_level': 'Beginner', 'message': 'No missing skills – you are ready!'})
 
     broker = ResourceBroker(youtube_api_key=YOUTUBE_API_KEY)
-    weeks  = broker.build_study_plan(missing_skills, score)
-    return jsonify({
+    # Week bucketing depends on skill order and the level derived from score
+    plan_key = canonical_key('study_plan', missing_skills, broker.get_skill_level(score))
+    def build():
+        with admit('youtube'):
+            return broker.build_study_plan(missing_skills, score)
+    weeks  = study_plan_flights.do(plan_key, build)
+    plan = {
         'success':     True,
         'weeks':       weeks,
         'skill_level': broker.get_skill_level(score),
-        'domain':      domain,
-        'description': description,
-        'found_skills': found_skills,
-        'missing_skills': missing_skills,
-        'score':       score,
-    })
+    }
+    if not responses.wants_compact(data):
+        # Full mode echoes the request back; compact clients already hold these
+        plan.update({
+            'domain':      domain,
+            'description': description,
+            'found_skills': found_skills,
+            'missing_skills': missing_skills,
+            'score':       score,
+        })
+    return jsonify(plan)
 
 # --- SERVE FRONTEND ---
+def send_built(path, encodings, cache_control):
+    """Sends a built asset in the best precompressed encoding the client accepts."""
+    encoding = static_assets.choose_encoding(request.accept_encodings, encodings)
+    response = send_file(static_assets.variant_path(path, encoding),
+                         mimetype=static_assets.content_type(path), conditional=True, etag=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = cache_control
+    return response
+
 @app.route('/')
 def index():
-    """Serves the main HTML frontend from the root directory."""
+    """Serves the main HTML frontend (the fingerprinted build when one is current)."""
+    built = static_assets.manifest()
+    if built:
+        return send_built(os.path.join(static_assets.STATIC_BUILD_DIR, 'index.html'),
+                          built['index']['encodings'], static_assets.INDEX_CACHE_CONTROL)
     # Serves your index.html directly from the root folder
     return send_from_directory('.', 'index.html')
 
+@app.route('/assets/<name>')
+def serve_asset(name):
+    """Content-hashed assets from static_assets.py; safe to cache forever."""
+    entry = static_assets.manifest().get('assets', {}).get(name)
+    if entry is None:
+        abort(404)
+    return send_built(os.path.join(static_assets.STATIC_BUILD_DIR, 'assets', name),
+                      entry['encodings'], static_assets.IMMUTABLE_CACHE_CONTROL)
+
 @app.route('/<path:path>')
 def serve_static(path):
     """Delivers static assets such as CSS, JS, and image files."""
@@ -277,5 +732,7 @@ def serve_static(path):
     return send_from_directory('.', path)
 
 if __name__ == '__main__':
+    # Development server only. For production use: gunicorn -c gunicorn.conf.py app:app
+    serving.warmup()
     # Using threaded=False to prevent the OMP Error on some Windows systems
     app.run(debug=True, port=5000, threaded=False)
\ No newline at end of file
@@ -0,0 +1,80 @@
+"""
+In-process caching primitives shared by the predictor and the API layer.
+"""
+
+import hashlib # Canonical key hashing
+import json # Canonical key encoding
+import threading # Guards the ordered dict across request threads
+import weakref # Registry of live caches for memory reporting
+from collections import OrderedDict # Recency ordering for LRU eviction
+
+import metrics
+
+_MISSING = object()
+_INSTANCES = weakref.WeakSet()
+
+
+class LRUCache:
+    """Thread-safe bounded mapping with least-recently-used eviction."""
+    def __init__(self, maxsize=1024, name=None):
+        """`name` labels hit/miss counts in cache_requests_total; None disables them."""
+        self.maxsize = maxsize
+        self.name = name
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        _INSTANCES.add(self)
+
+    def snapshot(self):
+        """Shallow copy of the current entries (oldest first)."""
+        with self._lock:
+            return list(self._data.items())
+
+    def get(self, key, default=None):
+        """Returns the cached value (marking it most recent) or `default`."""
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is not _MISSING:
+                self._data.move_to_end(key)
+        if self.name:
+            metrics.record_cache(self.name, value is not _MISSING)
+        return default if value is _MISSING else value
+
+    def put(self, key, value):
+        """Stores a value, evicting the least recently used entries beyond maxsize."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+
+def live_caches():
+    """Every LRUCache still referenced in this process."""
+    return list(_INSTANCES)
+
+
+def canonical_key(*parts):
+    """Stable sha256 hex digest of JSON-serialisable parts (dict keys sorted)."""
+    encoded = json.dumps(parts, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def skill_set_key(skills):
+    """Order- and case-insensitive form of a skill list, matching how analysis compares skills."""
+    return sorted({s.lower() for s in skills if isinstance(s, str)})
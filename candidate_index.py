@@ -0,0 +1,417 @@
+"""
+Opt-in candidate search over the skill sets of uploaded resumes.
+
+Each stored resume gets an integer id (its SQLite rowid, never reused) and is keyed by a
+content hash of its text, so re-uploading the same resume does not duplicate it.
+Only the extracted skills, never the resume text, are stored.
+
+The search structure is an inverted index of skill → bitmap, where bit i is set
+when resume i has the skill. The bitmaps are Python ints, so AND/OR/ANDNOT over
+10^6 resumes is one C-level pass over ~125 KB. "At least k of these skills" and
+tier-weighted ranking both use bit-sliced arithmetic: the per-resume counts or
+scores are held as a few bitmaps (one per binary digit) and updated with
+ripple-carry adds. Threshold tests and top-k selection are then a handful of
+bitmap operations, independent of how many resumes match.
+
+Enabled by setting CANDIDATE_INDEX_PATH (SQLite file). `python candidate_index.py
+--bench 1000000` times queries over synthetic data.
+"""
+
+import argparse # Benchmark CLI
+import hashlib # Resume content hashes
+import json # Skill lists in SQLite
+import logging # Load diagnostics
+import os # Environment configuration
+import random # Benchmark data
+import sqlite3 # Durable store
+import threading # Guards bitmaps and the connection
+import time # Query timings
+
+logger = logging.getLogger(__name__)
+
+CANDIDATE_INDEX_PATH = os.environ.get('CANDIDATE_INDEX_PATH', '') # '' disables the store
+CANDIDATE_SEARCH_MAX_LIMIT = int(os.environ.get('CANDIDATE_SEARCH_MAX_LIMIT', '200'))
+
+# Ranking weight of a domain skill by the tier it is listed under (highest tier wins)
+TIER_WEIGHTS = {"compulsory": 3, "advanced": 2, "intermediate": 2, "beginner": 1, "next_steps": 1}
+
+# AUTOINCREMENT: a deleted row's id is never handed out again, so other workers can tell
+# new rows (doc_id above what they have seen) from a reused id carrying someone else's skills
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumes (
+    doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content_hash TEXT NOT NULL UNIQUE,
+    skills TEXT NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+def content_hash(text):
+    """Whitespace- and case-insensitive sha256 of resume text."""
+    return hashlib.sha256(" ".join(text.lower().split()).encode('utf-8')).hexdigest()
+
+
+def _norm(skill):
+    return " ".join(skill.lower().split())
+
+
+# ---------------------------------------------------------------------------
+# Bitmap helpers (Python ints as bitsets)
+# ---------------------------------------------------------------------------
+
+def _bitmap_from_ids(ids):
+    """Builds a bitmap from many ids in one pass (setting bits one by one is quadratic)."""
+    ids = list(ids)
+    if not ids:
+        return 0
+    buf = bytearray(max(ids) // 8 + 1)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, 'little')
+
+
+def _ids(bitmap, limit=None):
+    """Positions of set bits, lowest first, stopping after `limit`."""
+    out = []
+    while bitmap and (limit is None or len(out) < limit):
+        low = bitmap & -bitmap
+        out.append(low.bit_length() - 1)
+        bitmap ^= low
+    return out
+
+
+def _add_weighted(slices, bitmap, weight):
+    """slices (LSB first) += weight for every resume in bitmap, via ripple-carry adds."""
+    shift = 0
+    while weight:
+        if weight & 1:
+            carry, i = bitmap, shift
+            while carry:
+                while i >= len(slices):  # Higher weights start past the current top slice
+                    slices.append(0)
+                slices[i], carry = slices[i] ^ carry, slices[i] & carry
+                i += 1
+        weight >>= 1
+        shift += 1
+
+
+def _at_least(slices, k, universe):
+    """Bitmap of resumes in `universe` whose bit-sliced value is >= k."""
+    if k <= 0:
+        return universe
+    gt, eq = 0, universe
+    for i in reversed(range(max(len(slices), k.bit_length()))):
+        s = slices[i] if i < len(slices) else 0
+        if (k >> i) & 1:
+            eq &= s
+        else:
+            gt |= eq & s
+    return gt | eq
+
+
+def _top_k(slices, candidates, k):
+    """
+    Top-k by bit-sliced value, descending the slices from the most significant bit.
+    Returns (chosen, ties): fewer than k candidates that strictly beat the cut-off,
+    and the candidates sharing the cut-off value (all of which would qualify).
+    """
+    if candidates.bit_count() <= k:
+        return candidates, 0
+    chosen, pending = 0, candidates
+    for s in reversed(slices):
+        hits = pending & s
+        n = (chosen | hits).bit_count()
+        if n > k:
+            pending = hits  # Enough above this digit: narrow to them
+        else:
+            chosen |= hits
+            pending &= ~s
+            if n == k:
+                return chosen, 0
+    return chosen, pending
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+class CandidateIndex:
+    """
+    SQLite-backed resume skill store with an in-memory bitmap inverted index.
+
+    Every gunicorn worker keeps its own bitmaps over the shared SQLite file and
+    catches up on other workers' commits (PRAGMA data_version) before a query.
+    Replacing a resume's skills inserts a new row, so catching up is normally an
+    append; deletions elsewhere trigger a full rebuild.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+        self._postings = {}    # normalised skill → bitmap
+        self._alive = 0
+        self._max_id = 0
+        self._data_version = None
+        self._load()
+
+    def _migrate(self):
+        """Creates the table, rebuilding files made before doc ids were AUTOINCREMENT."""
+        with self._db:
+            self._db.execute("BEGIN IMMEDIATE")  # One worker migrates; the others then see the new table
+            row = self._db.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'resumes'").fetchone()
+            if row and 'AUTOINCREMENT' not in row[0].upper():
+                self._db.execute("ALTER TABLE resumes RENAME TO resumes_old")
+                self._db.execute(_SCHEMA)
+                self._db.execute("INSERT INTO resumes SELECT doc_id, content_hash, skills, updated_at FROM resumes_old")
+                self._db.execute("DROP TABLE resumes_old")
+            else:
+                self._db.execute(_SCHEMA)
+
+    def _load(self):
+        start = time.perf_counter()
+        self._postings, self._alive, self._max_id = {}, 0, 0
+        self._data_version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        self._index_rows(self._db.execute("SELECT doc_id, skills FROM resumes"))
+        logger.info("[CANDIDATES] Loaded %d resumes / %d skills from %s in %.2fs",
+                    len(self), len(self._postings), self.path, time.perf_counter() - start)
+
+    def _index_rows(self, rows):
+        ids_by_skill, alive = {}, []
+        for doc_id, skills in rows:
+            alive.append(doc_id)
+            for skill in json.loads(skills):
+                ids_by_skill.setdefault(_norm(skill), []).append(doc_id)
+        for key, ids in ids_by_skill.items():
+            self._postings[key] = self._postings.get(key, 0) | _bitmap_from_ids(ids)
+        self._alive |= _bitmap_from_ids(alive)
+        if alive:
+            self._max_id = max(self._max_id, max(alive))
+
+    def _sync(self):
+        """
+        Catches up on commits made through other connections (other workers). Caller holds _lock.
+        Rows above _max_id are appended; if the row count then disagrees, something was deleted
+        or replaced elsewhere and the bitmaps are rebuilt from the table.
+        """
+        version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return
+        self._data_version = version
+        self._index_rows(self._db.execute("SELECT doc_id, skills FROM resumes WHERE doc_id > ?",
+                                          (self._max_id,)))
+        if self._db.execute("SELECT COUNT(*) FROM resumes").fetchone()[0] != len(self):
+            self._load()  # Something was deleted or replaced elsewhere
+
+    def __len__(self):
+        return self._alive.bit_count()
+
+    # --- writes -------------------------------------------------------------
+
+    def add(self, text_hash, skills):
+        """Stores (or replaces) the skill set for a resume; returns its doc id."""
+        skills = sorted(dict.fromkeys(skills))
+        encoded = json.dumps(skills)
+        with self._lock:
+            self._sync()
+            row = self._db.execute("SELECT doc_id, skills FROM resumes WHERE content_hash = ?",
+                                   (text_hash,)).fetchone()
+            if row and row[1] == encoded:
+                return row[0]
+            if row:
+                self._db.execute("DELETE FROM resumes WHERE doc_id = ?", (row[0],))
+                self._clear(row[0], json.loads(row[1]))
+            doc_id = self._db.execute(
+                "INSERT INTO resumes (content_hash, skills, updated_at) VALUES (?, ?, ?)",
+                (text_hash, encoded, time.time())).lastrowid
+            self._db.commit()
+            self._index_rows([(doc_id, encoded)])
+        return doc_id
+
+    def remove(self, text_hash):
+        """Forgets a resume; returns False if it was not stored."""
+        with self._lock:
+            self._sync()
+            row = self._db.execute("SELECT doc_id, skills FROM resumes WHERE content_hash = ?",
+                                   (text_hash,)).fetchone()
+            if not row:
+                return False
+            self._db.execute("DELETE FROM resumes WHERE doc_id = ?", (row[0],))
+            self._db.commit()
+            self._clear(row[0], json.loads(row[1]))
+        return True
+
+    def _clear(self, doc_id, skills):
+        mask = ~(1 << doc_id)
+        for skill in skills:
+            key = _norm(skill)
+            if key in self._postings:
+                self._postings[key] &= mask
+        self._alive &= mask
+
+    # --- queries ------------------------------------------------------------
+
+    def _posting(self, skill):
+        return self._postings.get(_norm(skill), 0)
+
+    def search(self, all_of=(), any_of=(), none_of=(), at_least=None, domain_tiers=None, limit=50):
+        """
+        Boolean / threshold search ranked by weighted skill coverage.
+
+        Args:
+            all_of: every one of these skills is required.
+            any_of: at least one of these skills is required.
+            none_of: none of these skills may be present.
+            at_least: (skills, k) — at least k of these skills are required.
+            domain_tiers: a structured_data entry ({tier: [skills]}); when given,
+                results are ranked by TIER_WEIGHTS-weighted coverage of its skills,
+                otherwise by how many of the query's positive skills they have.
+            limit: maximum results returned (total is always reported).
+        """
+        start = time.perf_counter()
+        limit = max(1, min(int(limit), CANDIDATE_SEARCH_MAX_LIMIT))
+        with self._lock:
+            self._sync()
+            candidates = self._alive
+            for skill in all_of:
+                candidates &= self._posting(skill)
+            if any_of:
+                union = 0
+                for skill in any_of:
+                    union |= self._posting(skill)
+                candidates &= union
+            for skill in none_of:
+                candidates &= ~self._posting(skill)
+            if at_least:
+                skills, k = at_least
+                counts = []
+                for skill in dict.fromkeys(skills):
+                    _add_weighted(counts, self._posting(skill) & candidates, 1)
+                candidates = _at_least(counts, int(k), candidates)
+
+            weights = self._ranking_weights(all_of, any_of, at_least, domain_tiers)
+            scores = []
+            for key, weight in weights.items():
+                _add_weighted(scores, self._postings.get(key, 0) & candidates, weight)
+            total = candidates.bit_count()
+            chosen, ties = _top_k(scores, candidates, limit)
+            doc_ids = _ids(chosen)
+            doc_ids += _ids(ties, limit=limit - len(doc_ids))  # Ties at the cut-off: lowest ids first
+
+        results = self._hydrate(doc_ids, weights)
+        return {
+            "total": total,
+            "results": results,
+            "max_score": sum(weights.values()),
+            "took_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+
+    @staticmethod
+    def _ranking_weights(all_of, any_of, at_least, domain_tiers):
+        weights = {}
+        if domain_tiers:
+            for tier, weight in TIER_WEIGHTS.items():
+                for skill in domain_tiers.get(tier, []):
+                    key = _norm(skill)
+                    weights[key] = max(weights.get(key, 0), weight)
+        else:
+            positive = list(all_of) + list(any_of) + list(at_least[0] if at_least else [])
+            weights = {_norm(s): 1 for s in positive}
+        return weights
+
+    def _hydrate(self, doc_ids, weights):
+        if not doc_ids:
+            return []
+        placeholders = ",".join("?" * len(doc_ids))
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT doc_id, content_hash, skills FROM resumes WHERE doc_id IN ({placeholders})",
+                doc_ids).fetchall()
+        total_weight = sum(weights.values()) or 1
+        results = []
+        for doc_id, text_hash, skills in rows:
+            skills = json.loads(skills)
+            matched = [s for s in skills if _norm(s) in weights]
+            score = sum(weights[_norm(s)] for s in matched)
+            results.append({
+                "id": doc_id,
+                "contentHash": text_hash,
+                "score": score,
+                "coverage": round(score / total_weight, 4),
+                "matchedSkills": matched,
+                "skillCount": len(skills),
+            })
+        results.sort(key=lambda r: (-r["score"], r["id"]))
+        return results
+
+    # --- bulk load (benchmarks / backfills) --------------------------------
+
+    def bulk_load(self, skill_sets):
+        """Inserts many (content_hash, skills) pairs and rebuilds the bitmaps once."""
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO resumes (content_hash, skills, updated_at) VALUES (?, ?, ?)",
+                ((h, json.dumps(sorted(set(s))), now) for h, s in skill_sets))
+            self._db.commit()
+            self._load()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """The process-wide index, or None when CANDIDATE_INDEX_PATH is unset."""
+    global _index
+    if not CANDIDATE_INDEX_PATH:
+        return None
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = CandidateIndex(CANDIDATE_INDEX_PATH)
+    return _index
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def _bench(n, vocab_size, skills_per_resume, queries):
+    rng = random.Random(7)
+    vocab = [f"skill-{i}" for i in range(vocab_size)]
+    # Zipf-ish popularity so some skills are common and most are rare
+    popularity = [1.0 / (i + 1) ** 0.8 for i in range(vocab_size)]
+    index = CandidateIndex(":memory:")
+    t = time.perf_counter()
+    index.bulk_load((f"h{i}", rng.choices(vocab, popularity, k=skills_per_resume)) for i in range(n))
+    print(f"loaded {len(index)} resumes in {time.perf_counter() - t:.1f}s")
+
+    tiers = {"compulsory": vocab[:5], "intermediate": vocab[5:15], "advanced": vocab[15:25], "beginner": vocab[25:30]}
+    cases = {
+        "all_of(3)": dict(all_of=vocab[:3]),
+        "any_of(5) & none_of(1)": dict(any_of=vocab[10:15], none_of=vocab[:1]),
+        "at_least 3 of 8": dict(at_least=(vocab[:8], 3)),
+        "at_least 2 of 6, ranked by domain": dict(at_least=(vocab[:6], 2), domain_tiers=tiers),
+        "rank everyone by domain": dict(domain_tiers=tiers),
+    }
+    for name, kwargs in cases.items():
+        timings = []
+        for _ in range(queries):
+            out = index.search(limit=20, **kwargs)
+            timings.append(out["took_ms"])
+        timings.sort()
+        print(f"{name:36s} total={out['total']:>8d}  p50={timings[len(timings) // 2]:.2f}ms  "
+              f"max={timings[-1]:.2f}ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Candidate index benchmark over synthetic resumes")
+    parser.add_argument('--bench', type=int, default=100000, help="Number of synthetic resumes")
+    parser.add_argument('--vocab', type=int, default=600)
+    parser.add_argument('--skills-per-resume', type=int, default=15)
+    parser.add_argument('--queries', type=int, default=20)
+    args = parser.parse_args()
+    _bench(args.bench, args.vocab, args.skills_per_resume, args.queries)
@@ -0,0 +1,237 @@
+"""
+Cohort skill-gap analytics backed by an embedded SQLite store.
+
+Every /api/analyze result and /api/analyze/delta edit counts once. Results
+are stored per (cohort, domain, skill set, model version) with a count, so
+users sharing a skill set are all counted and a new model's scores land in
+new rows. The same transaction bumps
+the running aggregates: analyses and score sums per domain, a 10-point score
+histogram, and missing-skill counts per domain and tier. Cohort queries then
+read only those aggregate rows through their primary keys / covering index, so
+their cost does not grow with the number of stored analyses.
+
+A per-process writer thread drains a queue, so the request thread only
+enqueues and many arrivals share one transaction. Enabled by setting
+COHORT_ANALYTICS_PATH.
+"""
+
+import json # missing_by_tier persistence
+import logging # Write diagnostics
+import os # Environment configuration
+import queue # Writer queue
+import sqlite3 # Embedded store
+import threading # Connection guard and writer thread
+import time # Timestamps
+from concurrent.futures import Future # record() results
+
+logger = logging.getLogger(__name__)
+
+COHORT_ANALYTICS_PATH = os.environ.get('COHORT_ANALYTICS_PATH', '') # '' disables analytics
+DEFAULT_COHORT = 'default'
+
+TIERS = ("beginner", "compulsory", "intermediate", "advanced", "next_steps")
+HISTOGRAM_BUCKETS = 10 # 0-10, 10-20, …, 90-100
+WRITE_BATCH_SIZE = 256 # Analyses per transaction at most
+WRITE_WAIT_S = 0.05 # How long the writer waits for more analyses after the first
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS skill_set_analyses (
+    id INTEGER PRIMARY KEY,
+    cohort TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    skills_key TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    score REAL NOT NULL,
+    missing_by_tier TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    UNIQUE (cohort, domain, skills_key, model_version)
+);
+CREATE INDEX IF NOT EXISTS skill_set_analyses_by_cohort ON skill_set_analyses (cohort, domain, last_seen);
+
+CREATE TABLE IF NOT EXISTS cohort_domain_totals (
+    cohort TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    analyses INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    PRIMARY KEY (cohort, domain)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS cohort_score_histogram (
+    cohort TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (cohort, domain, bucket)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS cohort_missing_counts (
+    cohort TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    tier TEXT NOT NULL,
+    skill TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (cohort, domain, tier, skill)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cohort_missing_top ON cohort_missing_counts (cohort, domain, tier, count DESC, skill);
+"""
+
+
+def _bucket(score):
+    return min(max(int(score // (100 / HISTOGRAM_BUCKETS)), 0), HISTOGRAM_BUCKETS - 1)
+
+
+class CohortAnalytics:
+    """
+    Persists analyses and maintains their per-cohort aggregates incrementally. The
+    connection and writer thread are created lazily per process (gunicorn forks
+    after preloading the app; neither survives a fork).
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = None
+        self._pid = None
+        self._queue_lock = threading.Lock()
+        self._queue = None
+        self._writer_pid = None
+
+    def _conn(self):
+        """This process's connection (call with the lock held)."""
+        if self._pid != os.getpid():
+            self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+            self._db.commit()
+            self._pid = os.getpid()
+        return self._db
+
+    def record(self, cohort, domain, skills_key, result, model_version=None):
+        """Queues one analysis for persistence; returns a Future resolving to True if its skill set was new."""
+        entry = (cohort or DEFAULT_COHORT, domain, skills_key, float(result.get('score', 0.0)),
+                 {tier: list(result.get('missing_by_tier', {}).get(tier, [])) for tier in TIERS},
+                 model_version or '')
+        future = Future()
+        with self._queue_lock:
+            if self._writer_pid != os.getpid():
+                self._queue = queue.SimpleQueue()
+                threading.Thread(target=self._run, args=(self._queue,), name="cohort-analytics-writer",
+                                 daemon=True).start()
+                self._writer_pid = os.getpid()
+            self._queue.put((entry, future))
+        return future
+
+    def _run(self, q):
+        while True:
+            batch = [q.get()]
+            deadline = time.monotonic() + WRITE_WAIT_S
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(q.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                results = self._write_batch([entry for entry, _ in batch])
+            except Exception as e:
+                logger.warning("[COHORT] Failed to persist %d analyses: %s", len(batch), e)
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _write_batch(self, entries):
+        inserted = []
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            with db:
+                for cohort, domain, skills_key, score, missing, version in entries:
+                    inserted.append(self._write_one(db, now, cohort, domain, skills_key, score, missing, version))
+        return inserted
+
+    @staticmethod
+    def _write_one(db, now, cohort, domain, skills_key, score, missing, version):
+        # One row per skill set and model version; repeats bump its count and refresh the result
+        cur = db.execute(
+            "UPDATE skill_set_analyses SET count = count + 1, score = ?, missing_by_tier = ?, last_seen = ? "
+            "WHERE cohort = ? AND domain = ? AND skills_key = ? AND model_version = ?",
+            (score, json.dumps(missing), now, cohort, domain, skills_key, version))
+        new = not cur.rowcount
+        if new:
+            db.execute(
+                "INSERT INTO skill_set_analyses (cohort, domain, skills_key, model_version, score, "
+                "missing_by_tier, count, created_at, last_seen) VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?)",
+                (cohort, domain, skills_key, version, score, json.dumps(missing), now, now))
+        db.execute(
+            "INSERT INTO cohort_domain_totals VALUES (?, ?, 1, ?) ON CONFLICT (cohort, domain) "
+            "DO UPDATE SET analyses = analyses + 1, score_sum = score_sum + excluded.score_sum",
+            (cohort, domain, score))
+        db.execute(
+            "INSERT INTO cohort_score_histogram VALUES (?, ?, ?, 1) ON CONFLICT (cohort, domain, bucket) "
+            "DO UPDATE SET count = count + 1",
+            (cohort, domain, _bucket(score)))
+        db.executemany(
+            "INSERT INTO cohort_missing_counts VALUES (?, ?, ?, ?, 1) "
+            "ON CONFLICT (cohort, domain, tier, skill) DO UPDATE SET count = count + 1",
+            [(cohort, domain, tier, skill) for tier, skills in missing.items()
+             for skill in dict.fromkeys(skills)])
+        return new
+
+    def domain_report(self, cohort, domain, top=10):
+        """Totals, score histogram and the `top` most common missing skills per tier."""
+        with self._lock:
+            db = self._conn()
+            totals = db.execute(
+                "SELECT analyses, score_sum FROM cohort_domain_totals WHERE cohort = ? AND domain = ?",
+                (cohort, domain)).fetchone()
+            histogram = [0] * HISTOGRAM_BUCKETS
+            for bucket, count in db.execute(
+                    "SELECT bucket, count FROM cohort_score_histogram WHERE cohort = ? AND domain = ?",
+                    (cohort, domain)):
+                histogram[bucket] = count
+            missing = {}
+            for tier in TIERS:
+                missing[tier] = [{"skill": skill, "count": count} for skill, count in db.execute(
+                    "SELECT skill, count FROM cohort_missing_counts WHERE cohort = ? AND domain = ? AND tier = ? "
+                    "ORDER BY count DESC, skill LIMIT ?", (cohort, domain, tier, top))]
+        analyses, score_sum = totals or (0, 0.0)
+        return {
+            "cohort": cohort,
+            "domain": domain,
+            "analyses": analyses,
+            "mean_score": round(score_sum / analyses, 2) if analyses else None,
+            "score_histogram": [{"from": i * 100 // HISTOGRAM_BUCKETS, "to": (i + 1) * 100 // HISTOGRAM_BUCKETS,
+                                 "count": c} for i, c in enumerate(histogram)],
+            "top_missing_by_tier": missing,
+        }
+
+    def cohort_overview(self, cohort):
+        """Analyses and mean score for every domain the cohort has targeted."""
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT domain, analyses, score_sum FROM cohort_domain_totals WHERE cohort = ? "
+                "ORDER BY analyses DESC, domain", (cohort,)).fetchall()
+        return {
+            "cohort": cohort,
+            "domains": [{"domain": d, "analyses": n, "mean_score": round(s / n, 2) if n else None}
+                        for d, n, s in rows],
+        }
+
+
+_analytics = None
+_analytics_lock = threading.Lock()
+
+
+def get_analytics():
+    """The process-wide analytics store, or None when COHORT_ANALYTICS_PATH is unset."""
+    global _analytics
+    if not COHORT_ANALYTICS_PATH:
+        return None
+    if _analytics is None:
+        with _analytics_lock:
+            if _analytics is None:
+                _analytics = CohortAnalytics(COHORT_ANALYTICS_PATH)
+    return _analytics
@@ -0,0 +1,239 @@
+"""
+Incremental skill-gap re-analysis for interactive skill editing.
+
+/api/analyze returns an `analysis_handle`. It is a compact, self-contained
+encoding of the analysed skill set: a bitmap over the skills that can affect
+any analysis, plus the target domain and the model/knowledge version. Any
+worker can resume from it, not just the one that issued it.
+POST /api/analyze/delta takes a handle plus added/removed skills. It updates
+the per-domain match counts only for the domains that list a changed skill,
+rebuilds the target's tier lists, re-ranks the alternatives, and answers with
+a new handle and a patch against the previous payload:
+
+  {"set":    {field: new value, ...},
+   "splice": {"found_skills": [[start, delete_count, [items]], ...],
+              "missing_by_tier.beginner": [...], ...}}
+
+Splices are listed from the highest start down, so applying them in order
+with Array.prototype.splice reproduces the full /api/analyze payload.
+"""
+
+import base64 # Handle encoding
+import difflib # List patches
+import os # Environment configuration
+import threading # Requirements rebuild guard
+from collections import Counter # Per-skill domain multiplicities
+
+import metrics
+from cache import LRUCache
+
+DELTA_STATE_CACHE_SIZE = int(os.environ.get('DELTA_STATE_CACHE_SIZE', '2048'))
+
+TIERS = ("beginner", "compulsory", "intermediate", "advanced", "next_steps")
+ALT_MIN_SCORE = 30 # Same cut-off as CareerPredictor.analyze_confused
+
+
+class StaleHandle(ValueError):
+    """Handle is malformed or was issued for another model/knowledge version."""
+
+
+class _Requirements:
+    """Static per-predictor data: required skills per domain and the handle vocabulary."""
+    def __init__(self, predictor):
+        self.predictor = predictor
+        self.version = predictor.version
+        self.ontology = predictor.ontology
+        self.domains = list(predictor.structured_data.keys())
+        self.target_names = list(predictor.career_metadata.keys())
+        self.required = {d: predictor._required_with_fallback(d, p)
+                         for d, p in zip(self.domains, predictor.predict_titles(self.domains))}
+        self._extra = {}
+        self._lock = threading.Lock()
+        self._index()
+
+    def _index(self):
+        self.domains_by_skill = {}
+        for domain, required in self.required.items():
+            for skill, count in Counter(self.ontology.key(s) for s in required).items():
+                self.domains_by_skill.setdefault(skill, []).append((domain, count))
+        # Skills are canonical ontology keys. Required skills come from the model vocabulary or the
+        # tier lists; anything else can never change an analysis, so handles drop it. Fixed per
+        # predictor, so bit positions are stable.
+        vocab = {self.ontology.key(s) for s in self.predictor.all_skills}
+        for job_info in self.predictor.structured_data.values():
+            for tier in TIERS:
+                vocab.update(self.ontology.key(s) for s in job_info.get(tier, []))
+        self.vocab = sorted(vocab)
+        self.vocab_index = {s: i for i, s in enumerate(self.vocab)}
+
+    def required_for(self, domain):
+        """Required skills for a target; targets outside structured_data are predicted on first use."""
+        required = self.required.get(domain)
+        if required is None:
+            with self._lock:
+                required = self._extra.get(domain)
+                if required is None:
+                    required = self._extra[domain] = self.predictor.get_model_required_skills(domain)
+        return required
+
+    def encode(self, domain, skills):
+        bits = 0
+        for s in skills:
+            bits |= 1 << self.vocab_index[s]
+        raw = bits.to_bytes((len(self.vocab) + 7) // 8, 'little')
+        packed = base64.urlsafe_b64encode(raw).decode().rstrip('=')
+        return f"{self.version}.{self.target_names.index(domain)}.{packed}"
+
+    def decode(self, handle):
+        try:
+            version, domain_idx, packed = handle.split('.')
+            if version != self.version:
+                raise StaleHandle("handle was issued for another model version")
+            domain = self.target_names[int(domain_idx)]
+            bits = int.from_bytes(base64.urlsafe_b64decode(packed + '=' * (-len(packed) % 4)), 'little')
+        except (ValueError, IndexError, AttributeError) as e:
+            raise StaleHandle(str(e)) from e
+        if bits >> len(self.vocab):
+            raise StaleHandle("handle has bits outside the vocabulary")
+        return domain, frozenset(s for i, s in enumerate(self.vocab) if bits >> i & 1)
+
+    def found_counts(self, skills):
+        counts = dict.fromkeys(self.domains, 0)
+        for skill in skills:
+            for domain, n in self.domains_by_skill.get(skill, ()):
+                counts[domain] = counts.get(domain, 0) + n
+        return counts
+
+
+_requirements = None
+_requirements_lock = threading.Lock()
+_states = LRUCache(maxsize=DELTA_STATE_CACHE_SIZE, name="delta_states")
+
+
+def _requirements_for(predictor):
+    global _requirements
+    req = _requirements
+    if req is None or req.predictor is not predictor:
+        with _requirements_lock:
+            req = _requirements
+            if req is None or req.predictor is not predictor:
+                req = _requirements = _Requirements(predictor)
+                _states.clear()
+    return req
+
+
+def _analysis(req, domain, skills, counts):
+    """Same fields and values as CareerPredictor.analyze() for this skill set."""
+    structured = req.predictor.structured_data
+    key = req.ontology.key
+    required = req.required_for(domain)
+    found = [s for s in required if key(s) in skills]
+    missing = [s for s in required if key(s) not in skills]
+    score = (len(found) / len(required) * 100) if required else 0
+
+    warning = master_msg = ""
+    if score < 30:
+        warning = "you should work on yours skills"
+    elif score >= 80:
+        next_step = structured.get(domain, {}).get('next_steps', ["Industry Leadership"])[0]
+        master_msg = f"You are a master in this field. Plan on taking the next step to the \"{next_step}\" mentioned for the input job title."
+
+    job_info = structured.get(domain, {})
+    # Alternatives ranked like analyze_confused: rounded score, ties in domain order
+    alt_domain, best = None, None
+    for d in req.domains:
+        n_required = len(req.required[d])
+        if not n_required or d == domain:
+            continue
+        alt_score = counts[d] / n_required * 100
+        if alt_score >= ALT_MIN_SCORE and (best is None or round(alt_score, 1) > best):
+            alt_domain, best = d, round(alt_score, 1)
+    alt_info = structured.get(alt_domain, {}) if alt_domain else {}
+
+    return {
+        "score": score,
+        "status_text": f"Match Level: {round(score, 1)}%",
+        "warning": warning,
+        "master_msg": master_msg,
+        "found_skills": found,
+        "missing_skills": missing,
+        "roadmap": "",
+        "missing_count": len(missing),
+        "missing_by_tier": {t: [s for s in job_info.get(t, []) if key(s) not in skills] for t in TIERS},
+        "all_skills_by_tier": {t: job_info.get(t, []) for t in TIERS},
+        "alt_domain": alt_domain,
+        "alt_missing_by_tier": ({t: [s for s in alt_info.get(t, []) if key(s) not in skills] for t in TIERS}
+                                if alt_domain else {}),
+        "description": req.predictor.career_metadata.get(domain, ""),
+    }
+
+
+def handle_for(predictor, resume_skills, domain):
+    """Handle for an analysis of `resume_skills` against the canonical `domain`."""
+    req = _requirements_for(predictor)
+    req.required_for(domain)
+    skills = frozenset(req.ontology.keys(resume_skills)) & req.vocab_index.keys()
+    handle = req.encode(domain, skills)
+    if handle not in _states:
+        _states.put(handle, (skills, req.found_counts(skills)))
+    return handle
+
+
+def handle_domain(predictor, handle):
+    """Canonical target domain `handle` was issued for. Raises StaleHandle."""
+    return _requirements_for(predictor).decode(handle)[0]
+
+
+@metrics.timed("delta_analysis")
+def apply_delta(predictor, handle, added=(), removed=()):
+    """
+    Re-analyses `handle` with skills added/removed. Returns (new_handle, old, new)
+    where old/new are analyze()-shaped dicts. Raises StaleHandle.
+    """
+    req = _requirements_for(predictor)
+    domain, skills = req.decode(handle)
+    state = _states.get(handle)
+    counts = state[1] if state is not None else req.found_counts(skills)
+
+    # A removed alias drops every ID it implies; the handle keeps IDs, not the original strings
+    added = req.ontology.keys(added) & req.vocab_index.keys()
+    removed = req.ontology.keys(removed) & req.vocab_index.keys()
+    new_skills = (skills - removed) | added
+    new_counts = dict(counts)
+    # Only domains that list a changed skill move
+    for skill in new_skills - skills:
+        for d, n in req.domains_by_skill.get(skill, ()):
+            new_counts[d] += n
+    for skill in skills - new_skills:
+        for d, n in req.domains_by_skill.get(skill, ()):
+            new_counts[d] -= n
+
+    new_handle = req.encode(domain, new_skills)
+    _states.put(new_handle, (new_skills, new_counts))
+    return new_handle, _analysis(req, domain, skills, counts), _analysis(req, domain, new_skills, new_counts)
+
+
+def _splices(old, new):
+    ops = [[i1, i2 - i1, new[j1:j2]]
+           for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, old, new, autojunk=False).get_opcodes()
+           if tag != 'equal']
+    return ops[::-1]
+
+
+def diff(old, new):
+    """Patch turning payload `old` into `new` (see module docstring)."""
+    patch = {"set": {}, "splice": {}}
+    for key, value in new.items():
+        before = old.get(key)
+        if before == value:
+            continue
+        if isinstance(value, list) and isinstance(before, list):
+            patch["splice"][key] = _splices(before, value)
+        elif isinstance(value, dict) and isinstance(before, dict) and before.keys() == value.keys() and \
+                all(isinstance(v, list) for v in value.values()):
+            for sub, items in value.items():
+                if before[sub] != items:
+                    patch["splice"][f"{key}.{sub}"] = _splices(before[sub], items)
+        else:
+            patch["set"][key] = value
+    return {k: v for k, v in patch.items() if v}
@@ -0,0 +1,160 @@
+"""
+Streaming text extraction for DOCX resumes.
+
+A .docx file is a zip of XML parts. This module reads the body
+(word/document.xml) and the header and footer parts in fixed-size chunks with
+expat. No element tree or document object model is built, so memory is bounded
+by the nesting depth and the longest paragraph rather than the document size.
+
+Text comes out in document order:
+  * each paragraph as one line;
+  * table rows as one line, with cells separated by tabs, because many resumes
+    keep their skills grid in a table;
+  * text boxes in the place they are anchored.
+
+Word writes each drawing twice, once as mc:Choice and once as a VML
+mc:Fallback. The fallback copy is skipped so text-box text appears once.
+"""
+
+import os # Environment configuration
+import re # Part-name ordering
+import zipfile # DOCX container
+from xml.parsers import expat # Incremental, callback-based XML parsing
+
+DOCX_MAX_PART_BYTES = int(os.environ.get('DOCX_MAX_PART_BYTES', str(64 << 20))) # Decompressed cap per XML part
+
+_MC_NS = 'http://schemas.openxmlformats.org/markup-compatibility/2006'
+_CHUNK_BYTES = 1 << 16
+_BODY_PART = 'word/document.xml'
+_HEADER_FOOTER = re.compile(r'word/(header|footer)(\d*)\.xml')
+
+
+class _CappedReader:
+    """File wrapper that refuses to decompress more than `limit` bytes (zip-bomb guard)."""
+    def __init__(self, raw, limit):
+        self._raw = raw
+        self._left = limit
+
+    def read(self, n=-1):
+        data = self._raw.read(n if n is not None and n >= 0 else self._left + 1)
+        self._left -= len(data)
+        if self._left < 0:
+            raise ValueError("DOCX part exceeds DOCX_MAX_PART_BYTES")
+        return data
+
+
+class _PartText:
+    """expat callbacks turning one WordprocessingML part into lines (no element tree is built)."""
+    def __init__(self):
+        self.lines = []       # Finished lines, drained by the caller after every chunk
+        self.paragraphs = []  # Run text of each open paragraph (text boxes nest paragraphs)
+        self.cells = []       # Lines of each open table cell
+        self.rows = []        # Finished cell texts of each open table row
+        self.in_text = False  # Inside w:t (w:delText / w:instrText are not document text)
+        self.fallback = 0     # Depth inside mc:Fallback (duplicate VML rendering)
+
+    def start(self, tag, attrs):
+        ns, _, name = tag.rpartition(' ')
+        if ns == _MC_NS:
+            self.fallback += name == 'Fallback'
+            return
+        if self.fallback:
+            return
+        if name == 't':
+            self.in_text = bool(self.paragraphs)
+        elif name == 'p':
+            self.paragraphs.append([])
+        elif name == 'tc':
+            self.cells.append([])
+        elif name == 'tr':
+            self.rows.append([])
+        elif self.paragraphs:
+            if name in ('tab', 'ptab'):
+                self.paragraphs[-1].append('\t')
+            elif name in ('br', 'cr'):
+                self.paragraphs[-1].append(' ')
+            elif name == 'noBreakHyphen':
+                self.paragraphs[-1].append('-')
+
+    def end(self, tag):
+        ns, _, name = tag.rpartition(' ')
+        if ns == _MC_NS:
+            self.fallback -= name == 'Fallback'
+            return
+        if self.fallback:
+            return
+        line = None
+        if name == 't':
+            self.in_text = False
+        elif name == 'p' and self.paragraphs:
+            line = ''.join(self.paragraphs.pop()).strip()
+        elif name == 'tc' and self.cells:
+            text = ' '.join(self.cells.pop())
+            if self.rows:
+                self.rows[-1].append(text)
+            else:
+                line = text
+        elif name == 'tr' and self.rows:
+            line = '\t'.join(c for c in self.rows.pop() if c)
+        if line:
+            if self.cells:
+                self.cells[-1].append(line)  # Paragraphs and nested tables inside a cell
+            else:
+                self.lines.append(line)
+
+    def text(self, data):
+        if self.in_text and not self.fallback:
+            self.paragraphs[-1].append(data)
+
+
+def _reject_doctype(*_):
+    raise ValueError("DOCX parts never carry a DTD")  # Closes off entity-expansion tricks
+
+
+def _iter_part_lines(stream):
+    """Yields the text lines of one WordprocessingML part (body, header or footer)."""
+    handler = _PartText()
+    parser = expat.ParserCreate(namespace_separator=' ')
+    parser.buffer_text = True
+    parser.StartDoctypeDeclHandler = _reject_doctype
+    parser.StartElementHandler = handler.start
+    parser.EndElementHandler = handler.end
+    parser.CharacterDataHandler = handler.text
+    while True:
+        chunk = stream.read(_CHUNK_BYTES)
+        parser.Parse(chunk, not chunk)
+        yield from handler.lines
+        handler.lines.clear()
+        if not chunk:
+            break
+
+
+def _part_order(name):
+    kind, number = _HEADER_FOOTER.fullmatch(name).groups()
+    return (kind != 'header', int(number or 0))
+
+
+def iter_docx_lines(path):
+    """Yields text lines: headers, then the body, then footers. Repeated header/footer lines appear once."""
+    with zipfile.ZipFile(path) as archive:
+        names = set(archive.namelist())
+        if _BODY_PART not in names:
+            raise ValueError("not a Word document (word/document.xml missing)")
+        extra = sorted((n for n in names if _HEADER_FOOTER.fullmatch(n)), key=_part_order)
+        headers = [n for n in extra if n.startswith('word/header')]
+        footers = [n for n in extra if n.startswith('word/footer')]
+
+        seen = set()  # First-page / even / default headers usually repeat each other
+        for part in headers + [_BODY_PART] + footers:
+            with archive.open(part) as raw:
+                for line in _iter_part_lines(_CappedReader(raw, DOCX_MAX_PART_BYTES)):
+                    if part == _BODY_PART:
+                        yield line
+                    elif line not in seen:
+                        seen.add(line)
+                        yield line
+
+
+def extract_docx_text(path):
+    """Full text of a DOCX file, one paragraph or table row per line."""
+    return "\n".join(iter_docx_lines(path))
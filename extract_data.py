@@ -5,13 +5,21 @@ from resume text using Groq AI models and Pydantic schemas.
 
 import os # OS utilities for environment variables
 import json # JSON data manipulation
+import functools # Client reuse
 from groq import Groq # Groq AI API interface
 from pydantic import BaseModel, Field # Schema definition and field validation
 from typing import List, Optional # Type hinting for complex structures
 from dotenv import load_dotenv # .env file configuration loader
 
+import metrics
+from cache import canonical_key
+from shared_cache import TieredCache
+
 load_dotenv()
 
+# Optional endpoint override (e.g. the local stand-in from loadtest/fake_services.py)
+GROQ_BASE_URL = os.environ.get('GROQ_BASE_URL') or None
+
 # =============================================
 # PYDANTIC SCHEMAS FOR STRUCTURED EXTRACTION
 # =============================================
@@ -42,10 +50,85 @@ class ChatbotResumeData(BaseModel):
     industry: Optional[str] = Field(description="Primary industry the candidate has worked in")
 
 
+class ResumeProfile(BaseModel):
+    """Combined schema: everything ResumeData and ChatbotResumeData need, extracted in one call."""
+    name: str = Field(description="The full name of the candidate")
+    email: str = Field(description="The email address of the candidate")
+    current_status: str = Field(description="Current professional status: 'student', 'working', 'fresher', or 'gap year'")
+    years_experience: Optional[float] = Field(description="Total years of professional experience, 0 if student/fresher")
+    education: List[str] = Field(description="List of degrees or certifications (e.g., 'B.Tech Computer Science', 'PMP')")
+    skills: List[str] = Field(description="A comprehensive list of all technical and soft skills found")
+    experience: List[Experience] = Field(description="A list of all professional experience entries")
+    career_interests: List[str] = Field(description="Inferred career interests based on experience and skills")
+    recent_role: Optional[str] = Field(description="Most recent job title, or 'Student' if not applicable")
+    industry: Optional[str] = Field(description="Primary industry the candidate has worked in")
+
+
+# Schema text and instructions are fixed, so they are rendered once (compact JSON: fewer prompt tokens)
+_PROFILE_SCHEMA_TEXT = json.dumps(ResumeProfile.model_json_schema(), separators=(',', ':'))
+_PROFILE_INSTRUCTIONS = (
+    "Parse the following resume text into the JSON schema below. "
+    "Extract contact details, a comprehensive list of 'skills' and every 'experience' entry. "
+    "Determine the candidate's current professional status (student, working, fresher, or gap year), "
+    "their total years of experience and education background, "
+    "and infer likely career interests based on their background. "
+    "Return ONLY valid JSON.\n\n"
+    f"Schema:\n{_PROFILE_SCHEMA_TEXT}\n\n"
+    "Resume Text:\n"
+)
+_PROFILE_SYSTEM = "You are a professional resume parser and career advisor that outputs strictly valid JSON."
+
+_PROFILE_MODEL = "llama-3.3-70b-versatile"
+
+# Profiles per resume text and prompt; shared across workers when SHARED_CACHE_URL is set.
+# They hold contact details, so keep the TTL short.
+PROFILE_CACHE_SIZE = int(os.environ.get('PROFILE_CACHE_SIZE', '512'))
+PROFILE_CACHE_TTL_S = float(os.environ.get('PROFILE_CACHE_TTL_S', '3600'))
+_profile_cache = TieredCache("resume_profiles", maxsize=PROFILE_CACHE_SIZE, ttl=PROFILE_CACHE_TTL_S)
+_PROFILE_PROMPT_KEY = canonical_key(_PROFILE_MODEL, _PROFILE_SYSTEM, _PROFILE_INSTRUCTIONS)
+
+_RESUME_FIELDS = tuple(ResumeData.model_fields)
+_CHATBOT_FIELDS = tuple(ChatbotResumeData.model_fields)
+
+
 # =============================================
 # GROQ EXTRACTION FUNCTIONS
 # =============================================
 
+@functools.lru_cache(maxsize=4)
+def _client(api_key: str) -> Groq:
+    """One client (and HTTP connection pool) per key instead of one per call."""
+    return Groq(api_key=api_key, base_url=GROQ_BASE_URL)
+
+
+def extract_resume_profile(resume_text: str, api_key: str) -> dict:
+    """
+    Single Groq call returning a ResumeProfile-shaped dict (both the parser and
+    the chatbot fields). Raises on API or JSON errors; callers decide the fallback.
+    Results are cached per (prompt, resume text); errors and empty profiles are not.
+    """
+    def call():
+        with metrics.stage("groq_resume_profile"):
+            response = _client(api_key).chat.completions.create(
+                messages=[
+                    {"role": "system", "content": _PROFILE_SYSTEM},
+                    {"role": "user", "content": _PROFILE_INSTRUCTIONS + resume_text}
+                ],
+                model=_PROFILE_MODEL,
+                response_format={"type": "json_object"},
+                temperature=0.1
+            )
+        content = response.choices[0].message.content
+        profile = json.loads(content) if content else {}
+        return profile if isinstance(profile, dict) and profile else None
+    return _profile_cache.get_or_compute(canonical_key("resume_profile", _PROFILE_PROMPT_KEY, resume_text), call) or {}
+
+
+def chatbot_context_from_profile(profile: dict) -> dict:
+    """The ChatbotResumeData view of a profile."""
+    return {k: profile[k] for k in _CHATBOT_FIELDS if k in profile}
+
+
 def extract_resume_data(resume_text: str, api_key: str) -> str:
     """
     Uses Groq API to extract structured data from resume text.
@@ -54,64 +137,19 @@ def extract_resume_data(resume_text: str, api_key: str) -> str:
         return json.dumps({"error": "Groq API key is not set."}, indent=2)
     
     try:
-        client = Groq(api_key=api_key)
-
-        prompt = (
-            "Parse the following resume text. Extract all the information into the "
-            "required JSON structure. Focus specifically on extracting a comprehensive "
-            "list of 'skills' and a detailed list of 'experience' entries. "
-            "Return ONLY valid JSON.\n\n"
-            f"Schema:\n{json.dumps(ResumeData.model_json_schema(), indent=2)}\n\n"
-            f"Resume Text:\n{resume_text}"
-        )
-
-        response = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": "You are a professional resume parser that outputs strictly valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            model="llama-3.3-70b-versatile",
-            response_format={"type": "json_object"},
-            temperature=0.1
-        )
-
-        return response.choices[0].message.content
-    
+        profile = extract_resume_profile(resume_text, api_key)
+        return json.dumps({k: profile[k] for k in _RESUME_FIELDS if k in profile}, indent=2)
     except Exception as e:
         return json.dumps({"error": f"An API error occurred: {e}"}, indent=2)
 
 
 def extract_chatbot_context(resume_text: str, api_key: str) -> dict:
     """Distills career status and interests from a resume for chatbot personalization."""
-    
     if not api_key:
         return {}
     
     try:
-        client = Groq(api_key=api_key)
-
-        prompt = (
-            "Analyze the following resume text and extract career-relevant details. "
-            "Determine the candidate's current professional status (student, working, fresher, or gap year), "
-            "their total years of experience, education background, all skills, "
-            "and infer likely career interests based on their background. "
-            "Return ONLY valid JSON.\n\n"
-            f"Schema:\n{json.dumps(ChatbotResumeData.model_json_schema(), indent=2)}\n\n"
-            f"Resume Text:\n{resume_text}"
-        )
-
-        response = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": "You are a professional career advisor that outputs strictly valid JSON context."},
-                {"role": "user", "content": prompt}
-            ],
-            model="llama-3.3-70b-versatile",
-            response_format={"type": "json_object"},
-            temperature=0.1
-        )
-
-        return json.loads(response.choices[0].message.content) if response.choices[0].message.content else {}
-    
+        return chatbot_context_from_profile(extract_resume_profile(resume_text, api_key))
     except Exception as e:
         print(f"[Chatbot Context Extraction Error]: {e}")
         return {}
@@ -147,10 +185,9 @@ if __name__ == '__main__':
         Certifications: PMP, Scrum Master (CSM), Google Data Analytics.
         """
         
-        print("=== Resume Data Extraction ===")
-        result = extract_resume_data(sample_text, api_key)
-        print(result)
+        print("=== Resume Profile Extraction (single call) ===")
+        profile = extract_resume_profile(sample_text, api_key)
+        print(json.dumps(profile, indent=2))
         
-        print("\n=== Chatbot Context Extraction ===")
-        context = extract_chatbot_context(sample_text, api_key)
-        print(json.dumps(context, indent=2))
+        print("\n=== Chatbot Context View ===")
+        print(json.dumps(chatbot_context_from_profile(profile), indent=2))
@@ -0,0 +1,50 @@
+"""
+Production serving config:  gunicorn -c gunicorn.conf.py app:app
+
+The app (and with it the BERT predictor) is imported once in the master
+(preload_app) and shared copy-on-write by the forked workers. Each worker
+caps torch intra-op threads to its share of the cores, warms up in the
+background and only reports ready on /readyz once warmup has finished.
+"""
+
+import gc # Freeze preloaded objects before forking
+import multiprocessing # Default worker count
+import os # Environment overrides
+import tempfile # Default shared session file
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+# Threads let one worker keep serving while another request waits on Groq / YouTube
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+preload_app = True
+
+# Each worker holds its own predictor, and a reload POST reaches only one of them. The others
+# follow the trigger file through their artifact watchers, so the watcher is on by default here
+# (read when the app is preloaded below). Set MODEL_WATCH_INTERVAL_S=0 to opt out.
+os.environ.setdefault('MODEL_WATCH_INTERVAL_S', '5')
+# Chat sessions must be visible to every worker, or most turns land on a worker that never saw
+# the session and fall back to re-sending the full context. Point it elsewhere to persist them.
+os.environ.setdefault('SESSION_STORE_PATH', os.path.join(tempfile.gettempdir(), 'career_advisor_sessions.db'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = 30
+keepalive = 5
+
+
+def when_ready(server):
+    """Master, after preload and before forking: keep GC from dirtying shared pages."""
+    gc.collect()
+    gc.freeze()
+    server.log.info("Predictor preloaded; forking %d workers", workers)
+
+
+def post_fork(server, worker):
+    """Worker: size torch's thread pool to this worker's share of the CPU."""
+    from serving import configure_torch_threads
+    configure_torch_threads(workers)
+
+
+def post_worker_init(worker):
+    """Worker: warm up in the background; /readyz stays 503 until it finishes."""
+    from serving import start_warmup
+    start_warmup()
@@ -0,0 +1,147 @@
+"""
+Zero-downtime reload of the skill model and knowledge artifacts.
+
+A reload builds a new CareerPredictor from SKILL_MODEL_PATH on a background
+thread, warms and smoke-tests it (predictor.smoke_test), then swaps it in with
+a single reference assignment. Requests already running keep the predictor
+they started with; the retired one has its inference worker stopped and is
+freed once those requests drop it. A failed build or smoke test leaves the
+live predictor untouched.
+
+Triggers (each worker process reloads itself):
+  - POST /api/admin/reload, which also touches <model dir>/.reload so the
+    other gunicorn workers' watchers follow;
+  - the artifact watcher, when MODEL_WATCH_INTERVAL_S > 0. It polls where
+    SKILL_MODEL_PATH points and its file sizes/mtimes, and waits for one
+    unchanged poll before reloading, so a half-copied model directory is never
+    loaded.
+
+Publish by switching the SKILL_MODEL_PATH symlink to a new directory
+(weights.publish_model); never copy over the served files, which are mmapped.
+"""
+
+import gc # Reclaim the retired model promptly
+import logging # Reload diagnostics
+import os # Environment configuration and artifact stat
+import threading # Background build and watcher
+import time # Status timestamps and polling
+
+import predictor
+
+logger = logging.getLogger(__name__)
+
+MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL_S', '0')) # 0 disables the watcher
+RELOAD_TRIGGER_FILE = '.reload'
+
+
+def artifact_snapshot(model_dir):
+    """Resolved directory plus (name, size, mtime) per file; changes when anything is republished."""
+    try:
+        with os.scandir(model_dir) as entries:
+            return (os.path.realpath(model_dir),) + tuple(sorted((e.name, e.stat().st_size, e.stat().st_mtime_ns)
+                                                                 for e in entries if e.is_file()))
+    except OSError:
+        return ()
+
+
+def touch_trigger(model_dir):
+    """Bumps the trigger file so watchers in every worker notice a reload request."""
+    path = os.path.join(model_dir, RELOAD_TRIGGER_FILE)
+    try:
+        with open(path, 'a'):
+            os.utime(path, None)
+    except OSError as e:
+        logger.warning("[RELOAD] Could not touch %s: %s", path, e)
+
+
+class ReloadManager:
+    """Runs at most one background reload at a time and reports its outcome."""
+    def __init__(self, model_path=None):
+        self.model_path = os.path.abspath(model_path or predictor.SKILL_MODEL_PATH)
+        self._lock = threading.Lock()
+        self._running = False
+        self._watcher = None
+        self._baseline = artifact_snapshot(self.model_path)
+        self._status = {"state": "idle", "version": None, "previous_version": None,
+                        "reason": None, "error": None, "started_at": None, "finished_at": None,
+                        "duration_s": None}
+
+    def status(self):
+        """Last reload outcome plus the live version, for the admin endpoint."""
+        with self._lock:
+            status = dict(self._status)
+        status["live_version"] = predictor.model_version()
+        status["pid"] = os.getpid()
+        return status
+
+    def request(self, reason):
+        """Starts a background reload; returns False if one is already running."""
+        with self._lock:
+            if self._running:
+                return False
+            self._running = True
+            # Whatever is on disk now is what this reload loads; the watcher compares against it
+            self._baseline = artifact_snapshot(self.model_path)
+            self._status.update(state="running", reason=reason, error=None,
+                                started_at=time.time(), finished_at=None, duration_s=None)
+        threading.Thread(target=self._run, args=(reason,), name="model-reload", daemon=True).start()
+        return True
+
+    def _run(self, reason):
+        start = time.perf_counter()
+        outcome = {"state": "failed"}
+        try:
+            candidate = predictor.load_predictor(self.model_path)
+            try:
+                predictor.smoke_test(candidate)
+            except Exception:
+                candidate.close()
+                raise
+            old = predictor.swap_predictor(candidate)
+            outcome = {"state": "succeeded", "version": candidate.version, "previous_version": old.version}
+            # New requests already see the candidate; in-flight ones finish on `old` and then drop it
+            old.close()
+            del old
+            gc.collect()
+            logger.info("[RELOAD] pid=%s %s → %s (%s) in %.2fs", os.getpid(), outcome["previous_version"],
+                        outcome["version"], reason, time.perf_counter() - start)
+        except Exception as e:
+            outcome["error"] = str(e)
+            logger.error("[RELOAD] pid=%s reload (%s) failed, keeping %s: %s",
+                         os.getpid(), reason, predictor.model_version(), e)
+        finally:
+            with self._lock:
+                self._status.update(outcome, finished_at=time.time(),
+                                    duration_s=round(time.perf_counter() - start, 3))
+                self._running = False
+
+    # -----------------------------------------------------------------------
+    # Artifact watcher
+    # -----------------------------------------------------------------------
+
+    def start_watcher(self, interval=MODEL_WATCH_INTERVAL):
+        """Starts the polling watcher for this process (no-op if disabled or already running)."""
+        if interval <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name="model-watcher", daemon=True)
+        self._watcher.start()
+        logger.info("[RELOAD] pid=%s watching %s every %.1fs", os.getpid(), self.model_path, interval)
+
+    def _watch(self, interval):
+        pending = None
+        while True:
+            time.sleep(interval)
+            snapshot = artifact_snapshot(self.model_path)
+            with self._lock:
+                changed = snapshot != self._baseline
+            if not changed or not snapshot:
+                pending = None
+                continue
+            if snapshot != pending:
+                pending = snapshot  # Still being written; wait for a quiet poll
+                continue
+            pending = None
+            self.request("artifacts changed")
+
+
+reloader = ReloadManager()
@@ -0,0 +1,122 @@
+"""
+Dynamic micro-batching for model inference.
+
+Request threads submit single items; one background worker drains the queue,
+waits up to a short window for more arrivals, and runs a single batched call.
+The model is therefore only ever touched by one thread, and throughput under a
+threaded server grows with batch size instead of serialising per request.
+"""
+
+import logging # Worker diagnostics
+import os # Fork detection
+import queue # Submission queue
+import threading # Background worker
+import time # Batching window
+from concurrent.futures import Future # Per-item result handles
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+_STOP = object() # Queue sentinel: worker exits after draining what was queued before it
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-item calls into batched calls of `batch_fn`."""
+    def __init__(self, batch_fn, max_batch_size=32, max_wait_ms=5.0, name="inference"):
+        """
+        Args:
+            batch_fn: Callable taking a list of items and returning a same-length list of results.
+            max_batch_size: Upper bound on items per batched call.
+            max_wait_ms: How long the worker waits for more items after the first one arrives.
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._closed = False
+        self._inline_lock = threading.Lock()
+
+    def _start_worker(self):
+        # Threads do not survive fork: (re)start the worker lazily in each process. Caller holds _lock.
+        self._queue = queue.SimpleQueue()
+        threading.Thread(target=self._run, args=(self._queue,), name=f"{self.name}-batcher",
+                         daemon=True).start()
+        self._pid = os.getpid()
+
+    def submit(self, item):
+        """Queues one item and returns a Future for its result."""
+        future = Future()
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                if self._pid != os.getpid():
+                    self._start_worker()
+                self._queue.put((item, future))
+        if closed:
+            # Retired batcher (e.g. after a hot reload): serve stragglers inline, one at a time
+            future.set_running_or_notify_cancel()
+            try:
+                with self._inline_lock:
+                    future.set_result(self.batch_fn([item])[0])
+            except BaseException as e:
+                future.set_exception(e)
+        return future
+
+    def close(self):
+        """
+        Stops the worker once already-queued items are served and releases its
+        reference to the queue. Later submits run synchronously on the caller.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._pid == os.getpid():
+                self._queue.put(_STOP)
+            self._queue = None
+
+    def __call__(self, item, timeout=None):
+        """Blocking single-item call."""
+        return self.submit(item).result(timeout)
+
+    def map(self, items, timeout=None):
+        """Submits all items at once (so they can share a batch) and returns results in order."""
+        futures = [self.submit(item) for item in items]
+        return [f.result(timeout) for f in futures]
+
+    def _run(self, q):
+        stopping = False
+        while not stopping:
+            first = q.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    entry = q.get(timeout=remaining) if remaining > 0 else q.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+            # Drop items whose caller has already given up (cancelled futures)
+            batch = [(item, f) for item, f in batch if f.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            metrics.INFERENCE_BATCH_SIZE.labels(self.name).observe(len(batch))
+            try:
+                results = self.batch_fn([item for item, _ in batch])
+            except BaseException as e:
+                logger.warning("[%s] Batch of %d failed: %s", self.name, len(batch), e)
+                for _, f in batch:
+                    f.set_exception(e)
+                continue
+            for (_, f), result in zip(batch, results):
+                f.set_result(result)
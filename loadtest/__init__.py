@@ -0,0 +1,5 @@
+"""
+Offline load-test kit: local Groq / YouTube stand-ins (fake_services.py),
+a Redis-protocol stand-in for the shared cache (fake_redis.py)
+and a concurrent session-mix traffic driver (driver.py).
+"""
@@ -0,0 +1,318 @@
+"""
+Concurrent traffic driver for the Flask backend.
+
+Replays weighted session mixes against a running server and reports
+throughput plus per-route latency percentiles:
+
+  full     upload → analyze → study plan → chat (several turns)
+  confused upload → confused → study plan
+  chat     chat only, no resume
+
+Example:
+    python -m loadtest.driver --base-url http://127.0.0.1:5000 --concurrency 16 --duration 60
+"""
+
+import argparse # CLI options
+import io # In-memory DOCX building
+import json # Request / response bodies
+import math # Percentile ranks
+import os # Resume directory listing
+import random # Session mix sampling
+import threading # Shared stats lock
+import time # Timing
+import urllib.error # HTTP error handling
+import urllib.request # Stdlib HTTP client
+import uuid # Multipart boundaries
+import zipfile # Minimal DOCX packaging
+from concurrent.futures import ThreadPoolExecutor # Worker pool
+from xml.sax.saxutils import escape # DOCX text escaping
+
+DOMAINS = [
+    "Data Analyst", "DevOps Engineer", "Frontend Developer", "Backend Developer",
+    "AI Engineer", "data scientist", "UX Designer", "Cyber Security",
+]
+
+SAMPLE_RESUMES = [
+    """ALEXANDER J. COOPER Austin, TX | alex.cooper@email.com
+SUMMARY Project Manager & Analyst with 6+ years of experience in SaaS implementation.
+CORE SKILLS Python, SQL, Tableau, Power BI, Excel, Statistics, Agile/Scrum, JIRA.
+EXPERIENCE Data Analyst | BlueGrid Energy Group 2018 - 2020
+Automated dashboards in Tableau, identifying $200k in annual cost savings.
+EDUCATION B.S. Business Administration | CU Boulder""",
+    """PRIYA NAIR Bengaluru | priya.nair@email.com
+SKILLS JavaScript, TypeScript, React, HTML, CSS, Tailwind CSS, Git, REST APIs, Node.js
+EXPERIENCE Frontend Engineer | Flipside Labs 2020 - Present
+Built a component library in React and TypeScript used by 14 product teams.
+EDUCATION B.Tech Computer Science""",
+    """MARCUS LEE Seattle, WA | marcus.lee@email.com
+SKILLS Linux, Docker, Kubernetes, Terraform, AWS, CI/CD, Prometheus, Grafana, Shell Scripting, Python
+EXPERIENCE Site Reliability Engineer | Northwind Cloud 2019 - Present
+Cut deployment time by 70% by migrating pipelines to GitHub Actions and ArgoCD.
+EDUCATION B.S. Computer Engineering""",
+]
+
+CHAT_MESSAGES = [
+    "How long will it take me to become job-ready?",
+    "Which certification should I get first?",
+    "Can you suggest a portfolio project?",
+    "Should I learn Kubernetes before Terraform?",
+]
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+# ---------------------------------------------------------------------------
+# Request helpers
+# ---------------------------------------------------------------------------
+
+def build_docx(text):
+    """Packages plain text as a minimal valid .docx (one paragraph per line)."""
+    paragraphs = "".join(
+        f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>'
+        for line in text.splitlines()
+    )
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("[Content_Types].xml",
+                   '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                   '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                   '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                   '<Default Extension="xml" ContentType="application/xml"/>'
+                   '<Override PartName="/word/document.xml" '
+                   'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+                   '</Types>')
+        z.writestr("_rels/.rels",
+                   '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                   '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                   '<Relationship Id="rId1" '
+                   'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+                   'Target="word/document.xml"/></Relationships>')
+        z.writestr("word/document.xml",
+                   '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                   '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                   f'<w:body>{paragraphs}</w:body></w:document>')
+    return buf.getvalue()
+
+
+def load_resumes(resume_dir):
+    """Returns [(filename, bytes)] from a directory, or generated DOCX samples."""
+    if resume_dir:
+        files = []
+        for name in sorted(os.listdir(resume_dir)):
+            if name.lower().endswith((".pdf", ".docx")):
+                with open(os.path.join(resume_dir, name), "rb") as f:
+                    files.append((name, f.read()))
+        if files:
+            return files
+    return [(f"sample_{i}.docx", build_docx(text)) for i, text in enumerate(SAMPLE_RESUMES)]
+
+
+class Stats:
+    """Thread-safe latency / status collector keyed by route."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.statuses = {}
+        self.sessions = 0
+
+    def record(self, route, seconds, status):
+        with self.lock:
+            self.latencies.setdefault(route, []).append(seconds)
+            counts = self.statuses.setdefault(route, {})
+            counts[status] = counts.get(status, 0) + 1
+
+
+class Client:
+    """Thin urllib client that times every call into a Stats instance."""
+    def __init__(self, base_url, stats, timeout):
+        self.base_url = base_url.rstrip("/")
+        self.stats = stats
+        self.timeout = timeout
+
+    def _call(self, route, body, headers):
+        req = urllib.request.Request(f"{self.base_url}{route}", data=body, headers=headers, method="POST")
+        start = time.perf_counter()
+        status, payload = 0, None
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                status = resp.status
+                payload = json.loads(resp.read() or b"null")
+        except urllib.error.HTTPError as e:
+            status = e.code
+            e.read()
+        except Exception:
+            status = 0  # connection error / timeout
+        self.stats.record(route, time.perf_counter() - start, status)
+        return status, payload
+
+    def post_json(self, route, data):
+        return self._call(route, json.dumps(data).encode(), {"Content-Type": "application/json"})
+
+    def upload(self, filename, content):
+        boundary = uuid.uuid4().hex
+        body = (
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+        return self._call("/api/upload", body, {"Content-Type": f"multipart/form-data; boundary={boundary}"})
+
+
+# ---------------------------------------------------------------------------
+# Session scenarios
+# ---------------------------------------------------------------------------
+
+def _chat(client, resume_context, turns):
+    messages = []
+    for _ in range(turns):
+        messages.append({"role": "user", "text": random.choice(CHAT_MESSAGES)})
+        status, payload = client.post_json("/api/chatbot", {"messages": messages, "resumeContext": resume_context})
+        if status != 200 or not payload:
+            return
+        messages.append({"role": "model", "text": payload.get("reply", "")})
+
+
+def session_full(client, resumes, chat_turns):
+    name, content = random.choice(resumes)
+    status, upload = client.upload(name, content)
+    if status != 200 or not upload:
+        return
+    domain = random.choice(DOMAINS)
+    status, analysis = client.post_json("/api/analyze", {"skills": upload["skills"], "domain": domain})
+    if status != 200 or not analysis:
+        return
+    client.post_json("/api/study-plan", {
+        "missing_skills": analysis.get("missing_skills", []),
+        "found_skills": analysis.get("found_skills", []),
+        "score": analysis.get("score", 0),
+        "domain": domain,
+        "description": analysis.get("description", ""),
+    })
+    _chat(client, {"skills": upload["skills"], "domain": domain,
+                   "chatbotContext": upload.get("chatbotContext")}, chat_turns)
+
+
+def session_confused(client, resumes, chat_turns):
+    name, content = random.choice(resumes)
+    status, upload = client.upload(name, content)
+    if status != 200 or not upload:
+        return
+    status, confused = client.post_json("/api/confused", {"skills": upload["skills"]})
+    if status != 200 or not confused or not confused.get("matches"):
+        return
+    best = confused["matches"][0]
+    client.post_json("/api/study-plan", {
+        "missing_skills": best.get("missing_skills", []),
+        "score": best.get("score", 0),
+        "domain": best.get("domain", ""),
+    })
+
+
+def session_chat(client, resumes, chat_turns):
+    _chat(client, None, chat_turns)
+
+
+SCENARIOS = {"full": session_full, "confused": session_confused, "chat": session_chat}
+
+
+def parse_mix(spec):
+    """Parses 'full=6,confused=2,chat=2' into (names, weights)."""
+    names, weights = [], []
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{name}'. Choose from {', '.join(SCENARIOS)}")
+        names.append(name.strip())
+        weights.append(float(weight or 1))
+    return names, weights
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already-sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(stats, elapsed):
+    """Builds a per-route summary dict (latencies in milliseconds)."""
+    routes = {}
+    for route, values in sorted(stats.latencies.items()):
+        values = sorted(values)
+        ok = sum(n for code, n in stats.statuses[route].items() if 200 <= code < 300)
+        routes[route] = {
+            "requests": len(values),
+            "ok": ok,
+            "throughput_rps": round(len(values) / elapsed, 2),
+            "statuses": {str(k): v for k, v in sorted(stats.statuses[route].items())},
+            **{f"p{p}_ms": round(percentile(values, p) * 1000, 1) for p in PERCENTILES},
+            "max_ms": round(values[-1] * 1000, 1),
+        }
+    total = sum(r["requests"] for r in routes.values())
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "sessions": stats.sessions,
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "routes": routes,
+    }
+
+
+def print_report(summary):
+    header = f"{'route':<18}{'reqs':>7}{'ok':>7}{'rps':>8}" + "".join(f"{'p' + str(p):>9}" for p in PERCENTILES) + f"{'max':>9}"
+    print(f"\n{summary['sessions']} sessions, {summary['requests']} requests in {summary['elapsed_s']}s "
+          f"→ {summary['throughput_rps']} req/s")
+    print(header)
+    print("-" * len(header))
+    for route, r in summary["routes"].items():
+        print(f"{route:<18}{r['requests']:>7}{r['ok']:>7}{r['throughput_rps']:>8}"
+              + "".join(f"{r[f'p{p}_ms']:>9}" for p in PERCENTILES) + f"{r['max_ms']:>9}")
+    print("(latencies in ms; statuses per route are in --json-out)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay realistic session mixes against the Flask backend.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--mix", default="full=6,confused=2,chat=2", help="Scenario weights")
+    parser.add_argument("--chat-turns", type=int, default=3)
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Pause between sessions per user")
+    parser.add_argument("--resume-dir", default=None, help="Directory of .pdf/.docx resumes to upload")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--json-out", default=None, help="Write the summary as JSON to this path")
+    args = parser.parse_args()
+
+    names, weights = parse_mix(args.mix)
+    resumes = load_resumes(args.resume_dir)
+    stats = Stats()
+    client = Client(args.base_url, stats, args.timeout)
+    deadline = time.monotonic() + args.duration
+
+    def virtual_user():
+        while time.monotonic() < deadline:
+            scenario = SCENARIOS[random.choices(names, weights)[0]]
+            scenario(client, resumes, args.chat_turns)
+            with stats.lock:
+                stats.sessions += 1
+            if args.think_ms:
+                time.sleep(args.think_ms / 1000.0)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for future in [pool.submit(virtual_user) for _ in range(args.concurrency)]:
+            future.result()
+    summary = summarize(stats, time.perf_counter() - start)
+
+    print_report(summary)
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
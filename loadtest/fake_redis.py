@@ -0,0 +1,197 @@
+"""
+Local stand-in for a Redis-protocol server, for testing the shared cache tier.
+
+Speaks enough RESP2 for shared_cache.RESPBackend (PING, AUTH, SELECT, GET,
+SET with EX/PX/NX/XX, DEL, EXISTS, MGET, DBSIZE, FLUSHDB). Run it, then point
+the app at it:
+
+    python -m loadtest.fake_redis --port 6390
+    SHARED_CACHE_URL=redis://127.0.0.1:6390/0 python app.py
+
+Several app processes (or gunicorn workers) pointed at one stand-in share
+their caches, exactly as they would with a real server. Latency and
+connection drops are injectable.
+"""
+
+import argparse # CLI options
+import random # Fault injection
+import socketserver # Threaded TCP server
+import threading # Keyspace lock
+import time # Expiry and simulated latency
+
+
+class Keyspace:
+    """Expiring byte-string store shared by every connection (one per DB index)."""
+    def __init__(self):
+        self._data = {}  # key → (value, expires_at or None)
+        self._lock = threading.Lock()
+
+    def _live(self, key, now):
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= now:
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key, time.time())
+            return entry[0] if entry else None
+
+    def set(self, key, value, ttl=None, nx=False, xx=False):
+        with self._lock:
+            now = time.time()
+            exists = self._live(key, now) is not None
+            if (nx and exists) or (xx and not exists):
+                return False
+            self._data[key] = (value, now + ttl if ttl else None)
+            return True
+
+    def delete(self, keys):
+        with self._lock:
+            now = time.time()
+            return sum(1 for k in keys if self._live(k, now) is not None and self._data.pop(k, None))
+
+    def size(self):
+        with self._lock:
+            now = time.time()
+            return sum(1 for k in list(self._data) if self._live(k, now) is not None)
+
+    def flush(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RESPHandler(socketserver.StreamRequestHandler):
+    """One client connection: reads RESP arrays, answers RESP replies."""
+    keyspaces = {}
+    password = None
+    latency_ms = 0.0
+    drop_rate = 0.0
+
+    def _reply(self, value):
+        if value is None:
+            out = b'$-1\r\n'
+        elif value is True:
+            out = b'+OK\r\n'
+        elif isinstance(value, int):
+            out = b':%d\r\n' % value
+        elif isinstance(value, Exception):
+            out = b'-ERR %s\r\n' % str(value).encode()
+        elif isinstance(value, list):
+            self.wfile.write(b'*%d\r\n' % len(value))
+            for item in value:
+                self._reply(item)
+            return
+        else:
+            out = b'$%d\r\n%s\r\n' % (len(value), value)
+        self.wfile.write(out)
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            return line.split()  # Inline command (e.g. typed into telnet)
+        args = []
+        for _ in range(int(line[1:])):
+            size = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    def handle(self):
+        db, authed = 0, self.password is None
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            if not args:
+                continue
+            if self.latency_ms:
+                time.sleep(self.latency_ms / 1000.0)
+            if self.drop_rate and random.random() < self.drop_rate:
+                return  # Injected connection drop
+            name = args[0].upper()
+            if name == b'AUTH':
+                authed = self.password is None or args[-1].decode() == self.password
+                self._reply(True if authed else ValueError("invalid password"))
+                continue
+            if not authed:
+                self._reply(ValueError("NOAUTH Authentication required."))
+                continue
+            if name == b'SELECT':
+                db = int(args[1])
+                self._reply(True)
+                continue
+            if name == b'QUIT':
+                self._reply(True)
+                return
+            self._reply(self._execute(self.keyspaces.setdefault(db, Keyspace()), name, args[1:]))
+
+    @staticmethod
+    def _execute(space, name, args):
+        try:
+            if name == b'PING':
+                return args[0] if args else b'PONG'
+            if name == b'GET':
+                return space.get(args[0])
+            if name == b'MGET':
+                return [space.get(k) for k in args]
+            if name == b'SET':
+                ttl, nx, xx = None, False, False
+                options = [a.upper() for a in args[2:]]
+                for i, opt in enumerate(options):
+                    if opt == b'EX':
+                        ttl = float(options[i + 1])
+                    elif opt == b'PX':
+                        ttl = float(options[i + 1]) / 1000.0
+                    nx, xx = nx or opt == b'NX', xx or opt == b'XX'
+                return True if space.set(args[0], args[1], ttl, nx, xx) else None
+            if name == b'DEL':
+                return space.delete(args)
+            if name == b'EXISTS':
+                return sum(1 for k in args if space.get(k) is not None)
+            if name == b'DBSIZE':
+                return space.size()
+            if name == b'FLUSHDB':
+                space.flush()
+                return True
+        except (IndexError, ValueError) as e:
+            return ValueError(f"syntax error ({e})")
+        return ValueError(f"unknown command '{name.decode(errors='replace')}'")
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def serve(port=6390, host="127.0.0.1", password=None, latency_ms=0.0, drop_rate=0.0):
+    """Starts the stand-in on a background thread and returns the server (port 0 → any free port)."""
+    handler = type("RESPHandler", (RESPHandler,), {
+        "keyspaces": {}, "password": password, "latency_ms": latency_ms, "drop_rate": drop_rate})
+    server = FakeRedisServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local Redis-protocol stand-in for the shared cache.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    parser.add_argument("--password", default=None)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added to every command")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Fraction of commands that drop the connection")
+    args = parser.parse_args()
+
+    server = serve(args.port, args.host, args.password, args.latency_ms, args.drop_rate)
+    print(f"Fake Redis → redis://{args.host}:{server.server_address[1]}/0  (set SHARED_CACHE_URL)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
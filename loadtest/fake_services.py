@@ -0,0 +1,245 @@
+"""
+Local stand-ins for the Groq chat-completions API and the YouTube Data API v3.
+
+Lets the Flask app be load-tested offline. Point the app at these servers with:
+
+    GROQ_API_KEY=fake GROQ_BASE_URL=http://127.0.0.1:8091
+    YOUTUBE_API_KEY=fake YOUTUBE_API_BASE=http://127.0.0.1:8092/youtube/v3
+
+Latency, jitter, 5xx errors and 429 rate limiting are injectable per service.
+"""
+
+import argparse # CLI options
+import json # Response bodies
+import random # Latency jitter and fault injection
+import threading # Run both servers side by side
+import time # Simulated latency
+import urllib.parse # Query-string parsing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer # Stdlib HTTP server
+
+
+class FaultProfile:
+    """Latency and failure-injection settings for one fake service."""
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, rate_limit_rate=0.0, retry_after=1):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+
+    def sleep(self):
+        """Blocks for the configured latency plus uniform jitter."""
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    def pick_fault(self):
+        """Returns 429, 500 or None according to the configured rates."""
+        roll = random.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 500
+        return None
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    """Shared helpers for the fake API handlers."""
+    profile = FaultProfile()
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        """Silences per-request access logs; they would dominate load-test output."""
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(raw or b"{}")
+        except ValueError:
+            return {}
+
+    def _inject_fault(self):
+        """Applies latency and, if rolled, answers with an error. Returns True if handled."""
+        self.profile.sleep()
+        fault = self.profile.pick_fault()
+        if fault == 429:
+            self._send_json(429, self._rate_limit_body(), {"Retry-After": str(self.profile.retry_after)})
+            return True
+        if fault == 500:
+            self._send_json(500, {"error": {"message": "Injected upstream failure", "type": "server_error"}})
+            return True
+        return False
+
+    def _rate_limit_body(self):
+        return {"error": {"message": "Rate limit reached (injected)", "type": "rate_limit_exceeded"}}
+
+
+# =============================================
+# FAKE GROQ (OpenAI-compatible chat completions)
+# =============================================
+
+_FAKE_RESUME_CONTEXT = {
+    "name": "Load Test Candidate",
+    "email": "candidate@example.com",
+    "current_status": "working",
+    "years_experience": 4,
+    "education": ["B.Tech Computer Science"],
+    "skills": ["Python", "SQL", "Docker", "React"],
+    "experience": [{
+        "title": "Software Engineer",
+        "company": "Example Corp",
+        "duration": "2021 - Present",
+        "responsibilities": ["Built APIs", "Maintained CI pipelines", "Mentored interns"],
+    }],
+    "career_interests": ["Backend Development", "DevOps"],
+    "recent_role": "Software Engineer",
+    "industry": "Software",
+}
+
+_FAKE_REPLIES = [
+    "That's a great goal. Focus first on the compulsory skills for your target role.\n- Build one end-to-end project\n- Document it publicly\nWhat timeline are you working with?",
+    "Based on your background, a 3-month plan is realistic.\n- Month 1: fundamentals\n- Month 2: a portfolio project\n- Month 3: interview prep\nWhich of these feels hardest right now?",
+]
+
+
+class FakeGroqHandler(_JSONHandler):
+    """Answers POST /openai/v1/chat/completions like the Groq API."""
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Unknown path"}})
+            return
+        body = self._read_json()
+        if self._inject_fault():
+            return
+
+        wants_json = (body.get("response_format") or {}).get("type") == "json_object"
+        content = json.dumps(_FAKE_RESUME_CONTEXT) if wants_json else random.choice(_FAKE_REPLIES)
+        prompt_chars = sum(len(m.get("content") or "") for m in body.get("messages", []))
+        self._send_json(200, {
+            "id": f"chatcmpl-fake-{random.getrandbits(48):x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "llama-3.3-70b-versatile"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_chars // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": (prompt_chars + len(content)) // 4,
+            },
+        })
+
+
+# =============================================
+# FAKE YOUTUBE DATA API v3
+# =============================================
+
+class FakeYouTubeHandler(_JSONHandler):
+    """Answers GET /youtube/v3/search and /youtube/v3/videos."""
+
+    def _rate_limit_body(self):
+        return {"error": {"code": 429, "message": "Quota exceeded (injected)",
+                          "errors": [{"reason": "quotaExceeded"}]}}
+
+    def do_GET(self):
+        parsed = urllib.parse.urlparse(self.path)
+        params = urllib.parse.parse_qs(parsed.query)
+        route = parsed.path.rstrip("/").rsplit("/", 1)[-1]
+        if route not in ("search", "videos"):
+            self._send_json(404, {"error": {"message": "Unknown path"}})
+            return
+        if self._inject_fault():
+            return
+
+        if route == "search":
+            query = params.get("q", ["tutorial"])[0].replace('"', "")
+            count = int(params.get("maxResults", ["25"])[0])
+            items = [{
+                "id": {"kind": "youtube#video", "videoId": f"fake{abs(hash((query, i))) % 10**7:07d}"},
+                "snippet": {
+                    "title": f"{query} – part {i + 1}",
+                    "channelTitle": f"Fake Channel {i % 5}",
+                },
+            } for i in range(count)]
+            self._send_json(200, {"kind": "youtube#searchListResponse", "items": items})
+            return
+
+        ids = [v for v in params.get("id", [""])[0].split(",") if v]
+        items = []
+        for vid in ids:
+            minutes = random.choice([4, 12, 25, 45, 75, 150])
+            items.append({
+                "id": vid,
+                "contentDetails": {"duration": f"PT{minutes // 60}H{minutes % 60}M{random.randint(0, 59)}S"},
+                "statistics": {"viewCount": str(random.randint(1_000, 5_000_000))},
+            })
+        self._send_json(200, {"kind": "youtube#videoListResponse", "items": items})
+
+
+def _make_handler(base, profile):
+    """Binds a fault profile to a handler class without sharing state between services."""
+    return type(base.__name__, (base,), {"profile": profile})
+
+
+def serve(groq_port, youtube_port, groq_profile, youtube_profile, host="127.0.0.1"):
+    """Starts both fake servers on background threads and returns them."""
+    servers = [
+        ThreadingHTTPServer((host, groq_port), _make_handler(FakeGroqHandler, groq_profile)),
+        ThreadingHTTPServer((host, youtube_port), _make_handler(FakeYouTubeHandler, youtube_profile)),
+    ]
+    for srv in servers:
+        srv.daemon_threads = True
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return servers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run local Groq and YouTube stand-ins for load testing.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--groq-port", type=int, default=8091)
+    parser.add_argument("--youtube-port", type=int, default=8092)
+    for svc, latency in (("groq", 800), ("youtube", 150)):
+        parser.add_argument(f"--{svc}-latency-ms", type=float, default=latency)
+        parser.add_argument(f"--{svc}-jitter-ms", type=float, default=latency / 4)
+        parser.add_argument(f"--{svc}-error-rate", type=float, default=0.0, help="Fraction of 500 responses")
+        parser.add_argument(f"--{svc}-429-rate", type=float, default=0.0, help="Fraction of 429 responses")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    args = parser.parse_args()
+
+    def profile(svc):
+        return FaultProfile(
+            latency_ms=getattr(args, f"{svc}_latency_ms"),
+            jitter_ms=getattr(args, f"{svc}_jitter_ms"),
+            error_rate=getattr(args, f"{svc}_error_rate"),
+            rate_limit_rate=getattr(args, f"{svc}_429_rate"),
+            retry_after=args.retry_after,
+        )
+
+    serve(args.groq_port, args.youtube_port, profile("groq"), profile("youtube"), host=args.host)
+    print(f"Fake Groq    → http://{args.host}:{args.groq_port}  (set GROQ_BASE_URL)")
+    print(f"Fake YouTube → http://{args.host}:{args.youtube_port}/youtube/v3  (set YOUTUBE_API_BASE)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Per-worker memory footprint report.
+
+Two views of the same process:
+  - `process`: what the kernel charges, from /proc/self/smaps, split into the
+    mmapped weight files, other file mappings (libraries) and anonymous memory
+    (Python/torch heaps). `shared` pages are counted once per box however many
+    workers map them; `private` pages are paid per worker. `pss` divides shared
+    pages among their users, so summing it over workers gives the real total.
+  - `components`: estimated bytes held by the model (mmapped vs heap tensors),
+    the tokenizer, the vocabulary/knowledge structures and every LRU cache.
+
+Exposed on GET /api/admin/memory; run `python memory_report.py` for the same
+report after loading the predictor once.
+"""
+
+import json # CLI output
+import os # pid and platform checks
+import sys # getsizeof
+import types # Objects deep_size must not descend into
+
+try:
+    import resource # Peak RSS fallback where /proc is unavailable (POSIX only)
+except ImportError:
+    resource = None
+
+from cache import live_caches
+
+_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def _read_smaps(path='/proc/self/smaps'):
+    """Yields (start, end, pathname, {field: bytes}) per mapping."""
+    current = None
+    with open(path, 'r') as f:
+        for line in f:
+            head, _, rest = line.partition(' ')
+            if '-' in head and not head.endswith(':'):
+                if current is not None:
+                    yield current
+                start, end = (int(x, 16) for x in head.split('-'))
+                parts = rest.split(None, 4)
+                current = (start, end, parts[4].strip() if len(parts) > 4 else '', {})
+            elif current is not None and head[:-1] in _FIELDS:
+                current[3][head[:-1]] = int(rest.split()[0]) * 1024
+    if current is not None:
+        yield current
+
+
+def _bucket():
+    return {"rss": 0, "pss": 0, "shared": 0, "private": 0}
+
+
+def _add(bucket, fields):
+    bucket["rss"] += fields.get("Rss", 0)
+    bucket["pss"] += fields.get("Pss", 0)
+    bucket["shared"] += fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)
+    bucket["private"] += fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+
+
+def process_memory(weight_files=()):
+    """
+    Resident/shared/private bytes for this process, plus the address ranges of the
+    weight file mappings (used to tell mmapped tensors from heap tensors).
+    """
+    weight_files = {os.path.realpath(p) for p in weight_files}
+    totals = {"total": _bucket(), "weights_mmap": _bucket(), "other_files": _bucket(), "anonymous": _bucket()}
+    weight_ranges = []
+    try:
+        mappings = list(_read_smaps())
+    except OSError:
+        # No /proc (macOS, some containers): peak RSS is all we can report; Windows reports none
+        if resource is not None:
+            scale = 1 if sys.platform == 'darwin' else 1024
+            totals["total"]["rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+        return totals, weight_ranges
+    for start, end, pathname, fields in mappings:
+        _add(totals["total"], fields)
+        if pathname in weight_files:
+            _add(totals["weights_mmap"], fields)
+            weight_ranges.append((start, end))
+        elif pathname.startswith('/'):
+            _add(totals["other_files"], fields)
+        else:
+            _add(totals["anonymous"], fields)
+    return totals, weight_ranges
+
+
+def deep_size(obj, _seen=None):
+    """Approximate bytes reachable from obj through containers and plain objects."""
+    seen = set() if _seen is None else _seen
+    stack = [obj]
+    total = 0
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o, 0)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        elif hasattr(o, '__dict__') and not isinstance(o, (type, types.ModuleType, types.FunctionType)):
+            stack.append(vars(o))
+    return total
+
+
+def _tensor_bytes(model, weight_ranges):
+    """(mmapped, heap) bytes across the model's parameters and buffers."""
+    mapped = heap = 0
+    seen = set()
+    for tensor in list(model.parameters()) + list(model.buffers()):
+        ptr = tensor.data_ptr()
+        if ptr in seen:
+            continue  # Tied weights
+        seen.add(ptr)
+        nbytes = tensor.numel() * tensor.element_size()
+        if any(start <= ptr < end for start, end in weight_ranges):
+            mapped += nbytes
+        else:
+            heap += nbytes
+    return mapped, heap
+
+
+def report(predictor):
+    """Full footprint report for this worker and the given (live) predictor."""
+    from weights import mapped_files
+    process, weight_ranges = process_memory(mapped_files(predictor.model_path))
+    mapped, heap = _tensor_bytes(predictor.model, weight_ranges)
+
+    seen = set()
+    vocabulary = deep_size([predictor.all_skills, predictor.structured_data,
+                            predictor.career_metadata, predictor.alias_map], seen)
+    caches = {}
+    for cache in live_caches():
+        label = cache.name or f"unnamed@{id(cache):x}"
+        caches[label] = {"entries": len(cache), "maxsize": cache.maxsize,
+                         "bytes": deep_size(cache.snapshot(), seen)}
+    return {
+        "pid": os.getpid(),
+        "version": predictor.version,
+        "model_type": predictor.model_type,
+        "process": process,
+        "components": {
+            "model": {"mmapped_bytes": mapped, "heap_bytes": heap},
+            "tokenizer_bytes": deep_size(vars(predictor.tokenizer), set()),
+            "vocabulary_bytes": vocabulary,
+            "caches": caches,
+        },
+    }
+
+
+def summary_line(rep):
+    """One-line digest for logs."""
+    mb = lambda n: f"{n / (1 << 20):.0f}MiB"
+    total = rep["process"]["total"]
+    model = rep["components"]["model"]
+    return (f"pid={rep['pid']} rss={mb(total['rss'])} pss={mb(total['pss'])} private={mb(total['private'])} "
+            f"shared={mb(total['shared'])} model_mmap={mb(model['mmapped_bytes'])} "
+            f"model_heap={mb(model['heap_bytes'])}")
+
+
+if __name__ == '__main__':
+    from predictor import current_predictor, warmup
+    warmup()
+    print(json.dumps(report(current_predictor()), indent=2))
@@ -0,0 +1,229 @@
+"""
+Lightweight Prometheus-style metrics (counters, gauges, histograms) with a
+text exposition renderer for the /metrics endpoint.
+
+Kept dependency-free and cheap on the hot path: a labelled child is looked up
+once per call from a dict, and each update is a lock-protected add (plus a
+bisect for histograms). Values are per process; under gunicorn each worker
+exposes its own series, so scrape workers individually or sum by instance.
+"""
+
+import bisect # Histogram bucket lookup
+import threading # Per-series update locks
+import time # perf_counter for stage timers
+from contextlib import contextmanager # stage() context manager
+from functools import wraps # timed() decorator
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds. Spans regex-scale stages (sub-ms) up to slow LLM calls.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_REGISTRY = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs.extend(f'{n}="{_escape(v)}"' for n, v in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(v):
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class _Metric:
+    """Base class: owns the labelled children and registers itself for rendering."""
+    kind = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def labels(self, *values):
+        """Returns the child series for the given label values (created on first use)."""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:  # Snapshot: request threads may add series while /metrics is scraped
+            items = sorted(self._children.items())
+        for values, child in items:
+            lines.extend(child.render(self.name, self.labelnames, values))
+        return lines
+
+
+class _ValueChild:
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount=1.0):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value):
+        self._value = float(value)
+
+    @property
+    def value(self):
+        return self._value
+
+    def render(self, name, labelnames, values):
+        return [f"{name}{_format_labels(labelnames, values)} {_format_value(self._value)}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+    kind = "counter"
+
+    def _new_child(self):
+        return _ValueChild()
+
+
+class Gauge(_Metric):
+    """Value that can go up and down (e.g. in-flight requests)."""
+    kind = "gauge"
+
+    def _new_child(self):
+        return _ValueChild()
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        idx = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum += value
+
+    def render(self, name, labelnames, values):
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self._buckets + (float("inf"),), counts):
+            cumulative += count
+            labels = _format_labels(labelnames, values, (("le", _format_value(bound)),))
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        base = _format_labels(labelnames, values)
+        lines.append(f"{name}_sum{base} {_format_value(total)}")
+        lines.append(f"{name}_count{base} {cumulative}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observations (latencies in seconds)."""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+
+def render():
+    """Renders every registered metric in Prometheus text exposition format."""
+    lines = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Application metrics
+# ---------------------------------------------------------------------------
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests handled, by route and status.",
+                        ("route", "method", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "End-to-end request latency by route.", ("route",))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being processed, by route.", ("route",))
+
+STAGE_LATENCY = Histogram("stage_duration_seconds",
+                          "Latency of internal pipeline stages (parse, regex, inference, LLM, YouTube).",
+                          ("stage",))
+STAGE_ERRORS = Counter("stage_errors_total", "Stages that raised or returned an upstream error.", ("stage",))
+
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by cache name and result (hit/miss).",
+                         ("cache", "result"))
+INFERENCE_BATCH_SIZE = Histogram("inference_batch_size", "Items per micro-batched model forward pass.",
+                                 ("model",), buckets=(1, 2, 4, 8, 16, 32, 64))
+SINGLEFLIGHT_CALLS = Counter("singleflight_calls_total",
+                             "Coalesced calls by group and role (leader computed, follower shared, retry after a leader-specific error).",
+                             ("group", "role"))
+ADMISSION_ACTIVE = Gauge("admission_active", "Requests holding a slot, by resource class.", ("resource",))
+ADMISSION_QUEUE_DEPTH = Gauge("admission_queue_depth", "Requests waiting for a slot, by resource class.",
+                              ("resource",))
+ADMISSION_REJECTED = Counter("admission_rejected_total", "Requests shed, by resource class and reason.",
+                             ("resource", "reason"))
+STUDY_PLAN_RESOURCES = Counter("study_plan_resources_total",
+                               "Per-skill resource lookups by source (youtube or fallback).", ("source",))
+
+
+@contextmanager
+def stage(name):
+    """Times a block into stage_duration_seconds{stage=name}; counts exceptions as errors."""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.labels(name).inc()
+        raise
+    finally:
+        STAGE_LATENCY.labels(name).observe(time.perf_counter() - start)
+
+
+def timed(name):
+    """Decorator form of stage()."""
+    def decorator(fn):
+        child = STAGE_LATENCY.labels(name)
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                STAGE_ERRORS.labels(name).inc()
+                raise
+            finally:
+                child.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def record_cache(cache, hit):
+    """Counts one cache lookup as a hit or a miss."""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
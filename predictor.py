@@ -5,14 +5,33 @@ and extracting skills from text using a trained BERT model.
 
 import os # OS utilities for environment and paths
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE" # Prevent duplicate library execution errors
-import re # regex for skill extraction
 import json # metadata parsing
+import hashlib # model / knowledge version fingerprints
 import difflib # Built-in fuzzy string similarity — no extra install needed
 import torch # Main deep learning framework
-from transformers import BertTokenizer, BertForSequenceClassification # BERT model and tokenizer
+from transformers import BertTokenizer # WordPiece tokenizer
 
+import metrics
+import weights
+from shared_cache import TieredCache
+import skill_ontology
+from skill_ontology import SkillOntology
+from roadmaps import RoadmapCatalog
+from inference import MicroBatcher
+from student_model import EmbeddingBagSkillModel, MODEL_TYPE as EMBEDDING_BAG
 
 
+# Inference service tuning (see inference.MicroBatcher)
+INFERENCE_BATCH_WINDOW_MS = float(os.environ.get('INFERENCE_BATCH_WINDOW_MS', '5'))
+INFERENCE_MAX_BATCH = int(os.environ.get('INFERENCE_MAX_BATCH', '32'))
+TITLE_CACHE_SIZE = int(os.environ.get('TITLE_CACHE_SIZE', '4096'))
+
+# Serving model directory: the full BERT model or a distilled student (trainer.py --mode distill)
+SKILL_MODEL_PATH = os.environ.get('SKILL_MODEL_PATH', 'final_skill_model')
+
+SKILL_THRESHOLD = 0.5 # Sigmoid confidence above which a skill counts as required
+SKILL_TIERS = ("beginner", "compulsory", "intermediate", "advanced", "next_steps")
+
 CAREER_METADATA = {
     "Frontend Developer": "Crafts the visual and interactive elements of websites and applications using modern web technologies.",
     "Backend Developer": "Builds and maintains the server-side logic, databases, and APIs that power application functionality.",
@@ -90,9 +109,10 @@ _ALIAS_MAP = {
 }
 
 
-def validate_domain_input(target_domain: str) -> dict:
+def validate_domain_input(target_domain: str, predictor=None) -> dict:
     """
-    Validates whether a user-supplied career domain string is recognisable.
+    Validates whether a user-supplied career domain string is recognisable
+    against the domains and aliases of `predictor` (default: the live one).
 
     Three-stage pipeline (short-circuits on first match):
       1. Alias map — exact pre-defined shorthands (e.g. 'devops', 'qa').
@@ -110,14 +130,16 @@ def validate_domain_input(target_domain: str) -> dict:
     if not target_domain or not target_domain.strip():
         return {"valid": False, "matched_domain": None, "score": 0.0, "error": "INVALID_DOMAIN"}
 
+    predictor = predictor or current_predictor()
+    alias_map = predictor.alias_map
     normalised = target_domain.lower().strip()
-    known_domains = list(CAREER_METADATA.keys())
+    known_domains = list(predictor.career_metadata.keys())
 
     # ── Stage 1: Alias map (exact) ────────────────────────────────────────────
-    if normalised in _ALIAS_MAP:
+    if normalised in alias_map:
         return {
             "valid": True,
-            "matched_domain": _ALIAS_MAP[normalised],
+            "matched_domain": alias_map[normalised],
             "score": 1.0,
             "error": None,
         }
@@ -162,9 +184,10 @@ def validate_domain_input(target_domain: str) -> dict:
 
 class CareerPredictor:
     """Class to handle career prediction and skill gap analysis using a BERT model."""
-    def __init__(self):
+    def __init__(self, model_path=None):
         """Initializes the BERT model, tokenizer, and skill metadata."""
-        self.model_path = os.path.abspath('final_skill_model')
+        # Resolved once: SKILL_MODEL_PATH may be a symlink that is switched to the next release
+        self.model_path = os.path.realpath(model_path or SKILL_MODEL_PATH)
         
         # Load the Skill Metadata (The AI's "Vocabulary" AND Structure)
         meta_path = os.path.join(self.model_path, 'skill_meta.json')
@@ -172,30 +195,113 @@ class CareerPredictor:
             meta = json.load(f)
             self.all_skills = meta['all_skills']
             self.structured_data = meta.get('structured_data', {})
+            self.model_type = meta.get('model_type', 'bert')
+            # Domain descriptions / aliases ship with the knowledge when present, so a reload picks them up
+            self.career_metadata = meta.get('career_metadata') or CAREER_METADATA
+            self.alias_map = {k.lower(): v for k, v in (meta.get('aliases') or _ALIAS_MAP).items()}
+
+        # One canonical ID per skill, shared by extraction, scoring and study-plan lookups
+        self.ontology = SkillOntology(self.all_skills + [s for job_info in self.structured_data.values()
+                                                         for tier in SKILL_TIERS for s in job_info.get(tier, [])])
         
-        # Load the AI Brain
+        # Load the AI Brain (full BERT or a distilled student; both share the tokenizer and calling convention)
         self.tokenizer = BertTokenizer.from_pretrained(self.model_path, local_files_only=True)
-        self.model = BertForSequenceClassification.from_pretrained(self.model_path, local_files_only=True)
+        if self.model_type == EMBEDDING_BAG:
+            self.model = EmbeddingBagSkillModel.from_pretrained(self.model_path)
+        else:
+            # Weights are mmapped read-only so every worker shares one page-cache copy
+            self.model = weights.load_bert_classifier(self.model_path)
         self.model.eval()
 
-    def get_model_required_skills(self, domain_name):
-        """Asks the model what skills are needed for a specific job title."""
-        inputs = self.tokenizer(domain_name, return_tensors="pt", padding=True, truncation=True, max_length=32)
-        with torch.no_grad():
+        self.knowledge_version, self.model_version = self._fingerprint(meta_path)
+        self.version = f"{self.model_version}-{self.knowledge_version}"
+        # Static per-domain roadmaps, rendered once; addressed by knowledge version only
+        self.roadmaps = RoadmapCatalog(self.structured_data, self.career_metadata, self.knowledge_version)
+
+        # Only the batcher's worker thread touches the model; request threads queue titles
+        self._batcher = MicroBatcher(self._predict_batch, max_batch_size=INFERENCE_MAX_BATCH,
+                                     max_wait_ms=INFERENCE_BATCH_WINDOW_MS, name="skill_model")
+        # Shared across workers when SHARED_CACHE_URL is set; scoped to this model + knowledge
+        self._title_cache = TieredCache("title_skills", maxsize=TITLE_CACHE_SIZE, namespace=self.version)
+
+    def _fingerprint(self, meta_path):
+        """
+        Short content hashes of the knowledge (skill_meta.json + domain descriptions)
+        and of the model artifacts. Anything cached on analysis output keys on these.
+        """
+        knowledge = hashlib.sha256()
+        with open(meta_path, 'rb') as f:
+            knowledge.update(f.read())
+        knowledge.update(json.dumps([self.career_metadata, self.alias_map], sort_keys=True).encode())
+
+        model = hashlib.sha256()
+        for name in sorted(os.listdir(self.model_path)):
+            path = os.path.join(self.model_path, name)
+            if name.endswith('.json') and name != 'skill_meta.json':
+                with open(path, 'rb') as f:
+                    model.update(f.read())
+            elif name.endswith(('.safetensors', '.bin')):
+                # Size plus head/tail bytes: cheap, and any retrain rewrites both
+                size = os.path.getsize(path)
+                model.update(f"{name}:{size}".encode())
+                with open(path, 'rb') as f:
+                    model.update(f.read(1 << 20))
+                    f.seek(max(0, size - (1 << 20)))
+                    model.update(f.read())
+        return knowledge.hexdigest()[:12], model.hexdigest()[:12]
+
+    def close(self):
+        """Stops the inference worker; late callers on a retired predictor run inline."""
+        self._batcher.close()
+
+    @staticmethod
+    def normalize_title(title):
+        """Canonical cache key for a job title (the tokenizer is uncased anyway)."""
+        return " ".join(title.lower().split())
+
+    def _predict_batch(self, titles):
+        """One forward pass for a batch of titles → list of predicted skill tuples."""
+        inputs = self.tokenizer(titles, return_tensors="pt", padding=True, truncation=True, max_length=32)
+        with metrics.stage("bert_inference"), torch.no_grad():
             logits = self.model(**inputs).logits
             # Sigmoid for multi-label classification
-            probs = torch.sigmoid(logits).squeeze().numpy()
-        
+            probs = torch.sigmoid(logits)
+
         # We pick skills the model thinks are relevant (> 0.5 confidence for strict matching)
-        required = [self.all_skills[i] for i, p in enumerate(probs) if p > 0.5]
-        
+        return [tuple(self.all_skills[i] for i in torch.nonzero(row > SKILL_THRESHOLD).flatten().tolist())
+                for row in probs]
+
+    def predict_titles(self, titles):
+        """
+        Predicted skills for each title (any free text, not just canonical domains).
+        Cache misses are submitted together so concurrent callers share forward passes.
+        """
+        keys = [self.normalize_title(t) for t in titles]
+        results = {k: self._title_cache.get(k) for k in dict.fromkeys(keys)}
+        misses = [k for k, v in results.items() if v is None]
+        if misses:
+            futures = [self._batcher.submit(k) for k in misses]
+            for k, f in zip(misses, futures):
+                results[k] = f.result()
+                self._title_cache.put(k, results[k])
+        return [results[k] for k in keys]
+
+    def predict_title(self, title):
+        """Predicted skills for a single free-text job title."""
+        return self.predict_titles([title])[0]
+
+    def _required_with_fallback(self, domain_name, predicted):
+        required = list(predicted)
         # Fallback to structured data if model is under-confident (for safety)
         if not required and domain_name in self.structured_data:
             job_data = self.structured_data[domain_name]
             for tier in ["beginner", "compulsory", "intermediate", "advanced"]:
                 required.extend(job_data.get(tier, []))
-        
-        return list(set(required)) # Remove duplicates
+        return list(dict.fromkeys(required)) # Remove duplicates, keep order
+
+    def get_model_required_skills(self, domain_name):
+        """Asks the model what skills are needed for a specific job title."""
+        return self._required_with_fallback(domain_name, self.predict_title(domain_name))
 
     def get_best_category(self, target_domain, pre_validated_domain=None):
         """
@@ -209,8 +315,8 @@ class CareerPredictor:
 
         # Fallback path (should not normally be reached after validation)
         target = target_domain.lower().strip()
-        if target in _ALIAS_MAP:
-            return _ALIAS_MAP[target]
+        if target in self.alias_map:
+            return self.alias_map[target]
 
         available_domains = self.structured_data.keys()
         for domain in available_domains:
@@ -236,7 +342,7 @@ class CareerPredictor:
         # Guard: if no pre-validated domain was passed, run validation now.
         # This provides a safety net even if called directly (e.g. from tests).
         if not pre_validated_domain:
-            validation = validate_domain_input(target_domain)
+            validation = validate_domain_input(target_domain, self)
             if not validation["valid"]:
                 raise ValueError("INVALID_DOMAIN")
             pre_validated_domain = validation["matched_domain"]
@@ -244,9 +350,10 @@ class CareerPredictor:
         category_key = self.get_best_category(target_domain, pre_validated_domain)
         all_required = self.get_model_required_skills(category_key)
         
-        resume_skills_lower = [s.lower() for s in resume_skills]
-        found = [s for s in all_required if s.lower() in resume_skills_lower]
-        missing = [s for s in all_required if s.lower() not in resume_skills_lower]
+        # Compared by canonical ID, so "ReactJS" on the resume satisfies "React"
+        resume_keys = self.ontology.keys(resume_skills)
+        found = [s for s in all_required if self.ontology.key(s) in resume_keys]
+        missing = [s for s in all_required if self.ontology.key(s) not in resume_keys]
         
         score = (len(found) / len(all_required) * 100) if all_required else 0
         status_text = f"Match Level: {round(score, 1)}%"
@@ -263,11 +370,11 @@ class CareerPredictor:
         # Fetch tiered data for roadmap from structured_data
         job_info = self.structured_data.get(category_key, {})
         missing_by_tier = {
-            "beginner": [s for s in job_info.get("beginner", []) if s.lower() not in resume_skills_lower],
-            "compulsory": [s for s in job_info.get("compulsory", []) if s.lower() not in resume_skills_lower],
-            "intermediate": [s for s in job_info.get("intermediate", []) if s.lower() not in resume_skills_lower],
-            "advanced": [s for s in job_info.get("advanced", []) if s.lower() not in resume_skills_lower],
-            "next_steps": [s for s in job_info.get("next_steps", []) if s.lower() not in resume_skills_lower]
+            "beginner": [s for s in job_info.get("beginner", []) if self.ontology.key(s) not in resume_keys],
+            "compulsory": [s for s in job_info.get("compulsory", []) if self.ontology.key(s) not in resume_keys],
+            "intermediate": [s for s in job_info.get("intermediate", []) if self.ontology.key(s) not in resume_keys],
+            "advanced": [s for s in job_info.get("advanced", []) if self.ontology.key(s) not in resume_keys],
+            "next_steps": [s for s in job_info.get("next_steps", []) if self.ontology.key(s) not in resume_keys]
         }
         
         all_by_tier = {
@@ -303,29 +410,33 @@ class CareerPredictor:
             "all_skills_by_tier": all_by_tier,
             "alt_domain": alt_domain,
             "alt_missing_by_tier": alt_missing_by_tier,
-            "description": CAREER_METADATA.get(category_key, "")
+            "description": self.career_metadata.get(category_key, "")
         }
 
+    @metrics.timed("analyze_confused")
     def analyze_confused(self, resume_skills):
         """Analyzes all career paths to find those with >= 30% match."""
         results = []
-        resume_skills_lower = [s.lower() for s in resume_skills]
+        resume_keys = self.ontology.keys(resume_skills)
         
-        for domain in self.structured_data.keys():
-            required = self.get_model_required_skills(domain)
+        domains = list(self.structured_data.keys())
+        # One batched lookup for every domain instead of a forward pass per domain
+        predictions = self.predict_titles(domains)
+        for domain, predicted in zip(domains, predictions):
+            required = self._required_with_fallback(domain, predicted)
             if not required: continue
             
-            found = [s for s in required if s.lower() in resume_skills_lower]
+            found = [s for s in required if self.ontology.key(s) in resume_keys]
             score = (len(found) / len(required)) * 100
             
             if score >= 30:
                 job_info = self.structured_data.get(domain, {})
                 m_by_tier = {
-                    "beginner": [s for s in job_info.get("beginner", []) if s.lower() not in resume_skills_lower],
-                    "compulsory": [s for s in job_info.get("compulsory", []) if s.lower() not in resume_skills_lower],
-                    "intermediate": [s for s in job_info.get("intermediate", []) if s.lower() not in resume_skills_lower],
-                    "advanced": [s for s in job_info.get("advanced", []) if s.lower() not in resume_skills_lower],
-                    "next_steps": [s for s in job_info.get("next_steps", []) if s.lower() not in resume_skills_lower]
+                    "beginner": [s for s in job_info.get("beginner", []) if self.ontology.key(s) not in resume_keys],
+                    "compulsory": [s for s in job_info.get("compulsory", []) if self.ontology.key(s) not in resume_keys],
+                    "intermediate": [s for s in job_info.get("intermediate", []) if self.ontology.key(s) not in resume_keys],
+                    "advanced": [s for s in job_info.get("advanced", []) if self.ontology.key(s) not in resume_keys],
+                    "next_steps": [s for s in job_info.get("next_steps", []) if self.ontology.key(s) not in resume_keys]
                 }
                 
                 # Also provide ALL skills per tier for the roadmap
@@ -343,7 +454,7 @@ class CareerPredictor:
                 
                 results.append({
                     "domain": domain,
-                    "description": CAREER_METADATA.get(domain, ""),
+                    "description": self.career_metadata.get(domain, ""),
                     "score": round(score, 1),
                     "missing_count": len(missing_skills),
                     "missing_skills": missing_skills,
@@ -354,38 +465,92 @@ class CareerPredictor:
         return sorted(results, key=lambda x: x['score'], reverse=True)
 
 # ---------------------------------------------------------------------------
-# Module-level bridge functions for app.py
+# Live predictor (swapped atomically by hot_reload.ReloadManager)
 # ---------------------------------------------------------------------------
 predictor_instance = CareerPredictor()
+skill_ontology.set_default(predictor_instance.ontology)
 
-def extract_skills_from_text(text):
-    """Scans input text for matches against the global skill vocabulary using regex."""
-    found_skills = set()
-    text_lower = text.lower()
-    
-    # We look for matches in the AI's vocabulary (ALL_SKILLS)
-    # Using regex with word boundaries for precision
-    for skill_entry in predictor_instance.all_skills:
-        # Some entries might be "Skill1/Skill2", handle them
-        variants = [v.strip().lower() for v in skill_entry.split('/')]
-        for v in variants:
-            if not v: continue
-            # Handle skills with special characters (like C++) carefully
-            escaped_v = re.escape(v)
-            # Match if skill is a standalone word
-            pattern = rf'\b{escaped_v}\b'
-            if re.search(pattern, text_lower):
-                found_skills.add(skill_entry)
-                break
-    return list(found_skills)
+def current_predictor():
+    """
+    The predictor serving new requests. Callers read it once and use that object
+    for the whole request, so a concurrent swap never mixes two versions.
+    """
+    return predictor_instance
+
+def load_predictor(model_path=None):
+    """Builds a fresh predictor from `model_path` without touching the live one."""
+    return CareerPredictor(model_path)
+
+def smoke_test(predictor):
+    """
+    Warms a candidate predictor (tokenizer, every domain's prediction into its
+    title cache) and checks it produces usable output. Raises ValueError if not.
+    """
+    if not predictor.all_skills or not predictor.structured_data:
+        raise ValueError("skill vocabulary or structured data is empty")
+    unknown = set(predictor.alias_map.values()) - set(predictor.career_metadata)
+    if unknown:
+        raise ValueError(f"aliases point at unknown domains: {sorted(unknown)[:5]}")
+    warmup(predictor)
+    predicted = predictor.predict_titles(list(predictor.structured_data))
+    if not any(predicted):
+        raise ValueError("model predicted no skills for any domain")
+    if not extract_skills_from_text(_WARMUP_TEXT, predictor):
+        raise ValueError("skill matcher found nothing in the warmup sample")
+
+def swap_predictor(new_predictor):
+    """Publishes `new_predictor` for new requests and returns the retired one."""
+    global predictor_instance
+    old, predictor_instance = predictor_instance, new_predictor
+    skill_ontology.set_default(new_predictor.ontology)
+    return old
+
+# ---------------------------------------------------------------------------
+# Module-level bridge functions for app.py
+# ---------------------------------------------------------------------------
+
+@metrics.timed("skill_extraction")
+def extract_skill_ids(text, predictor=None):
+    """Canonical skill IDs mentioned in the text, in order of first mention (one regex pass)."""
+    return (predictor or current_predictor()).ontology.extract(text)
+
+def extract_skills_from_text(text, predictor=None):
+    """Vocabulary entries mentioned in the text (display names of extract_skill_ids)."""
+    predictor = predictor or current_predictor()
+    return [predictor.ontology.name(i) for i in extract_skill_ids(text, predictor)]
+
+_WARMUP_TEXT = "Python developer with SQL, Docker, React and AWS experience. Skills: Git/GitHub, C++, CI/CD."
+
+def warmup(predictor=None):
+    """
+    Runs one pass through the tokenizer, BERT inference for every domain and the
+    ontology skill matcher so the first real request does not pay lazy-init costs.
+    Returns the number of vocabulary skills the sample text matched.
+    """
+    predictor = predictor or current_predictor()
+    predictor.tokenizer(_WARMUP_TEXT, truncation=True, max_length=32)
+    predictor.analyze_confused(["Python", "SQL"])
+    return len(extract_skills_from_text(_WARMUP_TEXT, predictor))
+
+def model_version():
+    """Identifier of the loaded model + knowledge; changes whenever either does."""
+    return current_predictor().version
+
+def career_domains():
+    """Canonical domain names known to the live predictor."""
+    return list(current_predictor().career_metadata.keys())
+
+def predict_skills_for_title(title):
+    """Wrapper: skills the model associates with an arbitrary free-text job title."""
+    return list(current_predictor().predict_title(title))
 
 def analyze_skill_gap(resume_skills, target_domain, pre_validated_domain=None):
     """
     Wrapper: performs skill-gap analysis for a specific target domain.
     Pass pre_validated_domain from validate_domain_input() to avoid double-validation.
     """
-    return predictor_instance.analyze(resume_skills, target_domain, pre_validated_domain)
+    return current_predictor().analyze(resume_skills, target_domain, pre_validated_domain)
 
 def analyze_confused_paths(resume_skills):
     """Wrapper function to find alternative career paths for the user's skills."""
-    return predictor_instance.analyze_confused(resume_skills)
+    return current_predictor().analyze_confused(resume_skills)
@@ -0,0 +1,167 @@
+"""
+Opt-in, per-request profiling for /api/* routes.
+
+A request is profiled only when it carries `X-Profile: cprofile|sample`
+together with `X-Admin-Token` matching ADMIN_TOKEN, or when
+PROFILE_API_REQUESTS is set to a mode for the whole process. Everything else
+pays a single header lookup.
+
+  cprofile → <dir>/<stamp>_<route>.pstats   (snakeviz, pstats, flameprof)
+  sample   → <dir>/<stamp>_<route>.collapsed (flamegraph.pl, speedscope)
+
+The output directory is bounded to PROFILE_MAX_FILES files (oldest removed first).
+"""
+
+import cProfile # Deterministic profiler
+import hmac # Constant-time token comparison
+import logging # Profiler diagnostics
+import os # Environment configuration and file management
+import re # Route → filename slug
+import sys # Frame sampling
+import threading # Sampler thread and single-profile lock
+import time # Timestamps and sampling interval
+from collections import Counter # Collapsed stack counts
+
+logger = logging.getLogger(__name__)
+
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', '50'))
+PROFILE_SAMPLE_INTERVAL = float(os.environ.get('PROFILE_SAMPLE_INTERVAL_MS', '2')) / 1000.0
+# Process-wide flag: profile every /api/* request in this mode ('' disables)
+PROFILE_API_REQUESTS = os.environ.get('PROFILE_API_REQUESTS', '').strip().lower()
+
+MODES = ("cprofile", "sample")
+
+# cProfile hooks are process-wide on newer Pythons, so only one request is profiled at a time.
+_active_lock = threading.Lock()
+
+
+def is_admin(token):
+    """True if the supplied token matches the configured ADMIN_TOKEN."""
+    return bool(ADMIN_TOKEN) and bool(token) and hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+def requested_mode(path, headers):
+    """Returns the profiling mode for this request, or None when it has not opted in."""
+    if not path.startswith('/api/'):
+        return None
+    if PROFILE_API_REQUESTS:
+        return PROFILE_API_REQUESTS if PROFILE_API_REQUESTS in MODES else "cprofile"
+    mode = headers.get('X-Profile')
+    if not mode:
+        return None
+    mode = mode.strip().lower()
+    if mode not in MODES or not is_admin(headers.get('X-Admin-Token', '')):
+        return None
+    return mode
+
+
+class _StackSampler:
+    """Samples one thread's Python stack at a fixed interval into collapsed-stack counts."""
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            parts = []
+            while frame is not None:
+                code = frame.f_code
+                parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(parts))] += 1
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RequestProfile:
+    """One profiling session wrapping a single request on the current thread."""
+    def __init__(self, mode, route):
+        self.mode = mode
+        self.route = route
+        self._profiler = None
+        self._sampler = None
+        self._stopped = False
+
+    def start(self):
+        if self.mode == "cprofile":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._sampler = _StackSampler(threading.get_ident(), PROFILE_SAMPLE_INTERVAL)
+            self._sampler.start()
+
+    def stop(self):
+        """Stops collection, writes the output file and returns its name (or None on failure)."""
+        if self._stopped:
+            return None
+        self._stopped = True
+        try:
+            if self._profiler is not None:
+                self._profiler.disable()
+            if self._sampler is not None:
+                self._sampler.stop()
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            slug = re.sub(r'[^A-Za-z0-9]+', '_', self.route).strip('_') or 'root'
+            stamp = time.strftime('%Y%m%dT%H%M%S') + f"{time.time() % 1:.6f}"[1:].replace('.', '_')
+            ext = "pstats" if self.mode == "cprofile" else "collapsed"
+            name = f"{stamp}_{slug}.{ext}"
+            path = os.path.join(PROFILE_DIR, name)
+            if self._profiler is not None:
+                self._profiler.dump_stats(path)
+            else:
+                self._sampler.dump(path)
+            _prune(PROFILE_DIR, PROFILE_MAX_FILES)
+            logger.info("[PROFILE] %s request to %s written to %s", self.mode, self.route, path)
+            return name
+        except Exception as e:
+            logger.warning("[PROFILE] Failed to write profile for %s: %s", self.route, e)
+            return None
+        finally:
+            _active_lock.release()
+
+
+def start(mode, route):
+    """Starts a profile if no other request is being profiled; returns it or None."""
+    if not _active_lock.acquire(blocking=False):
+        logger.info("[PROFILE] Skipping %s – another request is being profiled", route)
+        return None
+    session = RequestProfile(mode, route)
+    try:
+        session.start()
+    except Exception as e:
+        _active_lock.release()
+        logger.warning("[PROFILE] Could not start profiler: %s", e)
+        return None
+    return session
+
+
+def _prune(directory, max_files):
+    """Deletes the oldest profile files so at most max_files remain."""
+    entries = [os.path.join(directory, n) for n in os.listdir(directory)
+               if n.endswith(('.pstats', '.collapsed'))]
+    if len(entries) <= max_files:
+        return
+    entries.sort(key=os.path.getmtime)
+    for path in entries[:len(entries) - max_files]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,85 @@
+"""
+JSON response layer: fast serialization, gzip for large bodies, compact mode.
+
+* FastJSONProvider replaces Flask's JSON provider. With orjson installed, it
+  serializes with orjson straight to bytes. Without it, it falls back to
+  compact stdlib json. Every jsonify() in the app goes through it.
+* compress() is an after_request hook. It gzips JSON bodies of at least
+  RESPONSE_GZIP_MIN_BYTES when the client accepts gzip, and weakens the ETag,
+  since the encoded bytes differ from the identity representation.
+* wants_compact() detects compact-mode callers (`?compact=1`,
+  `X-Response-Mode: compact` or `"compact": true` in the body). For those,
+  routes omit fields the client sent or can cache per domain.
+"""
+
+import decimal # Fallback-encoder types
+import gzip # Response compression
+import json # Stdlib fallback when orjson is not installed
+import os # Environment configuration
+
+from flask import request # Accept-Encoding / compact-mode negotiation
+from flask.json.provider import DefaultJSONProvider # Base provider (loads, defaults for odd types)
+
+try:
+    import orjson # Optional: several times faster than json (pip install orjson)
+except ImportError:
+    orjson = None
+
+RESPONSE_GZIP_MIN_BYTES = int(os.environ.get('RESPONSE_GZIP_MIN_BYTES', '1024'))
+RESPONSE_GZIP_LEVEL = int(os.environ.get('RESPONSE_GZIP_LEVEL', '6'))
+
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+
+def _default(o):
+    """Types neither encoder handles natively."""
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    return DefaultJSONProvider.default(o)
+
+
+def dumps_bytes(obj):
+    """Compact JSON as UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson when available."""
+    def dumps(self, obj, **kwargs):
+        return dumps_bytes(obj).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
+
+
+def compress(response):
+    """after_request hook: gzip large JSON bodies for clients that accept it."""
+    if (response.mimetype != 'application/json' or response.direct_passthrough or response.is_streamed
+            or response.status_code in (204, 304) or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    if not request.accept_encodings['gzip']:
+        return response
+    body = response.get_data()
+    if len(body) < RESPONSE_GZIP_MIN_BYTES:
+        return response
+    response.set_data(gzip.compress(body, compresslevel=RESPONSE_GZIP_LEVEL, mtime=0))
+    response.headers['Content-Encoding'] = 'gzip'
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def wants_compact(data=None):
+    """True if the caller asked for the compact response shape."""
+    if request.args.get('compact', '').lower() in ('1', 'true', 'yes'):
+        return True
+    if request.headers.get('X-Response-Mode', '').lower() == 'compact':
+        return True
+    return isinstance(data, dict) and data.get('compact') is True
@@ -0,0 +1,164 @@
+"""
+Token-budget resume compaction for LLM prompts and chatbot context.
+
+Raw resume text is noisy: PDF page headers and footers repeat on every page,
+contact lines and "References available upon request" add nothing, and
+whitespace is inconsistent. compact_resume() works in four steps:
+
+  1. split the text into sections (summary, skills, experience, education, …)
+     by their headings;
+  2. drop boilerplate and lines already seen;
+  3. collapse whitespace;
+  4. fill the token budget: first a few lines of every section, then whole
+     sections in priority order (header, skills, summary, experience, …).
+
+The excerpt keeps document order. A section that only partly fits is cut at a
+line boundary (or a word boundary inside an overlong line), so the result
+never exceeds the budget.
+"""
+
+import os # Environment configuration
+import re # Heading and boilerplate detection
+
+RESUME_TOKEN_BUDGET = int(os.environ.get('RESUME_TOKEN_BUDGET', '1200'))
+CHARS_PER_TOKEN = 4 # Rough estimate for English text with BPE tokenizers
+
+HEADER_LINES = 4 # Lines before the first heading that are kept as the candidate header (name, title)
+SECTION_MIN_LINES = 3 # Lines every section gets before any section gets more
+
+# Section → heading keywords. A line is a heading if, stripped of punctuation, it is short and starts with one.
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "objective", "about me", "career objective"),
+    "skills": ("skills", "technical skills", "core skills", "key skills", "core competencies", "competencies",
+               "technologies", "tech stack", "tools"),
+    "experience": ("experience", "work experience", "professional experience", "employment", "work history",
+                   "career history", "internships", "internship"),
+    "education": ("education", "academic", "qualifications", "certifications", "certificates", "education & certs",
+                  "courses", "training"),
+    "projects": ("projects", "personal projects", "academic projects", "key projects"),
+    "other": ("achievements", "awards", "publications", "languages", "interests", "hobbies", "volunteer",
+              "activities", "references"),
+}
+
+# Fill order; sections not listed come last
+SECTION_PRIORITY = ("header", "skills", "summary", "experience", "education", "projects", "other")
+
+# Page numbers only in page-number forms: a bare number on its own line is usually a date ("2021")
+_BOILERPLATE = re.compile(
+    r'^(page \d{1,3}( of \d{1,3})?|\d{1,3} of \d{1,3}|\d{1,3} ?/ ?\d{1,3}|[-–] ?\d{1,3} ?[-–]|'
+    r'references (are )?available( upon| on)? request\.?|curriculum vitae|resume|r[ée]sum[ée]|cv)$', re.IGNORECASE)
+_DATE_ONLY = re.compile(r'^[\d\s/.\-–]+$|^(present|current)$', re.IGNORECASE) # Repeats are real (one per role)
+_KEYWORD_SECTIONS = {k: section for section, keywords in SECTION_HEADINGS.items() for k in keywords}
+_HEADING_WORDS = re.compile(r'[^a-z& ]+')
+_MAX_HEADING_WORDS = 5
+_MIN_CUT_CHARS = 40 # Shorter tails of a cut line are dropped
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (characters / CHARS_PER_TOKEN)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _section_of(label):
+    """The section a heading keyword names (the whole label, punctuation ignored), or None."""
+    words = " ".join(_HEADING_WORDS.sub(' ', label.lower()).split())
+    if not words or len(words.split()) > _MAX_HEADING_WORDS:
+        return None
+    return _KEYWORD_SECTIONS.get(words)
+
+
+def _heading(line):
+    """
+    (section, inline) for a line that names a section, else (None, False).
+    "Skills" / "SKILLS:" open the section (inline False). "Skills: Python, SQL"
+    is body text belonging to that section (inline True). "Skills in Python"
+    is ordinary body text.
+    """
+    label, colon, rest = line.partition(':')
+    section = _section_of(label)
+    if section is None:
+        return None, False
+    return section, bool(colon and rest.strip())
+
+
+def split_sections(text):
+    """
+    Cleaned, deduplicated lines grouped into sections, in document order:
+    [(section, heading line or None, [lines])]. Lines before the first heading
+    form the 'header' section.
+    """
+    sections = [("header", None, [])]
+    current = sections[0]
+    seen = set()
+    for raw in text.splitlines():
+        line = " ".join(raw.split())
+        if not line or _BOILERPLATE.match(line):
+            continue
+        key = line.lower()
+        if key in seen and not _DATE_ONLY.match(line):
+            continue  # Repeated page headers/footers and copy-pasted bullets
+        seen.add(key)
+        section, inline = _heading(line)
+        if section is None:
+            current[2].append(line)
+        elif inline:
+            # "Skills: Python, SQL" joins that section; the lines after it stay where they were
+            target = next((s for s in reversed(sections) if s[0] == section), None)
+            if target is None:
+                target = (section, None, [])
+                sections.append(target)
+            target[2].append(line)
+        else:
+            current = (section, line, [])
+            sections.append(current)
+    if len(sections) > 1:
+        name, heading, lines = sections[0]
+        if len(lines) > HEADER_LINES:
+            # No heading for the opening block: keep its first lines as the header, the rest as summary
+            sections[0] = (name, heading, lines[:HEADER_LINES])
+            sections.insert(1, ("summary", None, lines[HEADER_LINES:]))
+    return [s for s in sections if s[1] or s[2]]
+
+
+def compact_resume(text, budget_tokens=None):
+    """Section-prioritized excerpt of `text` within `budget_tokens` (default RESUME_TOKEN_BUDGET)."""
+    budget = (RESUME_TOKEN_BUDGET if budget_tokens is None else budget_tokens) * CHARS_PER_TOKEN
+    sections = split_sections(text or "")
+    blocks = [([heading] if heading else []) + lines for _, heading, lines in sections]
+    rank = {name: i for i, name in enumerate(SECTION_PRIORITY)}
+    order = sorted(range(len(sections)), key=lambda i: (rank.get(sections[i][0], len(rank)), i))
+
+    taken = [0] * len(blocks)  # Leading lines kept per section
+    tail = {}                  # Section → word-boundary cut of its next line
+    used = 0
+
+    def fill(i, limit):
+        nonlocal used
+        block = blocks[i]
+        while taken[i] < min(limit, len(block)):
+            line = block[taken[i]]
+            if used + len(line) + 1 > budget:
+                return False
+            used += len(line) + 1
+            taken[i] += 1
+        return True
+
+    # Pass 1: every section gets its heading and first lines, so none disappears entirely
+    for i in order:
+        fill(i, SECTION_MIN_LINES + (1 if sections[i][1] else 0))
+    # Pass 2: the remaining budget goes to whole sections in priority order
+    for i in order:
+        if not fill(i, len(blocks[i])):
+            room = budget - used - 1
+            if room >= _MIN_CUT_CHARS:
+                cut = blocks[i][taken[i]][:room].rsplit(' ', 1)[0]
+                if cut:
+                    tail[i] = cut
+            break
+
+    out = []
+    for i, block in enumerate(blocks):
+        kept = block[:taken[i]] + ([tail[i]] if i in tail else [])
+        if len(kept) > (1 if sections[i][1] else 0):  # A heading alone is not worth its tokens
+            out.extend(kept)
+    return "\n".join(out)
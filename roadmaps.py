@@ -0,0 +1,69 @@
+"""
+Versioned, immutable per-domain roadmap documents.
+
+A domain's roadmap is its description plus its skills per tier, next_steps
+included. It changes only when the knowledge changes, so each predictor
+renders every roadmap once at load time. The body is kept as compact JSON
+bytes, with a gzip copy alongside. Documents are addressed by
+(id, version), where the id is a slug of the domain name and the version is
+the predictor's knowledge fingerprint:
+
+    GET /api/roadmaps/<id>/<version>   → immutable, cacheable for a year
+
+Compact analysis responses carry only the user-specific found and missing
+sets, plus {"id", "version"} refs to these documents. Browsers and CDNs cache
+the static part. A knowledge update yields a new version and therefore new
+URLs.
+"""
+
+import gzip # Precompressed bodies
+import json # One-time rendering (not on the request path)
+import re # Roadmap IDs
+from collections import namedtuple # Rendered documents
+
+ROADMAP_TIERS = ("beginner", "compulsory", "intermediate", "advanced", "next_steps")
+
+RoadmapDocument = namedtuple("RoadmapDocument", "domain body gzip_body etag")
+
+
+def roadmap_id(domain):
+    """URL-safe, stable ID of a domain ("AI and Data Scientist" → "ai-and-data-scientist")."""
+    return re.sub(r'[^a-z0-9]+', '-', domain.lower()).strip('-')
+
+
+class RoadmapCatalog:
+    """Every domain's roadmap, rendered once per predictor (i.e. per knowledge version)."""
+    def __init__(self, structured_data, career_metadata, version):
+        self.version = version
+        self._documents = {}  # id → RoadmapDocument
+        self._ids = {}        # domain → id
+        for domain in list(structured_data) + [d for d in career_metadata if d not in structured_data]:
+            rid = roadmap_id(domain)
+            if rid in self._documents:
+                continue
+            job_info = structured_data.get(domain, {})
+            body = json.dumps({
+                "id": rid,
+                "version": version,
+                "domain": domain,
+                "description": career_metadata.get(domain, ""),
+                "all_skills_by_tier": {t: job_info.get(t, []) for t in ROADMAP_TIERS},
+            }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            self._documents[rid] = RoadmapDocument(domain, body, gzip.compress(body, compresslevel=9, mtime=0),
+                                                   f"{rid}.{version}")
+            self._ids[domain] = rid
+
+    def ref(self, domain):
+        """{"id", "version"} of a domain's roadmap, or None for unknown domains."""
+        rid = self._ids.get(domain)
+        return {"id": rid, "version": self.version} if rid else None
+
+    def document(self, rid, version):
+        """The rendered document, or None if the id is unknown or the version is not current."""
+        if version != self.version:
+            return None
+        return self._documents.get(rid)
+
+    def index(self):
+        """Refs of every roadmap, for clients that want to prefetch."""
+        return [{"id": rid, "version": self.version, "domain": doc.domain} for rid, doc in self._documents.items()]
@@ -145,6 +145,9 @@ async function processFile(file) {
             if (typeof chatbotContext !== 'undefined') {
                 chatbotContext = data.chatbotContext || null;
             }
+            // The server now holds the resume context; the transcript follows on the next chat turn
+            chatSession.id = data.sessionId || null;
+            chatSession.synced = false;
             checkAnalyzeButton();
         } else {
             throw new Error(data.error || 'Failed to process file');
@@ -165,6 +168,8 @@ function clearFile() {
     state.uploadedFile = null;
     state.resumeSkills = [];
     currentResumeData = null;   // Full reset — user wants to start fresh
+    chatSession.id = null;      // The next chat turn starts a session without the old resume
+    chatSession.synced = false;
     fileInput.value = '';
     fileInfo.style.display = 'none';
     dropZone.style.display = 'block';
@@ -247,7 +252,9 @@ async function performAnalysis() {
             },
             body: JSON.stringify({
                 skills: state.resumeSkills,
-                domain: domain
+                domain: domain,
+                sessionId: chatSession.id,
+                compact: true
             })
         });
 
@@ -265,6 +272,11 @@ async function performAnalysis() {
             throw new Error(data.error);
         }
 
+        // Compact responses reference the per-domain roadmap instead of repeating it
+        if (data.roadmap_ref && !data.all_skills_by_tier) {
+            Object.assign(data, await getRoadmap(data.roadmap_ref));
+        }
+
         state.analysisResult = data;
         displayResults(data);
     } catch (error) {
@@ -274,6 +286,68 @@ async function performAnalysis() {
     }
 }
 
+/**
+ * Versioned roadmap documents (description, skills per tier). A given
+ * id/version never changes, so one fetch per page (and the browser cache
+ * across pages) serves every analysis that references it.
+ */
+const roadmapCache = new Map();
+function getRoadmap(ref) {
+    const url = `${API_BASE}/roadmaps/${encodeURIComponent(ref.id)}/${encodeURIComponent(ref.version)}`;
+    if (!roadmapCache.has(url)) {
+        roadmapCache.set(url, fetch(url).then(response => {
+            if (!response.ok) throw new Error('Could not load the domain roadmap');
+            return response.json();
+        }).then(roadmap => ({
+            description: roadmap.description,
+            all_skills_by_tier: roadmap.all_skills_by_tier
+        })).catch(error => {
+            roadmapCache.delete(url);
+            throw error;
+        }));
+    }
+    return roadmapCache.get(url);
+}
+
+/**
+ * Applies a /api/analyze/delta patch to a full analysis payload in place.
+ * Splices arrive ordered from the highest index down, so they apply in sequence.
+ */
+function applyAnalysisPatch(data, patch) {
+    Object.assign(data, patch.set || {});
+    for (const [path, ops] of Object.entries(patch.splice || {})) {
+        const [field, key] = path.split('.');
+        const list = key ? data[field][key] : data[field];
+        ops.forEach(([start, deleteCount, items]) => list.splice(start, deleteCount, ...items));
+    }
+    return data;
+}
+
+async function updateSkills(added, removed) {
+    /** Re-analyses after skill edits by sending only the change; falls back to a full analysis. */
+    const removedLower = removed.map(s => s.toLowerCase());
+    state.resumeSkills = state.resumeSkills.filter(s => !removedLower.includes(s.toLowerCase())).concat(added);
+    const current = state.analysisResult;
+    if (!current || !current.analysis_handle) {
+        return performAnalysis();
+    }
+    try {
+        const response = await fetch(`${API_BASE}/analyze/delta`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ handle: current.analysis_handle, add: added, remove: removed })
+        });
+        // 409: the model or knowledge was updated since the handle was issued
+        if (!response.ok) return performAnalysis();
+        const data = await response.json();
+        applyAnalysisPatch(current, data.patch);
+        current.analysis_handle = data.analysis_handle;
+        displayResults(current);
+    } catch (error) {
+        return performAnalysis();
+    }
+}
+
 // ==============================================
 // DOMAIN ERROR MODAL
 // ==============================================
@@ -372,11 +446,16 @@ async function fetchConfusedResults() {
         const response = await fetch(`${API_BASE}/confused`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ skills: state.resumeSkills })
+            body: JSON.stringify({ skills: state.resumeSkills, compact: true })
         });
 
         const data = await response.json();
         if (data.success) {
+            await Promise.all(data.matches.map(async match => {
+                if (match.roadmap_ref && !match.all_skills_by_tier) {
+                    Object.assign(match, await getRoadmap(match.roadmap_ref));
+                }
+            }));
             renderCareerCards(data.matches);
             inputSection.style.display = 'none';
             confusedSection.style.display = 'block';
@@ -566,6 +645,19 @@ function updateSkillsList(container, skills, type) {
         skills.forEach(skill => {
             const li = document.createElement('li');
             li.textContent = skill;
+            // Skill editing: each edit is re-analysed through /api/analyze/delta (see updateSkills)
+            if (type === 'found') {
+                const remove = document.createElement('button');
+                remove.className = 'skill-remove';
+                remove.textContent = '×';
+                remove.title = `I don't have ${skill}`;
+                remove.addEventListener('click', () => updateSkills([], [skill]));
+                li.appendChild(remove);
+            } else {
+                li.classList.add('skill-addable');
+                li.title = `I already have ${skill}`;
+                li.addEventListener('click', () => updateSkills([skill], []));
+            }
             container.appendChild(li);
         });
     }
@@ -741,6 +833,8 @@ let chatbotOpen = false;
 let chatbotInitialized = false;
 let isSending = false;
 let chatbotContext = null;  // Extracted career context from resume
+// Server-side chat session; synced once the server holds the same transcript
+const chatSession = { id: null, synced: false };
 
 // Open chatbot
 chatbotToggle.addEventListener('click', () => {
@@ -790,6 +884,53 @@ chatbotBackBtn.addEventListener('click', () => {
     updateBackButton();
 });
 
+/**
+ * Builds the legacy body: the full transcript plus the resume context.
+ * Only used to start a session or after the server lost it.
+ */
+function legacyChatBody() {
+    let resumeContext = null;
+    if (state.resumeSkills && state.resumeSkills.length > 0) {
+        resumeContext = {
+            skills: state.resumeSkills,
+            domain: domainInput.value.trim() || 'technology',
+            chatbotContext: chatbotContext
+        };
+    }
+    return { messages: chatMessages, resumeContext: resumeContext, startSession: true };
+}
+
+/**
+ * Sends one chat turn. With a server-side session only the new message
+ * travels. Otherwise (or when the server lost track) the transcript is
+ * re-sent once to (re)build the session.
+ */
+async function postChatTurn(text) {
+    const post = body => fetch(`${API_BASE}/chatbot`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(body)
+    });
+    let response;
+    if (!chatSession.id) {
+        response = await post(legacyChatBody());
+    } else if (!chatSession.synced) {
+        response = await post({ sessionId: chatSession.id, messages: chatMessages });
+    } else {
+        response = await post({ sessionId: chatSession.id, message: text, historyLength: chatMessages.length - 1 });
+        if (response.status === 409) {
+            response = await post({ sessionId: chatSession.id, messages: chatMessages });
+        }
+    }
+    if (response.status === 410) {
+        response = await post(legacyChatBody());
+    }
+    const data = await response.json();
+    chatSession.synced = Boolean(data.sessionId);
+    if (data.sessionId) chatSession.id = data.sessionId;
+    return data;
+}
+
 function sendInitialGreeting() {
     /** Sends the first advisor message based on whether a resume was uploaded. */
     let greeting;
@@ -821,27 +962,8 @@ async function sendChatMessage() {
     const typingEl = showTypingIndicator();
     scrollChatToBottom();
 
-    // Build resume context for API
-    let resumeContext = null;
-    if (state.resumeSkills && state.resumeSkills.length > 0) {
-        resumeContext = {
-            skills: state.resumeSkills,
-            domain: domainInput.value.trim() || 'technology',
-            chatbotContext: chatbotContext
-        };
-    }
-
     try {
-        const response = await fetch(`${API_BASE}/chatbot`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                messages: chatMessages,
-                resumeContext: resumeContext
-            })
-        });
-
-        const data = await response.json();
+        const data = await postChatTurn(text);
         removeTypingIndicator(typingEl);
 
         if (data.error) {
@@ -960,19 +1082,21 @@ async function openStudyPlan() {
     studyPlanBtn.querySelector('.sp-btn-text').textContent = 'Building your plan…';
 
     try {
+        const request = {
+            missing_skills: data.missing_skills || [],
+            found_skills: data.found_skills || [],
+            score: data.score || 0,
+            domain: domainInput.value.trim(),
+            description: data.description || '',
+        };
         const response = await fetch(`${API_BASE}/study-plan`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                missing_skills: data.missing_skills || [],
-                found_skills: data.found_skills || [],
-                score: data.score || 0,
-                domain: domainInput.value.trim(),
-                description: data.description || '',
-            })
+            body: JSON.stringify({ ...request, compact: true })
         });
 
-        const plan = await response.json();
+        // Compact mode does not echo the request back; merge it in locally
+        const plan = { ...request, ...(await response.json()) };
         if (!plan.success) throw new Error(plan.error || 'Failed to build plan');
 
         currentStudyPlan = plan;
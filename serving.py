@@ -0,0 +1,75 @@
+"""
+Worker lifecycle helpers for the production (gunicorn) serving mode:
+per-worker torch thread sizing, background warmup and readiness state.
+"""
+
+import logging # Warmup diagnostics
+import os # CPU count and environment configuration
+import threading # Background warmup and readiness flag
+import time # Warmup timing
+
+logger = logging.getLogger(__name__)
+
+_ready = threading.Event()
+_warmup_error = None
+
+
+def threads_per_worker(workers):
+    """Intra-op threads each worker may use without oversubscribing the box."""
+    configured = os.environ.get('TORCH_NUM_THREADS')
+    if configured:
+        return max(1, int(configured))
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def configure_torch_threads(workers):
+    """Caps torch intra-op (and inter-op) threads for this worker process."""
+    import torch
+    n = threads_per_worker(workers)
+    torch.set_num_threads(n)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Already fixed once inter-op work has started; intra-op is what matters here
+    logger.info("[SERVING] pid=%s torch intra-op threads=%d", os.getpid(), n)
+    return n
+
+
+def warmup():
+    """Exercises inference, tokenizer and regex matcher, marks the worker ready and starts the artifact watcher."""
+    global _warmup_error
+    from predictor import warmup as predictor_warmup
+    start = time.perf_counter()
+    try:
+        matched = predictor_warmup()
+    except Exception as e:
+        _warmup_error = str(e)
+        logger.error("[SERVING] Warmup failed in pid=%s: %s", os.getpid(), e)
+        return
+    _ready.set()
+    logger.info("[SERVING] pid=%s warm in %.2fs (%d sample skills matched)",
+                os.getpid(), time.perf_counter() - start, matched)
+    from hot_reload import reloader
+    reloader.start_watcher()
+    try:
+        import memory_report
+        from predictor import current_predictor
+        logger.info("[SERVING] memory %s", memory_report.summary_line(memory_report.report(current_predictor())))
+    except Exception as e:
+        logger.warning("[SERVING] Memory report unavailable: %s", e)
+
+
+def start_warmup():
+    """Runs warmup on a background thread so the worker can answer /readyz meanwhile."""
+    threading.Thread(target=warmup, name="warmup", daemon=True).start()
+
+
+def is_ready():
+    return _ready.is_set()
+
+
+def readiness():
+    """Status payload for the /readyz endpoint."""
+    if _ready.is_set():
+        return {"status": "ready", "pid": os.getpid()}
+    return {"status": "failed" if _warmup_error else "warming_up", "pid": os.getpid(), "error": _warmup_error}
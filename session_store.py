@@ -0,0 +1,238 @@
+"""
+Server-side chat sessions: resume context, prompt fragments and history.
+
+Upload creates a session holding the resume's skills and the chatbot prompt
+fragments derived from chatbotContext, rendered once. Analysis records the
+matched domain in it. Chat turns then send only the session ID, the new
+message and how many messages the client holds. The history lives here, so
+request bodies stay small and no per-turn work re-derives the context.
+
+Sessions are stored compactly (short-key JSON, zlib-compressed) with a
+sliding TTL. By default they live in an in-process LRU, which suits a single
+process. Set SESSION_STORE_PATH to share one SQLite file (WAL) across
+gunicorn workers; gunicorn.conf.py defaults it to a file in the temp dir.
+A client whose session expired, or landed on a worker that never saw it,
+gets 410 or 409 and re-sends the full context once.
+"""
+
+import json # Session encoding
+import os # Environment configuration
+import secrets # Session IDs
+import sqlite3 # Shared backend
+import threading # Backend guards
+import time # TTL
+import zlib # Compact encoding
+from collections import OrderedDict # In-process LRU backend
+
+SESSION_STORE_PATH = os.environ.get('SESSION_STORE_PATH', '') # '' → in-process store
+SESSION_TTL_S = float(os.environ.get('SESSION_TTL_S', '3600'))
+SESSION_MAX_SESSIONS = int(os.environ.get('SESSION_MAX_SESSIONS', '10000')) # In-process backend only
+SESSION_MAX_MESSAGES = int(os.environ.get('SESSION_MAX_MESSAGES', '40')) # History kept (and sent to the LLM)
+
+_ENCODING_VERSION = 1
+_ROLES = {'user': 'u', 'assistant': 'a'}
+_ROLE_NAMES = {v: k for k, v in _ROLES.items()}
+
+
+def context_fragments(resume_context):
+    """
+    Prompt fragments for a resume context ({skills, domain, chatbotContext}):
+    (skills string, resume-context string, domain). Rendered once per session.
+    """
+    if not resume_context or not resume_context.get('skills'):
+        return "", "", ""
+    chatbot_ctx = resume_context.get('chatbotContext') or {}
+    ctx_parts = []
+    if chatbot_ctx.get('name'):
+        ctx_parts.append(f"Name: {chatbot_ctx['name']}")
+    if chatbot_ctx.get('current_status'):
+        ctx_parts.append(f"Status: {chatbot_ctx['current_status']}")
+    if chatbot_ctx.get('years_experience') is not None:
+        ctx_parts.append(f"Experience: {chatbot_ctx['years_experience']} years")
+    if chatbot_ctx.get('education'):
+        ctx_parts.append(f"Education: {', '.join(chatbot_ctx['education'])}")
+    if chatbot_ctx.get('career_interests'):
+        ctx_parts.append(f"Interests: {', '.join(chatbot_ctx['career_interests'])}")
+    return ", ".join(resume_context['skills']), ". ".join(ctx_parts), resume_context.get('domain') or ""
+
+
+class ChatSession:
+    """One conversation: prompt fragments plus the most recent SESSION_MAX_MESSAGES messages."""
+    __slots__ = ('id', 'skills', 'context', 'domain', 'history', 'total')
+
+    def __init__(self, session_id, skills="", context="", domain="", history=(), total=None):
+        self.id = session_id
+        self.skills = skills      # Rendered skills list ("" → no resume uploaded)
+        self.context = context    # Rendered chatbotContext facts
+        self.domain = domain      # Matched target domain, once analysed
+        self.history = list(history)  # [(role, text)], role 'user' | 'assistant'
+        self.total = len(self.history) if total is None else total  # Messages ever held, incl. trimmed ones
+
+    def set_messages(self, messages):
+        """Replaces the history with a client-side transcript ([{role, text}])."""
+        self.history = [('user' if m.get('role') == 'user' else 'assistant', str(m.get('text', '')))
+                        for m in messages if isinstance(m, dict)]
+        self.total = len(self.history)
+        self._trim()
+
+    def truncate(self, length):
+        """Drops messages past `length` (the client's back button). False if they were already trimmed."""
+        if length >= self.total:
+            return length == self.total
+        keep = len(self.history) - (self.total - length)
+        if keep < 0:
+            return False
+        del self.history[keep:]
+        self.total = length
+        return True
+
+    def append(self, role, text):
+        self.history.append((role, text))
+        self.total += 1
+        self._trim()
+
+    def _trim(self):
+        if len(self.history) > SESSION_MAX_MESSAGES:
+            del self.history[:len(self.history) - SESSION_MAX_MESSAGES]
+
+    def encode(self):
+        return zlib.compress(json.dumps({
+            "v": _ENCODING_VERSION, "s": self.skills, "c": self.context, "d": self.domain,
+            "h": [[_ROLES[role], text] for role, text in self.history], "n": self.total,
+        }, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    @classmethod
+    def decode(cls, session_id, blob):
+        """Decodes a stored session; None if it was written by an incompatible version."""
+        try:
+            raw = json.loads(zlib.decompress(blob))
+        except (zlib.error, ValueError):
+            return None
+        if raw.get("v") != _ENCODING_VERSION:
+            return None
+        return cls(session_id, raw["s"], raw["c"], raw["d"],
+                   [(_ROLE_NAMES[role], text) for role, text in raw["h"]], raw["n"])
+
+
+class _MemoryBackend:
+    """Per-process LRU of encoded sessions with expiry."""
+    def __init__(self, max_sessions):
+        self._max = max_sessions
+        self._data = OrderedDict()  # id → (expires_at, blob)
+        self._lock = threading.Lock()
+
+    def get(self, session_id, now):
+        with self._lock:
+            entry = self._data.get(session_id)
+            if entry is None:
+                return None
+            if entry[0] < now:
+                del self._data[session_id]
+                return None
+            self._data.move_to_end(session_id)
+            return entry[1]
+
+    def put(self, session_id, blob, expires_at):
+        with self._lock:
+            self._data[session_id] = (expires_at, blob)
+            self._data.move_to_end(session_id)
+            while len(self._data) > self._max:
+                self._data.popitem(last=False)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._data.pop(session_id, None)
+
+
+class _SQLiteBackend:
+    """
+    Sessions in one SQLite file shared by every worker on the node. The
+    connection is opened lazily per process: gunicorn preloads the app in the
+    master, and a connection must never be shared across a fork.
+    """
+    _PURGE_EVERY = 256 # Writes between sweeps of expired rows
+
+    def __init__(self, path):
+        self._path = path
+        self._lock = threading.Lock()
+        self._db = None
+        self._pid = None
+        self._writes = 0
+
+    def _conn(self):
+        """This process's connection (call with the lock held)."""
+        if self._pid != os.getpid():
+            self._db = sqlite3.connect(self._path, timeout=10, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS chat_sessions ("
+                             "id TEXT PRIMARY KEY, data BLOB NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID")
+            self._db.commit()
+            self._pid = os.getpid()
+        return self._db
+
+    def get(self, session_id, now):
+        with self._lock:
+            row = self._conn().execute("SELECT data FROM chat_sessions WHERE id = ? AND expires_at >= ?",
+                                       (session_id, now)).fetchone()
+        return row[0] if row else None
+
+    def put(self, session_id, blob, expires_at):
+        with self._lock:
+            db = self._conn()
+            with db:
+                db.execute("INSERT INTO chat_sessions VALUES (?, ?, ?) ON CONFLICT (id) "
+                           "DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at",
+                           (session_id, blob, expires_at))
+                self._writes += 1
+                if self._writes % self._PURGE_EVERY == 0:
+                    db.execute("DELETE FROM chat_sessions WHERE expires_at < ?", (time.time(),))
+
+    def delete(self, session_id):
+        with self._lock:
+            db = self._conn()
+            with db:
+                db.execute("DELETE FROM chat_sessions WHERE id = ?", (session_id,))
+
+
+class SessionStore:
+    """Creates, loads and saves ChatSessions with a sliding TTL."""
+    def __init__(self, path=SESSION_STORE_PATH, ttl=SESSION_TTL_S):
+        self.ttl = ttl
+        self._backend = _SQLiteBackend(path) if path else _MemoryBackend(SESSION_MAX_SESSIONS)
+
+    def create(self, resume_context=None, messages=None):
+        skills, context, domain = context_fragments(resume_context)
+        session = ChatSession(secrets.token_urlsafe(16), skills, context, domain)
+        if messages:
+            session.set_messages(messages)
+        self.save(session)
+        return session
+
+    def get(self, session_id):
+        """The live session, or None if unknown or expired."""
+        if not isinstance(session_id, str) or not session_id:
+            return None
+        blob = self._backend.get(session_id, time.time())
+        return ChatSession.decode(session_id, blob) if blob is not None else None
+
+    def save(self, session):
+        self._backend.put(session.id, session.encode(), time.time() + self.ttl)
+
+    def update_context(self, session_id, skills=None, domain=None):
+        """Records a newer skill list / matched domain (e.g. from /api/analyze). False if the session is gone."""
+        session = self.get(session_id)
+        if session is None:
+            return False
+        if skills is not None:
+            session.skills = ", ".join(s for s in skills if isinstance(s, str))
+        if domain is not None:
+            session.domain = domain
+        self.save(session)
+        return True
+
+    def delete(self, session_id):
+        self._backend.delete(session_id)
+
+
+sessions = SessionStore()
@@ -0,0 +1,420 @@
+"""
+Two-tier cache shared across gunicorn workers and nodes.
+
+Every per-process LRUCache divides its hit rate by the number of workers.
+TieredCache keeps the LRUCache as a fast L1 and adds an optional shared L2,
+chosen by SHARED_CACHE_URL:
+
+    (unset)                        L1 only, the previous behaviour
+    sqlite:///var/cache/app.db     one SQLite file (WAL) shared by the workers of a node
+    redis://[:password@]host:6379/0
+                                   any Redis-protocol server, shared across nodes
+                                   (python -m loadtest.fake_redis is a local stand-in)
+
+L2 values are versioned: keys carry SHARED_CACHE_NAMESPACE and
+CACHE_FORMAT_VERSION, and each value starts with a format byte. A deploy that
+changes the encoding therefore reads misses, never garbage. Values must be
+JSON-serialisable (tuples and sets come back as lists).
+
+get_or_compute() protects against stampedes at two levels. Within a process,
+concurrent callers share one computation through SingleFlight. Across
+processes, the leader takes a short-lived lock key in L2 (SET NX), and other
+workers poll for its result instead of recomputing. An L2 outage only costs
+hits: errors are logged, and L2 is skipped for SHARED_CACHE_RETRY_S.
+"""
+
+import json # Value encoding
+import logging # L2 diagnostics
+import os # Environment configuration
+import queue # RESP connection pool
+import secrets # Lock tokens
+import socket # RESP client
+import sqlite3 # Node-local L2
+import threading # Backend guards
+import time # Expiry and lock polling
+import urllib.parse # SHARED_CACHE_URL parsing
+import zlib # Large-value compression
+
+import metrics
+from cache import LRUCache
+from singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+SHARED_CACHE_URL = os.environ.get('SHARED_CACHE_URL', '')
+SHARED_CACHE_NAMESPACE = os.environ.get('SHARED_CACHE_NAMESPACE', 'careerapp')
+SHARED_CACHE_TIMEOUT_S = float(os.environ.get('SHARED_CACHE_TIMEOUT_S', '0.5')) # Per L2 operation
+SHARED_CACHE_RETRY_S = float(os.environ.get('SHARED_CACHE_RETRY_S', '5')) # L2 skipped this long after an error
+SHARED_CACHE_LOCK_TTL_S = float(os.environ.get('SHARED_CACHE_LOCK_TTL_S', '30')) # Longest expected computation
+SHARED_CACHE_LOCK_WAIT_S = float(os.environ.get('SHARED_CACHE_LOCK_WAIT_S', '10')) # Then compute anyway
+SINGLEFLIGHT_TIMEOUT = float(os.environ.get('SINGLEFLIGHT_TIMEOUT_S', '60'))
+
+CACHE_FORMAT_VERSION = 1 # Bump when the value encoding changes
+_COMPRESS_MIN_BYTES = 1024
+_PLAIN, _ZLIB = 0, 1
+
+
+class CacheBackendError(Exception):
+    """An L2 operation failed (connection, protocol or server error)."""
+
+
+# ---------------------------------------------------------------------------
+# Serialization
+# ---------------------------------------------------------------------------
+def _default(o):
+    if isinstance(o, (set, frozenset)):
+        return sorted(o)
+    if hasattr(o, 'item'):
+        return o.item()  # numpy / torch scalars
+    raise TypeError(f"{type(o).__name__} is not JSON serializable")
+
+
+def encode(value):
+    """Format byte + flag byte + JSON (zlib-compressed when large)."""
+    body = json.dumps(value, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if len(body) >= _COMPRESS_MIN_BYTES:
+        return bytes((CACHE_FORMAT_VERSION, _ZLIB)) + zlib.compress(body)
+    return bytes((CACHE_FORMAT_VERSION, _PLAIN)) + body
+
+
+def decode(blob):
+    """The stored value, or None for another format version or a corrupt blob."""
+    if not blob or len(blob) < 2 or blob[0] != CACHE_FORMAT_VERSION:
+        return None
+    try:
+        body = zlib.decompress(blob[2:]) if blob[1] == _ZLIB else blob[2:]
+        return json.loads(body)
+    except (zlib.error, ValueError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# L2 backends: get / set / add (set if absent) / delete, values are bytes
+# ---------------------------------------------------------------------------
+class SQLiteBackend:
+    """
+    Shared cache table in one SQLite file; every worker on the node opens the
+    same file. Connections are per process (gunicorn preloads the app in the
+    master, and a SQLite connection must not cross a fork).
+    """
+    _PURGE_EVERY = 512 # Writes between sweeps of expired rows
+
+    def __init__(self, path):
+        self._path = path
+        self._lock = threading.Lock()
+        self._db = None
+        self._pid = None
+        self._writes = 0
+
+    def _conn(self):
+        """This process's connection (call with the lock held)."""
+        if self._pid != os.getpid():
+            db = sqlite3.connect(self._path, timeout=SHARED_CACHE_TIMEOUT_S, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("CREATE TABLE IF NOT EXISTS shared_cache ("
+                       "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL) WITHOUT ROWID")
+            db.commit()
+            self._db, self._pid = db, os.getpid()
+        return self._db
+
+    def _run(self, fn):
+        try:
+            with self._lock:
+                return fn(self._conn())
+        except sqlite3.Error as e:
+            raise CacheBackendError(str(e)) from e
+
+    def get(self, key):
+        def query(db):
+            row = db.execute("SELECT value FROM shared_cache WHERE key = ? "
+                                   "AND (expires_at IS NULL OR expires_at >= ?)", (key, time.time())).fetchone()
+            return row[0] if row else None
+        return self._run(query)
+
+    def _write(self, db, sql, params):
+        with db:
+            changed = db.execute(sql, params).rowcount
+            self._writes += 1
+            if self._writes % self._PURGE_EVERY == 0:
+                db.execute("DELETE FROM shared_cache WHERE expires_at < ?", (time.time(),))
+        return changed
+
+    def set(self, key, value, ttl=None):
+        expires = time.time() + ttl if ttl else None
+        self._run(lambda db: self._write(
+            db, "INSERT INTO shared_cache VALUES (?, ?, ?) ON CONFLICT (key) "
+            "DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at", (key, value, expires)))
+
+    def add(self, key, value, ttl):
+        now = time.time()
+        return self._run(lambda db: self._write(
+            db, "INSERT INTO shared_cache VALUES (?, ?, ?) ON CONFLICT (key) "
+            "DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+            "WHERE shared_cache.expires_at < ?", (key, value, now + ttl, now))) > 0
+
+    def delete(self, key):
+        self._run(lambda db: self._write(db, "DELETE FROM shared_cache WHERE key = ?", (key,)))
+
+
+class RESPBackend:
+    """Minimal Redis-protocol (RESP2) client with a small connection pool."""
+    def __init__(self, host, port=6379, db=0, password=None, pool_size=8):
+        self._address = (host, port)
+        self._setup = ([[b'AUTH', password]] if password else []) + ([[b'SELECT', db]] if db else [])
+        self._pool_size = pool_size
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._pid = os.getpid()
+
+    def _checkout(self):
+        """A pooled connection of this process, or None (sockets are never reused across a fork)."""
+        if self._pid != os.getpid():
+            self._pool = queue.LifoQueue(maxsize=self._pool_size)
+            self._pid = os.getpid()
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _connect(self):
+        sock = socket.create_connection(self._address, timeout=SHARED_CACHE_TIMEOUT_S)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = (sock, sock.makefile('rb'))
+        for command in self._setup:
+            self._roundtrip(conn, command)
+        return conn
+
+    @staticmethod
+    def _pack(args):
+        out = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode('utf-8')
+            out.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        return b''.join(out)
+
+    @classmethod
+    def _read(cls, reader):
+        line = reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise CacheBackendError("connection closed")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest
+        if kind == b'-':
+            raise CacheBackendError(rest.decode('utf-8', 'replace'))
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            size = int(rest)
+            if size < 0:
+                return None
+            data = reader.read(size + 2)
+            if len(data) != size + 2:
+                raise CacheBackendError("connection closed")
+            return data[:-2]
+        if kind == b'*':
+            size = int(rest)
+            return None if size < 0 else [cls._read(reader) for _ in range(size)]
+        raise CacheBackendError(f"unexpected reply {line[:20]!r}")
+
+    def _roundtrip(self, conn, args):
+        conn[0].sendall(self._pack(args))
+        return self._read(conn[1])
+
+    def command(self, *args):
+        conn = self._checkout()
+        try:
+            if conn is None:
+                conn = self._connect()
+            reply = self._roundtrip(conn, args)
+        except CacheBackendError as e:
+            if conn is not None and str(e) == "connection closed":
+                conn[0].close()
+            else:
+                self._release(conn)
+            raise
+        except OSError as e:
+            if conn is not None:
+                conn[0].close()
+            raise CacheBackendError(str(e)) from e
+        self._release(conn)
+        return reply
+
+    def _release(self, conn):
+        if conn is None or self._pid != os.getpid():
+            return
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn[0].close()
+
+    def get(self, key):
+        return self.command(b'GET', key)
+
+    def set(self, key, value, ttl=None):
+        if ttl:
+            self.command(b'SET', key, value, b'PX', int(ttl * 1000))
+        else:
+            self.command(b'SET', key, value)
+
+    def add(self, key, value, ttl):
+        return self.command(b'SET', key, value, b'PX', int(ttl * 1000), b'NX') is not None
+
+    def delete(self, key):
+        self.command(b'DEL', key)
+
+
+def backend_from_url(url):
+    """L2 backend for a SHARED_CACHE_URL, or None when unset."""
+    if not url:
+        return None
+    parsed = urllib.parse.urlparse(url)
+    if parsed.scheme == 'sqlite':
+        return SQLiteBackend(parsed.path or ':memory:')
+    if parsed.scheme == 'redis':
+        db = parsed.path.strip('/')
+        return RESPBackend(parsed.hostname or '127.0.0.1', parsed.port or 6379,
+                           int(db) if db else 0, urllib.parse.unquote(parsed.password or '') or None)
+    raise ValueError(f"Unsupported SHARED_CACHE_URL scheme {parsed.scheme!r} (use sqlite:// or redis://)")
+
+
+_backend = None
+_backend_loaded = False
+_backend_lock = threading.Lock()
+
+
+def shared_backend():
+    """The process-wide L2 backend from SHARED_CACHE_URL (None → L1 only)."""
+    global _backend, _backend_loaded
+    if not _backend_loaded:
+        with _backend_lock:
+            if not _backend_loaded:
+                try:
+                    _backend = backend_from_url(SHARED_CACHE_URL)
+                except (CacheBackendError, ValueError) as e:
+                    logger.error("[CACHE] Shared cache unavailable (%s); using per-process caches only", e)
+                _backend_loaded = True
+    return _backend
+
+
+# ---------------------------------------------------------------------------
+# Two-tier cache
+# ---------------------------------------------------------------------------
+class TieredCache:
+    """In-process LRU (L1) in front of the shared backend (L2). None values are never cached."""
+    def __init__(self, name, maxsize=1024, ttl=None, namespace="", backend=False, flights=None):
+        """
+        `ttl` (seconds) applies to both tiers; None keeps entries until evicted.
+        `namespace` scopes L2 keys further (e.g. a model version). `backend`
+        overrides the SHARED_CACHE_URL backend (None disables L2).
+        """
+        self.name = name
+        self.ttl = ttl
+        self._local = LRUCache(maxsize=maxsize, name=name)
+        self._backend = backend  # False → shared_backend(), resolved on first use (i.e. in the worker)
+        self._prefix = f"{SHARED_CACHE_NAMESPACE}:v{CACHE_FORMAT_VERSION}:{name}:{namespace + ':' if namespace else ''}"
+        self._flights = flights or SingleFlight(name, timeout=SINGLEFLIGHT_TIMEOUT)
+        self._down_until = 0.0
+
+    # --- L2 access; failures degrade to misses ---
+    def _l2(self):
+        if self._backend is False:
+            self._backend = shared_backend()
+        if self._backend is None or time.monotonic() < self._down_until:
+            return None
+        return self._backend
+
+    def _l2_call(self, op, *args):
+        backend = self._l2()
+        if backend is None:
+            return None
+        try:
+            return getattr(backend, op)(*args)
+        except CacheBackendError as e:
+            logger.warning("[CACHE] %s: shared %s failed (%s); skipping L2 for %ss",
+                           self.name, op, e, SHARED_CACHE_RETRY_S)
+            self._down_until = time.monotonic() + SHARED_CACHE_RETRY_S
+            return None
+
+    def get(self, key, default=None):
+        entry = self._local.get(key)
+        if entry is not None:
+            expires, value = entry
+            if expires is None or expires > time.time():
+                return value
+            self._local.pop(key)
+        if self._l2() is None:
+            return default
+        value = decode(self._l2_call('get', self._prefix + key))
+        metrics.record_cache(self.name + "_shared", value is not None)
+        if value is None:
+            return default
+        self._put_local(key, value)
+        return value
+
+    def _put_local(self, key, value):
+        self._local.put(key, (time.time() + self.ttl if self.ttl else None, value))
+
+    def put(self, key, value):
+        if value is None:
+            return
+        self._put_local(key, value)
+        if self._l2() is not None:
+            try:
+                blob = encode(value)
+            except (TypeError, ValueError) as e:
+                logger.warning("[CACHE] %s: value not shareable (%s); kept in L1 only", self.name, e)
+                return
+            self._l2_call('set', self._prefix + key, blob, self.ttl)
+
+    def clear_local(self):
+        """Drops this process's L1 entries (L2 entries expire or are versioned out by key)."""
+        self._local.clear()
+
+    # --- Stampede-protected fill ---
+    def get_or_compute(self, key, compute):
+        """
+        Cached value for `key`, computing it at most once per process and, while
+        L2 is reachable, usually once across all processes.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        return self._flights.do(key, lambda: self._lead(key, compute))
+
+    def _lead(self, key, compute):
+        value = self.get(key)  # Filled while this caller queued for the flight
+        if value is not None:
+            return value
+        lock_key = self._prefix + key + ":lock"
+        token = secrets.token_hex(8).encode()
+        locked = self._l2() is not None and self._l2_call('add', lock_key, token, SHARED_CACHE_LOCK_TTL_S)
+        if self._l2() is not None and locked is False:
+            value = self._await_peer(key, lock_key)
+            if value is not None:
+                return value
+        try:
+            value = compute()
+            self.put(key, value)
+            return value
+        finally:
+            if locked and self._l2_call('get', lock_key) == token:
+                # Not atomic (no server-side scripting required); the lock TTL bounds any overlap
+                self._l2_call('delete', lock_key)
+
+    def _await_peer(self, key, lock_key):
+        """Polls L2 while another process computes; None if it gave up or failed."""
+        deadline = time.monotonic() + SHARED_CACHE_LOCK_WAIT_S
+        delay = 0.02
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            delay = min(delay * 2, 0.25)
+            value = self.get(key)
+            if value is not None:
+                metrics.record_cache(self.name + "_peer_fill", True)
+                return value
+            if self._l2() is None or self._l2_call('get', lock_key) is None:
+                break  # Peer finished without a cacheable value, or L2 went away
+        metrics.record_cache(self.name + "_peer_fill", False)
+        return None
@@ -0,0 +1,81 @@
+"""
+Single-flight request coalescing.
+
+Concurrent calls that share a key run the underlying function once; every
+caller receives the same result (or the same exception). Followers wait at
+most `timeout` seconds for the leader and then raise FlightTimeout. Nothing is
+cached: once the leader finishes, the next call with that key runs afresh.
+
+Errors listed in `retry_on` belong to the leader's request, not to the work
+(e.g. its client hung up while queued for admission). Followers that see one
+do not inherit it; they call again, and one of them becomes the new leader.
+"""
+
+import threading # Key table lock and completion events
+
+import metrics
+
+
+class FlightTimeout(TimeoutError):
+    """A follower gave up waiting for the in-flight leader."""
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """A group of keyed in-flight computations."""
+    def __init__(self, name, timeout=None, retry_on=()):
+        """
+        `timeout` is the default follower wait in seconds (None waits forever).
+        `retry_on` is a tuple of leader-specific exception types followers retry on.
+        """
+        self.name = name
+        self.timeout = timeout
+        self.retry_on = tuple(retry_on)
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, timeout=None):
+        """Runs fn() once per in-flight key and returns its result to every concurrent caller."""
+        while True:
+            leader, call = self._join(key, fn, timeout)
+            if call.error is None:
+                return call.result
+            if leader or not isinstance(call.error, self.retry_on):
+                raise call.error
+            metrics.SINGLEFLIGHT_CALLS.labels(self.name, "retry").inc()
+
+    def _join(self, key, fn, timeout):
+        """Leads or follows one flight for `key`; returns (was_leader, finished call)."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        metrics.SINGLEFLIGHT_CALLS.labels(self.name, "leader" if leader else "follower").inc()
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+                call.done.set()
+        else:
+            wait = self.timeout if timeout is None else timeout
+            if not call.done.wait(wait):
+                raise FlightTimeout(f"{self.name}: timed out after {wait}s waiting for in-flight call")
+        return leader, call
+
+    def in_flight(self):
+        """Number of keys currently being computed."""
+        return len(self._calls)
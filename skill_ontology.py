@@ -0,0 +1,238 @@
+"""
+Canonical skill ontology shared by extraction, scoring and study-plan resources.
+
+Every vocabulary entry ("Git/GitHub/GitLab", "React", "React/Angular/Vue")
+becomes one canonical skill ID. Its full name, each '/'-separated variant and
+the usual spelling variants ("ReactJS", "React.js", "react js") are aliases,
+so a lookup is one dict hit whatever form the caller has. An alias shared by
+several entries resolves to its own entry first, and it also implies every
+composite entry that lists it. Having "React" therefore satisfies a
+requirement for "React/Angular/Vue".
+
+Text extraction uses one precompiled regex. All aliases are merged into a
+character trie, so the pattern costs one pass over the text instead of one
+search per skill, and it prefers the longest alias at each position. The
+shorter aliases nested inside each alias ("security" in "app security") are
+precomputed, so those matches are still reported. Names that are also
+everyday English words ("Next", "Express", "Node") are never matched bare in
+free text, only in their ".js" forms; "next steps" is not Next.js.
+
+The predictor builds an ontology from its vocabulary and publishes it with
+set_default() when it goes live; study_plan.py resolves through default().
+"""
+
+import re # Alias normalisation and the extraction pattern
+import threading # Derived-index memo
+
+# Extra spellings that are not derivable from the vocabulary itself
+EXTRA_ALIASES = {
+    "javascript": ("js", "ecmascript", "es6"),
+    "typescript": ("ts",),
+    "kubernetes": ("k8s",),
+    "postgresql": ("postgres",),
+    "golang": ("go lang",),
+    "c#": ("csharp", "c sharp"),
+    "c++": ("cpp",),
+    "machine learning": ("ml",),
+    "natural language processing": ("nlp",),
+}
+
+# Framework names that are also common English words: resolvable by lookup when given
+# as a skill, but never an alias of their own in free text or when derived from "X.js"
+AMBIGUOUS_WORDS = frozenset({"next", "express", "node", "ember", "meteor", "backbone", "alpine", "solid", "chart"})
+
+_WORD = "a-z0-9"
+_WORD_CHAR = re.compile(rf'[{_WORD}]')
+
+
+def _slug(name):
+    return re.sub(r'[^a-z0-9+#]+', '-', name.lower()).strip('-')
+
+
+def _surface(text):
+    """Lower-case, single-spaced form used as the primary alias key."""
+    return " ".join(text.lower().split())
+
+
+def _compact(text):
+    """Separator-free form, so 'React JS', 'react-js' and 'ReactJS' collide."""
+    return re.sub(r'[\s.\-_]+', '', text.lower())
+
+
+def _spellings(alias):
+    """Spelling variants of one alias: the '.js' family for single-word names."""
+    forms = {alias}
+    base = re.sub(r'[ .]?js$', '', alias)
+    if base != alias and len(base) > 1:
+        if base not in AMBIGUOUS_WORDS:
+            forms.add(base)
+        alias = base
+    if re.fullmatch(r'[a-z][a-z0-9]*', alias):
+        forms.update({alias + ".js", alias + "js", alias + " js"})
+    return forms
+
+
+def _trie_pattern(words):
+    """Regex alternation of `words` factored into a trie (greedy: longest first)."""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node):
+        end = '' in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        if len(branches) == 1 and not end:
+            return branches[0]
+        group = '(?:' + '|'.join(branches) + ')'
+        return group + '?' if end else group
+
+    return build(trie)
+
+
+class SkillOntology:
+    """Canonical skill IDs with O(1) alias lookup and a single-pass text extractor."""
+    def __init__(self, entries, extra_aliases=EXTRA_ALIASES):
+        """
+        Args:
+            entries: canonical skill names; '/' separates variants of one skill.
+            extra_aliases: {alias already known: additional spellings}.
+        """
+        self._names = {}       # id → display name
+        self._by_surface = {}  # surface alias → (primary id, other implied ids…)
+        self._by_compact = {}  # compact alias → same tuple
+        entries = list(dict.fromkeys(e for e in entries if e and e.strip()))
+
+        # Full entry names claim their aliases first, then single variants fill the gaps,
+        # so "SQL" the entry wins over the "SQL" inside "MySQL/SQL/NoSQL/…"
+        for entry in entries:
+            skill_id = _slug(entry)
+            self._names.setdefault(skill_id, entry)
+            self._register(_surface(entry), skill_id)
+        for entry in entries:
+            skill_id = _slug(entry)
+            for variant in entry.split('/'):
+                for form in _spellings(_surface(variant)):
+                    self._register(form, skill_id)
+        for alias, spellings in extra_aliases.items():
+            for skill_id in self._by_surface.get(alias, ()):
+                for form in spellings:
+                    self._register(form, skill_id)
+
+        aliases = sorted((a for a in self._by_surface if a not in AMBIGUOUS_WORDS), key=len, reverse=True)
+        self._pattern = re.compile(rf'(?<![{_WORD}])(?:{_trie_pattern(aliases)})(?![{_WORD}])') if aliases else None
+        self._match_ids = {alias: self._nested_ids(alias) for alias in aliases}
+        self._derived = {}
+        self._derived_lock = threading.Lock()
+
+    def _register(self, alias, skill_id):
+        if len(alias) < 2 and not alias.isalpha():
+            return
+        for table, key in ((self._by_surface, alias), (self._by_compact, _compact(alias))):
+            ids = table.get(key, ())
+            if skill_id not in ids:
+                table[key] = ids + (skill_id,)
+
+    def _nested_ids(self, alias):
+        """IDs of the alias itself plus every alias nested in it at word boundaries."""
+        ids = dict.fromkeys(self._by_surface[alias])
+        starts = [i for i in range(len(alias)) if alias[i] != ' ' and (i == 0 or not _WORD_CHAR.match(alias[i - 1]))]
+        ends = [j for j in range(1, len(alias) + 1)
+                if alias[j - 1] != ' ' and (j == len(alias) or not _WORD_CHAR.match(alias[j]))]
+        for i in starts:
+            for j in ends:
+                if j > i and (i, j) != (0, len(alias)):
+                    ids.update(dict.fromkeys(self._by_surface.get(alias[i:j], ())))
+        return tuple(ids)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, skill_id):
+        return skill_id in self._names
+
+    def implied(self, skill):
+        """Every canonical ID an alias stands for (its own entry first), or ()."""
+        if not isinstance(skill, str):
+            return ()
+        surface = _surface(skill)
+        ids = self._by_surface.get(surface)
+        if ids is None:
+            ids = self._by_compact.get(_compact(surface), ())
+        return ids
+
+    def lookup(self, skill):
+        """Canonical ID for any alias or spelling of a skill, or None."""
+        ids = self.implied(skill)
+        return ids[0] if ids else None
+
+    def key(self, skill):
+        """Comparison key for a required skill: its canonical ID, else the lower-cased string."""
+        return self.lookup(skill) or skill.lower()
+
+    def keys(self, skills):
+        """Comparison keys a skill list satisfies (all implied IDs; unknown skills lower-cased)."""
+        out = set()
+        for s in skills:
+            if isinstance(s, str):
+                out.update(self.implied(s) or (s.lower(),))
+        return out
+
+    def merge(self, skill_ids, skills):
+        """
+        Adds the canonical IDs of free-form `skills` (e.g. an LLM's list) to `skill_ids`,
+        keeping order and dropping duplicates. Returns (ids, names that resolve to no ID).
+        """
+        ids = dict.fromkeys(skill_ids)
+        unknown = []
+        for skill in skills:
+            if not isinstance(skill, str) or not skill.strip():
+                continue
+            found = self.implied(skill)[:1] or self.extract(skill)
+            if found:
+                ids.update(dict.fromkeys(found))
+            else:
+                unknown.append(skill.strip())
+        return list(ids), unknown
+
+    def name(self, skill_id):
+        """Display name (the vocabulary entry) of a canonical ID."""
+        return self._names.get(skill_id, skill_id)
+
+    def extract(self, text):
+        """Canonical IDs mentioned in free text, in order of first mention."""
+        if self._pattern is None:
+            return []
+        found = {}
+        for match in self._pattern.finditer(text.lower()):
+            for skill_id in self._match_ids.get(match.group(0), ()):
+                found.setdefault(skill_id, None)
+        return list(found)
+
+    def derived(self, name, build):
+        """Memoises an index derived from this ontology (e.g. study-plan resources by ID)."""
+        value = self._derived.get(name)
+        if value is None:
+            with self._derived_lock:
+                value = self._derived.get(name)
+                if value is None:
+                    value = self._derived[name] = build(self)
+        return value
+
+
+_default = None
+
+
+def set_default(ontology):
+    """Publishes the ontology of the live predictor."""
+    global _default
+    _default = ontology
+
+
+def default():
+    """The live ontology, or None before a predictor has been loaded."""
+    return _default
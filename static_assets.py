@@ -0,0 +1,171 @@
+"""
+Fingerprinted, precompressed frontend assets.
+
+Build step (run at deploy time, after any frontend change):
+
+    python static_assets.py
+
+This copies every local asset that index.html references (styles.css,
+script.js, the chatbot icon) to STATIC_BUILD_DIR/assets/<name>.<hash>.<ext>.
+Next to each copy it writes .gz and, when the `brotli` package is installed,
+.br variants, but only where compression actually saves bytes. It also writes
+STATIC_BUILD_DIR/index.html with the references rewritten to /assets/… and a
+manifest.json.
+
+At runtime the server negotiates Accept-Encoding and serves the best variant.
+Hashed names get `Cache-Control: immutable` for a year, because a content
+change always produces a new name. index.html is revalidated (no-cache +
+ETag). If the build is missing or older than the sources, the app serves the
+plain files as before.
+"""
+
+import gzip # Precompressed .gz variants
+import hashlib # Content fingerprints
+import json # Manifest
+import logging # Build / staleness diagnostics
+import mimetypes # Content-Type of encoded variants
+import os # Paths and environment configuration
+import re # index.html reference rewriting
+import threading # Manifest load guard
+
+try:
+    import brotli # Optional: .br variants (pip install brotli)
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_BUILD_DIR = os.environ.get('STATIC_BUILD_DIR', os.path.join(SOURCE_DIR, 'dist'))
+ASSET_PREFIX = '/assets/'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+INDEX_CACHE_CONTROL = 'no-cache'
+
+# Variants in server preference order; identity is always available
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+MIN_SAVING = 0.9 # Keep a compressed variant only if it is under 90% of the original
+
+_LOCAL_REF = re.compile(r'''(?P<attr>\b(?:href|src)=["'])(?P<path>(?!https?:|//|data:|#|/)[^"'?#]+)(?P<end>["'])''')
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_variants(path, data):
+    """Writes `path` plus the compressed variants worth keeping; returns the encodings written."""
+    with open(path, 'wb') as f:
+        f.write(data)
+    written = []
+    variants = [('gzip', '.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.insert(0, ('br', '.br', brotli.compress(data, quality=11)))
+    for encoding, suffix, packed in variants:
+        if len(packed) < len(data) * MIN_SAVING:
+            with open(path + suffix, 'wb') as f:
+                f.write(packed)
+            written.append(encoding)
+    return written
+
+
+def build(source_dir=SOURCE_DIR, out_dir=STATIC_BUILD_DIR):
+    """Builds the fingerprinted asset tree and returns the manifest."""
+    with open(os.path.join(source_dir, 'index.html'), encoding='utf-8') as f:
+        html = f.read()
+    asset_dir = os.path.join(out_dir, 'assets')
+    os.makedirs(asset_dir, exist_ok=True)
+
+    manifest = {"assets": {}, "sources": {}}
+    for name in dict.fromkeys(m.group('path') for m in _LOCAL_REF.finditer(html)):
+        source = os.path.join(source_dir, name)
+        if not os.path.isfile(source):
+            logger.warning("[ASSETS] index.html references missing file %s", name)
+            continue
+        with open(source, 'rb') as f:
+            data = f.read()
+        digest = _digest(data)
+        stem, ext = os.path.splitext(os.path.basename(name))
+        hashed = f"{stem}.{digest[:12]}{ext}"
+        encodings = _write_variants(os.path.join(asset_dir, hashed), data)
+        manifest["assets"][hashed] = {"source": name, "encodings": encodings}
+        manifest["sources"][name] = {"hashed": hashed, "sha256": digest}
+
+    def rewrite(m):
+        entry = manifest["sources"].get(m.group('path'))
+        return m.group(0) if entry is None else f"{m.group('attr')}{ASSET_PREFIX}{entry['hashed']}{m.group('end')}"
+
+    index = _LOCAL_REF.sub(rewrite, html).encode('utf-8')
+    manifest["index"] = {"sha256": _digest(index), "source_sha256": _digest(html.encode('utf-8')),
+                         "encodings": _write_variants(os.path.join(out_dir, 'index.html'), index)}
+    with open(os.path.join(out_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+# ---------------------------------------------------------------------------
+# Runtime
+# ---------------------------------------------------------------------------
+_manifest = None
+_manifest_lock = threading.Lock()
+
+
+def _is_fresh(manifest, source_dir):
+    try:
+        with open(os.path.join(source_dir, 'index.html'), 'rb') as f:
+            if _digest(f.read()) != manifest["index"]["source_sha256"]:
+                return False
+        for name, entry in manifest["sources"].items():
+            with open(os.path.join(source_dir, name), 'rb') as f:
+                if _digest(f.read()) != entry["sha256"]:
+                    return False
+    except (OSError, KeyError):
+        return False
+    return True
+
+
+def manifest():
+    """The build manifest if a build exists and matches the sources, else {} (serve plain files)."""
+    global _manifest
+    if _manifest is None:
+        with _manifest_lock:
+            if _manifest is None:
+                try:
+                    with open(os.path.join(STATIC_BUILD_DIR, 'manifest.json')) as f:
+                        loaded = json.load(f)
+                except (OSError, ValueError):
+                    loaded = {}
+                if loaded and not _is_fresh(loaded, SOURCE_DIR):
+                    logger.warning("[ASSETS] %s is older than the sources; serving unbuilt files "
+                                   "(run python static_assets.py)", STATIC_BUILD_DIR)
+                    loaded = {}
+                _manifest = loaded
+    return _manifest
+
+
+def choose_encoding(accept_encodings, available):
+    """Best of `available` encodings the client accepts (werkzeug Accept object), or None for identity."""
+    best, best_q = None, 0
+    for encoding, _ in ENCODINGS:
+        if encoding in available:
+            q = accept_encodings[encoding]
+            if q > best_q:
+                best, best_q = encoding, q
+    return best
+
+
+def variant_path(path, encoding):
+    """File holding `path` in `encoding` (None → the original)."""
+    return path + dict(ENCODINGS)[encoding] if encoding else path
+
+
+def content_type(name):
+    return mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    built = build()
+    for hashed, entry in sorted(built["assets"].items()):
+        print(f"{entry['source']:40s} -> {ASSET_PREFIX}{hashed}  [{', '.join(entry['encodings']) or 'identity'}]")
+    print(f"index.html -> {STATIC_BUILD_DIR}/index.html  [{', '.join(built['index']['encodings']) or 'identity'}]"
+          + ("" if brotli else "  (install brotli for .br variants)"))
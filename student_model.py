@@ -0,0 +1,76 @@
+"""
+Compact student model distilled from the BERT skill classifier.
+
+A mean-pooled EmbeddingBag over the same WordPiece ids, followed by a small
+MLP head. It keeps the BERT calling convention (`model(input_ids,
+attention_mask=...).logits`) so CareerPredictor and trainer.py can use either
+model interchangeably.
+"""
+
+import json # config persistence
+import os # artifact paths
+import torch # tensors and modules
+from torch import nn # layers
+from safetensors.torch import load_file, save_file # weight persistence (ships with transformers)
+
+import weights
+
+MODEL_TYPE = "embedding_bag"
+CONFIG_NAME = "student_config.json"
+WEIGHTS_NAME = "student_model.safetensors"
+
+
+class SkillModelOutput:
+    """Minimal stand-in for transformers' SequenceClassifierOutput."""
+    __slots__ = ("logits",)
+
+    def __init__(self, logits):
+        self.logits = logits
+
+
+class EmbeddingBagSkillModel(nn.Module):
+    """Title → multi-hot skill logits via mean-pooled token embeddings and an MLP."""
+    def __init__(self, vocab_size, num_labels, embed_dim=128, hidden_dim=256, pad_token_id=0):
+        super().__init__()
+        self.config = {
+            "model_type": MODEL_TYPE,
+            "vocab_size": vocab_size,
+            "num_labels": num_labels,
+            "embed_dim": embed_dim,
+            "hidden_dim": hidden_dim,
+            "pad_token_id": pad_token_id,
+        }
+        self.embeddings = nn.EmbeddingBag(vocab_size, embed_dim, mode="sum", padding_idx=pad_token_id)
+        self.hidden = nn.Linear(embed_dim, hidden_dim)
+        self.classifier = nn.Linear(hidden_dim, num_labels)
+
+    def forward(self, input_ids, attention_mask=None, **kwargs):
+        if attention_mask is None:
+            attention_mask = (input_ids != self.config["pad_token_id"]).long()
+        weights = attention_mask.to(self.embeddings.weight.dtype)
+        pooled = self.embeddings(input_ids, per_sample_weights=weights)
+        pooled = pooled / weights.sum(dim=1, keepdim=True).clamp(min=1.0)
+        return SkillModelOutput(self.classifier(torch.relu(self.hidden(pooled))))
+
+    def save_pretrained(self, output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, CONFIG_NAME), 'w') as f:
+            json.dump(self.config, f, indent=4)
+        save_file({k: v.contiguous() for k, v in self.state_dict().items()},
+                  os.path.join(output_dir, WEIGHTS_NAME))
+
+    @classmethod
+    def from_pretrained(cls, model_dir):
+        with open(os.path.join(model_dir, CONFIG_NAME), 'r') as f:
+            config = json.load(f)
+        config.pop("model_type", None)
+        model = cls(**config)
+        weights_path = os.path.join(model_dir, WEIGHTS_NAME)
+        if weights.MODEL_MMAP:
+            try:
+                return weights.assign_state_dict(model, weights.load_safetensors_mmap(weights_path))
+            except Exception:
+                pass  # Fall through to a plain (private heap) load
+        model.load_state_dict(load_file(weights_path))
+        model.eval()
+        return model
@@ -10,6 +10,7 @@ Falls back to a curated static library if YOUTUBE_API_KEY is not set
 or API quota is exceeded.
 """
 
+import os # Environment configuration for the API endpoint
 import re # Regular expressions for duration and title parsing
 import json # JSON handling for API responses
 import math # Mathematical operations for ranking
@@ -18,6 +19,11 @@ import urllib.request # Standard HTTP requests
 import urllib.parse # URL encoding
 import urllib.error # HTTP error handling
 
+import metrics
+import skill_ontology
+from cache import canonical_key
+from shared_cache import TieredCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -227,6 +233,61 @@ def _get_generic_description(skill: str) -> str:
     """Generates a default help description for skills missing from the metadata."""
     return f"Resources and path to master {skill}, covering core concepts and practical implementations."
 
+# ──────────────────────────────────────────────
+# Canonical-ID lookup (shared skill ontology)
+# ──────────────────────────────────────────────
+_standalone_ontology = None
+
+
+def _ontology():
+    """The live predictor's ontology, or one over this module's own keys when used standalone."""
+    global _standalone_ontology
+    ontology = skill_ontology.default()
+    if ontology is None:
+        if _standalone_ontology is None:
+            _standalone_ontology = skill_ontology.SkillOntology(list(STATIC_FALLBACK_LIBRARY) + list(SKILL_DESCRIPTIONS))
+        ontology = _standalone_ontology
+    return ontology
+
+
+def _skill_ids(ontology, skill: str):
+    """The skill's own canonical ID, or the IDs mentioned in it when it is not a known alias."""
+    skill_id = ontology.lookup(skill)
+    return [skill_id] if skill_id else ontology.extract(skill)
+
+
+def _by_skill_id(table: dict):
+    """
+    Builds ({canonical ID: value}, ontology over the table's own keys, {key ID: value}).
+    On collisions the first key wins. Every key gets an ID in the second ontology, so
+    keys the live vocabulary lacks still resolve through one alias lookup or regex pass.
+    """
+    def build(ontology):
+        index = {}
+        for key, value in table.items():
+            for skill_id in _skill_ids(ontology, key):
+                index.setdefault(skill_id, value)
+        keys = skill_ontology.SkillOntology(list(table))
+        by_key = {}
+        for key, value in table.items():
+            by_key.setdefault(keys.lookup(key), value)
+        return index, keys, by_key
+    return build
+
+
+def _lookup(name: str, table: dict, skill: str):
+    """Resolves `skill` against `table` by canonical ID, then by the table's own keys; None if absent."""
+    ontology = _ontology()
+    index, keys, by_key = ontology.derived(name, _by_skill_id(table))
+    for skill_id in _skill_ids(ontology, skill):
+        if skill_id in index:
+            return index[skill_id]
+    # Names the live ontology does not know (e.g. LLM-suggested skills)
+    for key_id in _skill_ids(keys, skill):
+        if key_id in by_key:
+            return by_key[key_id]
+    return None
+
 # ──────────────────────────────────────────────
 # Helpers
 # ──────────────────────────────────────────────
@@ -234,7 +295,14 @@ _BEGINNER_KEYWORDS   = ["beginner", "for beginners", "basics", "getting started"
                          "introduction", "intro", "101", "start", "crash course", "zero to hero"]
 _ADVANCED_KEYWORDS   = ["advanced", "expert", "deep dive", "production", "architecture",
                          "system design", "mastery", "professional"]
-_YT_BASE             = "https://www.googleapis.com/youtube/v3"
+# Overridable so load tests can point at loadtest/fake_services.py instead of googleapis.com
+_YT_BASE             = os.environ.get("YOUTUBE_API_BASE", "https://www.googleapis.com/youtube/v3").rstrip("/")
+
+
+# Selected videos per (skill, level); shared across workers when SHARED_CACHE_URL is set
+YOUTUBE_CACHE_SIZE   = int(os.environ.get("YOUTUBE_CACHE_SIZE", "2048"))
+YOUTUBE_CACHE_TTL_S  = float(os.environ.get("YOUTUBE_CACHE_TTL_S", "86400"))
+_youtube_cache       = TieredCache("youtube_resources", maxsize=YOUTUBE_CACHE_SIZE, ttl=YOUTUBE_CACHE_TTL_S)
 
 
 def _format_views(n: int) -> str:
@@ -313,7 +381,7 @@ class ResourceBroker:
         search_url = f"{_YT_BASE}/search?{search_params}"
 
         try:
-            with urllib.request.urlopen(search_url, timeout=5) as resp:
+            with metrics.stage("youtube_search"), urllib.request.urlopen(search_url, timeout=5) as resp:
                 search_data = json.loads(resp.read().decode())
         except Exception as e:
             logger.warning("[YouTube API] search.list failed: %s", e)
@@ -336,7 +404,7 @@ class ResourceBroker:
         stats_url = f"{_YT_BASE}/videos?{stats_params}"
 
         try:
-            with urllib.request.urlopen(stats_url, timeout=5) as resp:
+            with metrics.stage("youtube_videos"), urllib.request.urlopen(stats_url, timeout=5) as resp:
                 stats_data = json.loads(resp.read().decode())
         except Exception as e:
             logger.warning("[YouTube API] videos.list failed: %s", e)
@@ -446,14 +514,9 @@ class ResourceBroker:
     # Fallback: look up static library
     def _static_fallback(self, skill: str, level: str) -> list:
         """Provides hardcoded educational links when the API is unavailable."""
-        skill_lower = skill.lower()
-        # Exact match first
-        if skill_lower in STATIC_FALLBACK_LIBRARY:
-            return STATIC_FALLBACK_LIBRARY[skill_lower]
-        # Partial match
-        for k, v in STATIC_FALLBACK_LIBRARY.items():
-            if k in skill_lower or skill_lower in k:
-                return v
+        resources = _lookup("study_plan_resources", STATIC_FALLBACK_LIBRARY, skill)
+        if resources is not None:
+            return resources
         # Generic fallback
         gfg_query = urllib.parse.quote_plus(skill)
         return [{
@@ -486,33 +549,33 @@ class ResourceBroker:
     def get_resources(self, skill: str, level: str) -> tuple:
         """Returns (resources: list, used_youtube: bool)."""
         if self.api_key:
-            logger.info("[YouTube API] Attempting fetch for skill=%r level=%r", skill, level)
-            try:
-                raw = self._fetch_youtube(skill, level)
-                if raw:
-                    selected = self._select_varied_resources(raw, skill, level)
-                    logger.info("[YouTube API] SUCCESS – got %d varied results for '%s'", len(selected), skill)
-                    return selected, True
-                else:
+            def fetch():
+                # None (failure / no results) is not cached, so the next request retries the API
+                logger.info("[YouTube API] Attempting fetch for skill=%r level=%r", skill, level)
+                try:
+                    raw = self._fetch_youtube(skill, level)
+                    if raw:
+                        selected = self._select_varied_resources(raw, skill, level)
+                        logger.info("[YouTube API] SUCCESS – got %d varied results for '%s'", len(selected), skill)
+                        return selected
                     logger.warning("[YouTube API] Returned 0 results for '%s' – using fallback", skill)
-            except Exception as e:
-                logger.warning("[YouTube API] Exception for '%s': %s", skill, e)
+                except Exception as e:
+                    logger.warning("[YouTube API] Exception for '%s': %s", skill, e)
+                return None
+            selected = _youtube_cache.get_or_compute(canonical_key("youtube", skill.lower().strip(), level), fetch)
+            if selected:
+                metrics.STUDY_PLAN_RESOURCES.labels("youtube").inc()
+                return selected, True
         else:
             logger.warning("[YouTube API] No API key set – using static fallback")
         
         resources = self._static_fallback(skill, level)[:3]
+        metrics.STUDY_PLAN_RESOURCES.labels("fallback").inc()
         return resources, False
 
     def _get_skill_desc(self, skill: str) -> str:
         """Retrieves a concise summary for a skill from the internal description database."""
-        s = skill.lower().strip()
-        if s in SKILL_DESCRIPTIONS:
-            return SKILL_DESCRIPTIONS[s]
-        # Partial match
-        for k, v in SKILL_DESCRIPTIONS.items():
-            if k in s or s in k:
-                return v
-        return _get_generic_description(skill)
+        return _lookup("study_plan_descriptions", SKILL_DESCRIPTIONS, skill) or _get_generic_description(skill)
 
     # ── Weekly plan builder ─────────────────────────
     @staticmethod
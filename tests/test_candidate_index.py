@@ -0,0 +1,77 @@
+"""Candidate search: bit-sliced ranking against a brute-force reference."""
+
+import random
+
+import pytest
+
+from candidate_index import CandidateIndex, _add_weighted
+
+
+def _value(slices, doc_id):
+    return sum(((s >> doc_id) & 1) << i for i, s in enumerate(slices))
+
+
+def test_add_weighted_even_weight_into_empty_slices():
+    slices = []
+    _add_weighted(slices, 0b101, 2)
+    assert [_value(slices, d) for d in range(3)] == [2, 0, 2]
+
+
+def test_domain_ranking_without_compulsory_matches():
+    idx = CandidateIndex(':memory:')
+    idx.add('h1', ['Docker'])
+    result = idx.search(domain_tiers={'compulsory': ['Python'], 'advanced': ['Docker']})
+    assert result["total"] == 1
+    assert [r["score"] for r in result["results"]] == [2]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_search_matches_brute_force(seed):
+    rng = random.Random(seed)
+    vocab = [f"s{i}" for i in range(12)]
+    idx = CandidateIndex(':memory:')
+    docs = {}
+    for n in range(rng.randint(1, 40)):
+        skills = rng.sample(vocab, rng.randint(0, 6))
+        docs[idx.add(f"h{n}", skills)] = set(skills)
+    tiers = {t: rng.sample(vocab, rng.randint(0, 3)) for t in ("compulsory", "advanced", "beginner")}
+    weights = {}
+    for tier, w in (("compulsory", 3), ("advanced", 2), ("beginner", 1)):
+        for s in tiers[tier]:
+            weights[s] = max(weights.get(s, 0), w)
+    at_least = (rng.sample(vocab, 4), rng.randint(0, 3))
+
+    result = idx.search(at_least=at_least, domain_tiers=tiers, limit=5)
+
+    expected = {d: sum(weights.get(s, 0) for s in skills) for d, skills in docs.items()
+                if len(skills & set(at_least[0])) >= at_least[1]}
+    assert result["total"] == len(expected)
+    ranked = sorted(expected.items(), key=lambda kv: (-kv[1], kv[0]))[:5]
+    assert [(r["id"], r["score"]) for r in result["results"]] == ranked
+
+
+def test_other_connection_sees_remove_then_add(tmp_path):
+    path = str(tmp_path / "candidates.db")
+    a, b = CandidateIndex(path), CandidateIndex(path)
+    a.add("h1", ["Python"])
+    a.add("h2", ["Docker"])
+    assert b.search(any_of=["Docker"])["total"] == 1
+
+    a.remove("h2")
+    a.add("h3", ["Rust"])  # Same row count as before; must not reuse h2's id
+    assert b.search(any_of=["Docker"])["total"] == 0
+    assert b.search(any_of=["Rust"])["total"] == 1
+    assert len(b) == 2
+
+
+def test_legacy_table_is_migrated(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "candidates.db")
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE resumes (doc_id INTEGER PRIMARY KEY, content_hash TEXT NOT NULL UNIQUE, "
+               "skills TEXT NOT NULL, updated_at REAL NOT NULL)")
+    db.execute("INSERT INTO resumes VALUES (1, 'h1', '[\"Go\"]', 0)")
+    db.commit()
+    index = CandidateIndex(path)
+    assert index.search(any_of=["Go"])["total"] == 1
+    assert "AUTOINCREMENT" in db.execute("SELECT sql FROM sqlite_master WHERE name = 'resumes'").fetchone()[0]
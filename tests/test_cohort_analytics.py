@@ -0,0 +1,48 @@
+"""Cohort analytics: every analysis counts, and rows are kept per model version."""
+
+import os
+import sqlite3
+
+import pytest
+
+from cohort_analytics import CohortAnalytics
+
+
+def _result(score, missing=("Docker",)):
+    return {"score": score, "missing_by_tier": {"advanced": list(missing)}}
+
+
+def test_shared_skill_sets_are_all_counted(tmp_path):
+    analytics = CohortAnalytics(str(tmp_path / "cohort.db"))
+    futures = [analytics.record("c1", "Dev", "skills:abc", _result(40.0), "v1") for _ in range(3)]
+    assert [f.result(5) for f in futures] == [True, False, False]
+
+    report = analytics.domain_report("c1", "Dev")
+    assert report["analyses"] == 3
+    assert report["mean_score"] == 40.0
+    assert report["top_missing_by_tier"]["advanced"] == [{"skill": "Docker", "count": 3}]
+
+
+def test_model_version_change_gets_its_own_row(tmp_path):
+    path = str(tmp_path / "cohort.db")
+    analytics = CohortAnalytics(path)
+    assert analytics.record("c1", "Dev", "skills:abc", _result(40.0), "v1").result(5)
+    assert analytics.record("c1", "Dev", "skills:abc", _result(60.0), "v2").result(5)
+
+    rows = sqlite3.connect(path).execute(
+        "SELECT model_version, score, count FROM skill_set_analyses ORDER BY model_version").fetchall()
+    assert rows == [("v1", 40.0, 1), ("v2", 60.0, 1)]
+    assert analytics.cohort_overview("c1")["domains"] == [{"domain": "Dev", "analyses": 2, "mean_score": 50.0}]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_writer_restarts_in_forked_child(tmp_path):
+    analytics = CohortAnalytics(str(tmp_path / "cohort.db"))
+    assert analytics.record("c1", "Dev", "skills:a", _result(10.0)).result(5)
+    pid = os.fork()
+    if pid == 0:
+        ok = analytics.record("c1", "Dev", "skills:b", _result(20.0)).result(5)
+        os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+    assert analytics.domain_report("c1", "Dev")["analyses"] == 2
@@ -0,0 +1,60 @@
+"""Delta re-analysis must reproduce a full /api/analyze payload exactly."""
+
+import os
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("flask")
+
+import predictor as predictor_module
+
+if not os.path.isdir(predictor_module.SKILL_MODEL_PATH):
+    pytest.skip(f"no trained model at {predictor_module.SKILL_MODEL_PATH}", allow_module_level=True)
+
+import delta_analysis
+from app import analysis_payload
+from predictor import analyze_skill_gap, current_predictor
+
+SKILL_SETS = [
+    ["Python", "SQL", "Git"],
+    ["HTML", "CSS", "JavaScript", "ReactJS", "Node.js"],
+    ["Java", "Spring Boot", "Docker", "Kubernetes"],
+    [],
+]
+
+
+def _domains():
+    return list(current_predictor().career_metadata)[:4]
+
+
+def _full(predictor, skills, domain):
+    handle = delta_analysis.handle_for(predictor, skills, domain)
+    return handle, analysis_payload(analyze_skill_gap(skills, domain, domain), handle)
+
+
+def _delta(predictor, domain, handle):
+    req = delta_analysis._requirements_for(predictor)
+    _, ids = req.decode(handle)
+    return analysis_payload(delta_analysis._analysis(req, domain, ids, req.found_counts(ids)), handle)
+
+
+@pytest.mark.parametrize("skills", SKILL_SETS)
+def test_analysis_matches_full_payload(skills):
+    predictor = current_predictor()
+    for domain in _domains():
+        handle, full = _full(predictor, skills, domain)
+        assert _delta(predictor, domain, handle) == full, domain
+
+
+@pytest.mark.parametrize("skills", SKILL_SETS)
+def test_applied_delta_matches_full_payload_of_edited_skills(skills):
+    predictor = current_predictor()
+    added, removed = ["Docker", "TypeScript"], skills[:1]
+    edited = [s for s in skills if s not in removed] + added
+    for domain in _domains():
+        handle, _ = _full(predictor, skills, domain)
+        new_handle, _, new = delta_analysis.apply_delta(predictor, handle, added, removed)
+        expected_handle, expected = _full(predictor, edited, domain)
+        assert new_handle == expected_handle, domain
+        assert analysis_payload(new, new_handle) == expected, domain
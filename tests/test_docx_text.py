@@ -0,0 +1,89 @@
+"""DOCX extraction: streaming parser over small in-memory documents."""
+
+import io
+import zipfile
+
+import pytest
+
+import docx_text
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+MC = 'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+
+
+def _part(body, root='document', prolog=''):
+    inner = f'<w:body>{body}</w:body>' if root == 'document' else body
+    return f'<?xml version="1.0" encoding="UTF-8"?>{prolog}<w:{root} {W} {MC}>{inner}</w:{root}>'
+
+
+def _p(*runs):
+    return '<w:p>' + ''.join(f'<w:r>{r}</w:r>' for r in runs) + '</w:p>'
+
+
+def _t(text):
+    return f'<w:t xml:space="preserve">{text}</w:t>'
+
+
+def _docx(document, **parts):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as z:
+        z.writestr('word/document.xml', document)
+        for name, xml in parts.items():
+            z.writestr(f'word/{name}.xml', xml)
+    buf.seek(0)
+    return buf
+
+
+def _lines(buf):
+    return list(docx_text.iter_docx_lines(buf))
+
+
+def test_paragraph_with_tab():
+    assert _lines(_docx(_part(_p(_t('Python'), '<w:tab/>', _t('SQL'))))) == ['Python\tSQL']
+
+
+def test_table_row_with_multi_paragraph_cell():
+    row = ('<w:tbl><w:tr>'
+           f'<w:tc>{_p(_t("Skills"))}</w:tc>'
+           f'<w:tc>{_p(_t("Docker"))}{_p(_t("Kubernetes"))}</w:tc>'
+           '</w:tr></w:tbl>')
+    assert _lines(_docx(_part(row))) == ['Skills\tDocker Kubernetes']
+
+
+def test_text_box_appears_once():
+    box = _p(_t('Contact'))
+    drawing = ('<w:p><w:r><mc:AlternateContent>'
+               f'<mc:Choice Requires="wps"><w:drawing><w:txbxContent>{box}</w:txbxContent></w:drawing></mc:Choice>'
+               f'<mc:Fallback><w:pict><w:txbxContent>{box}</w:txbxContent></w:pict></mc:Fallback>'
+               '</mc:AlternateContent></w:r></w:p>')
+    lines = _lines(_docx(_part(drawing + _p(_t('Experience')))))
+    assert lines.count('Contact') == 1
+    assert lines == ['Contact', 'Experience']
+
+
+def test_headers_and_footers_are_deduplicated():
+    header = _part(_p(_t('Jane Doe')), root='hdr')
+    footer = _part(_p(_t('jane@example.com')), root='ftr')
+    buf = _docx(_part(_p(_t('Summary'))), header1=header, header2=header, footer1=footer, footer2=footer)
+    assert _lines(buf) == ['Jane Doe', 'Summary', 'jane@example.com']
+
+
+def test_doctype_is_rejected():
+    prolog = '<!DOCTYPE w:document [<!ENTITY x "boom">]>'
+    with pytest.raises(ValueError):
+        _lines(_docx(_part(_p(_t('&x;')), prolog=prolog)))
+
+
+def test_part_size_cap(monkeypatch):
+    monkeypatch.setattr(docx_text, 'DOCX_MAX_PART_BYTES', 1024)
+    with pytest.raises(ValueError, match='DOCX_MAX_PART_BYTES'):
+        _lines(_docx(_part(_p(_t('x' * 4096)))))
+
+
+def test_missing_body_is_rejected():
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w') as z:
+        z.writestr('word/header1.xml', _part(_p(_t('Only a header')), root='hdr'))
+    buf.seek(0)
+    with pytest.raises(ValueError, match='not a Word document'):
+        _lines(buf)
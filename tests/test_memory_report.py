@@ -0,0 +1,33 @@
+"""Memory report: importable and usable without the POSIX-only resource module."""
+
+import builtins
+import importlib
+import sys
+
+import memory_report
+
+
+def test_imports_and_reports_without_resource(monkeypatch):
+    real_import = builtins.__import__
+
+    def no_resource(name, *args, **kwargs):
+        if name == "resource":
+            raise ImportError("No module named 'resource'")  # As on Windows
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", no_resource)
+    monkeypatch.delitem(sys.modules, "resource", raising=False)
+    module = importlib.reload(memory_report)
+    try:
+        assert module.resource is None
+
+        def no_proc(path='/proc/self/smaps'):
+            raise OSError("no /proc")
+            yield
+
+        monkeypatch.setattr(module, "_read_smaps", no_proc)
+        totals, ranges = module.process_memory()
+        assert totals["total"]["rss"] == 0 and ranges == []
+    finally:
+        monkeypatch.undo()
+        importlib.reload(memory_report)
@@ -0,0 +1,19 @@
+"""Metrics rendering while other threads create label series."""
+
+import metrics
+
+
+def test_render_snapshots_series_under_the_lock():
+    counter = metrics.Counter("test_render_lock_total", "Test series", ["n"])
+    try:
+        class Children(dict):
+            def items(self):
+                assert counter._lock.locked(), "label series iterated without the metric lock"
+                return super().items()
+
+        counter._children = Children()
+        counter.labels("a").inc()
+        counter.labels("b").inc(2)
+        assert counter.render()[2:] == ['test_render_lock_total{n="a"} 1.0', 'test_render_lock_total{n="b"} 2.0']
+    finally:
+        metrics._REGISTRY.remove(counter)
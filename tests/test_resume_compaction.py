@@ -0,0 +1,42 @@
+"""Resume compaction: section detection and the token budget."""
+
+from resume_compaction import compact_resume, estimate_tokens, split_sections
+
+
+def test_inline_labelled_lines_are_kept():
+    text = ("John Smith\nData Analyst\nSkills: Python, SQL, Tableau\nTechnologies: Docker, AWS\n"
+            "Experience\nAnalyst at Foo")
+    out = compact_resume(text)
+    assert "Skills: Python, SQL, Tableau" in out
+    assert "Technologies: Docker, AWS" in out
+    assert "Analyst at Foo" in out
+
+
+def test_inline_label_joins_its_section():
+    sections = {name: lines for name, _, lines in split_sections(
+        "Jane Doe\nExperience\nEngineer at Bar\nSkills: Go, Rust\nBuilt services")}
+    assert sections["skills"] == ["Skills: Go, Rust"]
+    assert sections["experience"] == ["Engineer at Bar", "Built services"]
+
+
+def test_bare_and_colon_headings_open_sections():
+    sections = split_sections("Jane Doe\nSKILLS:\nPython\nWork Experience\nEngineer at Bar")
+    assert [(name, heading) for name, heading, _ in sections] == [
+        ("header", None), ("skills", "SKILLS:"), ("experience", "Work Experience")]
+
+
+def test_keyword_in_a_sentence_is_body_text():
+    sections = split_sections("Jane Doe\nExperience\nTools used: Git, Jira\nSkills in mentoring")
+    assert sections[-1] == ("experience", "Experience", ["Tools used: Git, Jira", "Skills in mentoring"])
+
+
+def test_budget_is_respected():
+    text = "Name\nExperience\n" + "\n".join(f"Did thing number {i} with many words here" for i in range(500))
+    assert estimate_tokens(compact_resume(text, budget_tokens=100)) <= 100
+
+
+def test_lone_years_survive_but_page_numbers_do_not():
+    text = ("Jane Doe\nExperience\nAnalyst at Foo\n2021\n- 2023\nPage 1 of 2\n1/2\n"
+            "Engineer at Bar\n2019\n2021\n2 of 2\n- 2 -")
+    sections = split_sections(text)
+    assert sections[-1][2] == ["Analyst at Foo", "2021", "- 2023", "Engineer at Bar", "2019", "2021"]
@@ -0,0 +1,46 @@
+"""Chat session store: history sync and per-process SQLite connections."""
+
+import os
+
+import pytest
+
+from session_store import SessionStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    return SessionStore(str(tmp_path / "sessions.db") if request.param == "sqlite" else "")
+
+
+def test_history_round_trip_and_truncate(store):
+    session = store.create({'skills': ['Python', 'SQL'], 'chatbotContext': {'name': 'A'}},
+                           [{'role': 'bot', 'text': 'hi'}])
+    session.append('user', 'q')
+    session.append('assistant', 'r')
+    store.save(session)
+
+    loaded = store.get(session.id)
+    assert (loaded.skills, loaded.context) == ("Python, SQL", "Name: A")
+    assert loaded.history == [('assistant', 'hi'), ('user', 'q'), ('assistant', 'r')]
+    assert loaded.truncate(1) and loaded.history == [('assistant', 'hi')]
+    assert not loaded.truncate(5)  # The client holds messages the server never saw
+
+
+def test_unknown_and_expired_sessions(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"), ttl=-1)
+    assert store.get(store.create().id) is None
+    assert store.get("missing") is None
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_worker_opens_its_own_connection(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"))
+    session = store.create({'skills': ['Go']})  # Opens the connection in the "master"
+    pid = os.fork()
+    if pid == 0:
+        ok = store.get(session.id).skills == "Go" and store._backend._pid == os.getpid()
+        store.create()
+        os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert status == 0
+    assert store.get(session.id).skills == "Go"
@@ -0,0 +1,75 @@
+"""Two-tier cache: sharing, stampede protection and fork safety for both L2 backends."""
+
+import os
+import threading
+import time
+
+import pytest
+
+import shared_cache
+from loadtest import fake_redis
+from shared_cache import TieredCache
+
+
+@pytest.fixture(scope="module")
+def redis_url():
+    server = fake_redis.serve(0)
+    yield f"redis://127.0.0.1:{server.server_address[1]}/1"
+    server.shutdown()
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def backend(request, tmp_path, redis_url):
+    url = f"sqlite:///{tmp_path / 'cache.db'}" if request.param == "sqlite" else redis_url
+    return shared_cache.backend_from_url(url)
+
+
+def test_values_are_shared_between_processes_caches(backend):
+    TieredCache("t", backend=backend).put("k", {"skills": {"b", "a"}})
+    assert TieredCache("t", backend=backend).get("k") == {"skills": ["a", "b"]}
+
+
+def test_one_computation_across_caches(backend):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return 42
+
+    caches = [TieredCache("stampede", backend=backend) for _ in range(2)]
+    results = []
+    threads = [threading.Thread(target=lambda c=c: results.append(c.get_or_compute("k", compute)))
+               for c in caches for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [42] * 6 and len(calls) == 1
+
+
+def test_none_and_other_versions_are_misses(backend):
+    cache = TieredCache("v", backend=backend)
+    assert cache.get_or_compute("none", lambda: None) is None
+    backend.set(shared_cache.SHARED_CACHE_NAMESPACE + ":v1:v:old", bytes((99, 0)) + b"1")
+    assert cache.get("old") is None
+
+
+def test_unreachable_l2_degrades_to_l1():
+    cache = TieredCache("down", backend=shared_cache.RESPBackend("127.0.0.1", 1))
+    assert cache.get_or_compute("k", lambda: 5) == 5
+    assert cache.get("k") == 5
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_worker_reconnects(backend):
+    cache = TieredCache("fork", backend=backend)
+    cache.put("k", 1)  # Connects in the "master"
+    pid = os.fork()
+    if pid == 0:
+        fresh = TieredCache("fork", backend=backend)
+        fresh.put("child", 2)
+        os._exit(0 if fresh.get("k") == 1 else 1)
+    _, status = os.waitpid(pid, 0)
+    assert status == 0
+    assert TieredCache("fork", backend=backend).get("child") == 2
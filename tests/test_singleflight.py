@@ -0,0 +1,83 @@
+"""Single-flight coalescing and admission disconnect detection."""
+
+import threading
+import time
+
+from admission import ClientDisconnected, client_disconnected
+from singleflight import SingleFlight
+
+
+def _run_concurrently(flight, fns):
+    results, errors = [None] * len(fns), [None] * len(fns)
+
+    def run(i):
+        try:
+            results[i] = flight.do("k", fns[i])
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(fns))]
+    threads[0].start()
+    time.sleep(0.05)  # Let the first caller become the leader
+    for t in threads[1:]:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_followers_share_the_result():
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.1)
+        return 42
+
+    results, errors = _run_concurrently(SingleFlight("t"), [work] * 4)
+    assert results == [42] * 4 and errors == [None] * 4 and len(calls) == 1
+
+
+def test_followers_retry_after_a_leader_specific_error():
+    def leader():
+        time.sleep(0.1)
+        raise ClientDisconnected("groq")
+
+    results, errors = _run_concurrently(SingleFlight("t", retry_on=(ClientDisconnected,)),
+                                        [leader, lambda: 7, lambda: 7])
+    assert isinstance(errors[0], ClientDisconnected)
+    assert results[1:] == [7, 7] and errors[1:] == [None, None]
+
+
+def test_other_errors_are_shared():
+    def leader():
+        time.sleep(0.1)
+        raise ValueError("bad input")
+
+    _, errors = _run_concurrently(SingleFlight("t", retry_on=(ClientDisconnected,)), [leader, lambda: 7])
+    assert all(isinstance(e, ValueError) for e in errors)
+
+
+class _PeekRefusingSocket:
+    """Stands in for an SSLSocket, which rejects MSG_PEEK with ValueError."""
+    def fileno(self):
+        return self._r.fileno()
+
+    def __init__(self):
+        import socket
+        self._r, self._w = socket.socketpair()
+        self._w.send(b"x")
+
+    def recv(self, n, flags=0):
+        raise ValueError("non-zero flags not allowed in calls to recv() on SSLSocket")
+
+
+def test_unpeekable_socket_counts_as_connected():
+    assert client_disconnected({'gunicorn.socket': _PeekRefusingSocket()}) is False
+
+
+def test_closed_peer_counts_as_disconnected():
+    import socket
+    r, w = socket.socketpair()
+    w.close()
+    assert client_disconnected({'gunicorn.socket': r}) is True
@@ -0,0 +1,32 @@
+"""Skill ontology: '.js' spellings must not turn common English words into skills."""
+
+from skill_ontology import SkillOntology
+
+
+def _ontology():
+    return SkillOntology(["Next.js/Nuxt", "Spring Boot/Express/Django", "Java/Python/Node.js", "React", "Git"])
+
+
+def test_js_spellings_still_resolve():
+    onto = _ontology()
+    for form in ("Next.js", "nextjs", "next js", "NodeJS", "Express.js", "ReactJS", "react.js"):
+        assert onto.lookup(form), form
+    assert onto.lookup("React") == onto.lookup("react.js")
+
+
+def test_stripped_common_words_are_not_aliases():
+    onto = _ontology()
+    assert onto.lookup("next") is None
+    assert onto.lookup("node") is None
+
+
+def test_free_text_ignores_common_words():
+    onto = _ontology()
+    assert onto.extract("My next steps: I express ideas clearly and mapped each node") == []
+    found = onto.extract("Built with Next.js, Express.js and Node.js")
+    assert [onto.name(i) for i in found] == ["Next.js/Nuxt", "Spring Boot/Express/Django", "Java/Python/Node.js"]
+
+
+def test_listed_common_word_variant_resolves_by_lookup():
+    onto = _ontology()
+    assert onto.name(onto.lookup("Express")) == "Spring Boot/Express/Django"
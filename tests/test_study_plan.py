@@ -0,0 +1,40 @@
+"""Study-plan lookups: every table key resolves without a linear scan of the table."""
+
+import pytest
+
+import skill_ontology
+import study_plan
+
+
+@pytest.fixture
+def live_ontology():
+    previous = skill_ontology.default()
+    skill_ontology.set_default(skill_ontology.SkillOntology(["Python", "React"]))  # Lacks most table keys
+    yield
+    skill_ontology.set_default(previous)
+
+
+def _describe(skill):
+    return study_plan._lookup("study_plan_descriptions", study_plan.SKILL_DESCRIPTIONS, skill)
+
+
+def test_keys_missing_from_live_vocabulary_still_resolve(live_ontology):
+    assert _describe("DAX") == study_plan.SKILL_DESCRIPTIONS["dax"]
+    assert _describe("Writing DAX measures") == study_plan.SKILL_DESCRIPTIONS["dax"]
+    assert _describe("Tableau") == study_plan.SKILL_DESCRIPTIONS["power bi/tableau"]
+
+
+def test_live_ids_win_and_unknown_skills_miss(live_ontology):
+    assert _describe("ReactJS") == study_plan.SKILL_DESCRIPTIONS["react"]
+    assert _describe("Underwater basket weaving") is None
+
+
+def test_no_linear_scan_of_the_table(live_ontology, monkeypatch):
+    _describe("warm up the derived index")
+
+    class NoScan(dict):
+        def items(self):
+            raise AssertionError("table scanned on lookup")
+
+    table = study_plan.SKILL_DESCRIPTIONS
+    assert study_plan._lookup("study_plan_descriptions", NoScan(table), "Kafka streams") == table["kafka/rabbitmq"]
@@ -0,0 +1,72 @@
+"""Incremental retraining: roadmap-only knowledge edits are persisted without retraining."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+import trainer
+
+
+def _domain(**overrides):
+    return {"beginner": ["Git"], "compulsory": ["Python"], "intermediate": [], "advanced": [],
+            "next_steps": ["Build a project"], **overrides}
+
+
+def test_next_steps_change_is_reported_but_needs_no_retraining():
+    diff = trainer.diff_knowledge({"Dev": _domain()}, {"Dev": _domain(next_steps=["Contribute to OSS"])})
+    assert diff["roadmap_domains"] == ["Dev"]
+    assert not trainer.needs_retraining(diff)
+
+
+def test_tier_change_needs_retraining():
+    diff = trainer.diff_knowledge({"Dev": _domain()}, {"Dev": _domain(advanced=["Docker"])})
+    assert diff["changed_domains"] == ["Dev"] and diff["roadmap_domains"] == []
+    assert trainer.needs_retraining(diff)
+
+
+def test_incremental_persists_structured_data_without_retraining(tmp_path):
+    base = tmp_path / "model"
+    base.mkdir()
+    (base / "weights.bin").write_bytes(b"w")
+    (base / "skill_meta.json").write_text(json.dumps(
+        {"all_skills": ["Git", "Python"], "structured_data": {"Dev": _domain()}, "model_type": "bert"}))
+    knowledge = tmp_path / "knowledge.json"
+    knowledge.write_text(json.dumps({"Dev": _domain(next_steps=["Contribute to OSS"])}))
+
+    out = tmp_path / "out"
+    trainer.incremental(SimpleNamespace(base_dir=str(base), output_dir=str(out), knowledge=str(knowledge),
+                                        publish_to=None))
+
+    meta = json.loads((out / "skill_meta.json").read_text())
+    assert meta["structured_data"]["Dev"]["next_steps"] == ["Contribute to OSS"]
+    assert meta["all_skills"] == ["Git", "Python"]
+    assert (out / "weights.bin").read_bytes() == b"w"
+
+
+def test_incremental_refuses_to_write_into_base_dir(tmp_path):
+    (tmp_path / "skill_meta.json").write_text(json.dumps({"all_skills": [], "structured_data": {}}))
+    with pytest.raises(SystemExit):
+        trainer.incremental(SimpleNamespace(base_dir=str(tmp_path), output_dir=str(tmp_path),
+                                            knowledge="unused.json", publish_to=None))
+
+
+def test_incremental_publishes_new_release(tmp_path):
+    release = tmp_path / "r1"
+    release.mkdir()
+    (release / "skill_meta.json").write_text(json.dumps(
+        {"all_skills": ["Git", "Python"], "structured_data": {"Dev": _domain()}, "model_type": "bert"}))
+    served = tmp_path / "model"
+    served.symlink_to(release, target_is_directory=True)
+    knowledge = tmp_path / "knowledge.json"
+    knowledge.write_text(json.dumps({"Dev": _domain(next_steps=["Contribute to OSS"])}))
+
+    out = tmp_path / "r2"
+    trainer.incremental(SimpleNamespace(base_dir=str(served), output_dir=str(out), knowledge=str(knowledge),
+                                        publish_to=str(served)))
+    assert (served / "skill_meta.json").samefile(out / "skill_meta.json")
+    assert json.loads((release / "skill_meta.json").read_text())["structured_data"]["Dev"]["next_steps"] == [
+        "Build a project"]
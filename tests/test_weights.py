@@ -0,0 +1,42 @@
+"""Model publishing: SKILL_MODEL_PATH is switched atomically, served files are never rewritten."""
+
+import os
+
+import pytest
+
+pytest.importorskip("torch")
+
+from weights import publish_model
+
+
+def _release(root, name, payload):
+    path = root / name
+    path.mkdir()
+    (path / "skill_meta.json").write_text("{}")
+    (path / "model.safetensors").write_bytes(payload)
+    return path
+
+
+def test_publish_switches_symlink_without_touching_old_release(tmp_path):
+    old, new = _release(tmp_path, "r1", b"old"), _release(tmp_path, "r2", b"new")
+    link = tmp_path / "model"
+    publish_model(old, link)
+    publish_model(new, link)
+    assert os.path.realpath(link) == str(new)
+    assert (link / "model.safetensors").read_bytes() == b"new"
+    assert (old / "model.safetensors").read_bytes() == b"old"
+
+
+def test_plain_directory_is_moved_aside(tmp_path):
+    served = _release(tmp_path, "model", b"old")
+    new = _release(tmp_path, "r2", b"new")
+    publish_model(new, served)
+    assert os.path.islink(served) and os.path.realpath(served) == str(new)
+    legacy = [p for p in tmp_path.iterdir() if p.name.startswith("model.legacy-")]
+    assert len(legacy) == 1 and (legacy[0] / "model.safetensors").read_bytes() == b"old"
+
+
+def test_rejects_non_model_directory(tmp_path):
+    (tmp_path / "empty").mkdir()
+    with pytest.raises(ValueError):
+        publish_model(tmp_path / "empty", tmp_path / "model")
@@ -1,92 +1,489 @@
 """
-Self-contained script to train a BERT sequence classifier to map 
+Self-contained script to train a BERT sequence classifier to map
 job titles to required sets of skills based on provided knowledge.
+
+Usage:
+    python trainer.py [--epochs 20] [--batch-size 4] [--grad-accum 1] [--bf16]
+    python trainer.py --mode distill [--student embedding_bag|bert] [--output-dir final_skill_model_student]
+    python trainer.py --mode incremental [--base-dir final_skill_model] [--max-epochs 20]
+
+Incremental mode never writes into --base-dir, which may be the model being
+served (its weights are mmapped). It writes a new <base-dir>-<timestamp>
+directory and, unless --output-dir is given, publishes it by atomically
+switching the --base-dir symlink (weights.publish_model).
 """
 
 import os # OS utilities for paths and memory management
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE" # Prevent duplicate library execution errors
 
+import argparse # command-line options
 import json # training data parsing
+import random # title augmentation sampling
+import re # title augmentation
+import shutil # copying the base model for metadata-only updates
+import time # throughput reporting
 import torch # Main deep learning framework
-import torch.optim as optim # Optimization algorithms
 from torch.optim import AdamW # AdamW optimizer for BERT
-import numpy as np # Vector operations for multi-label targets
 from transformers import BertTokenizer, BertForSequenceClassification # BERT model components
 from torch.utils.data import DataLoader, Dataset # data batching and dataset utilities
+from student_model import EmbeddingBagSkillModel, MODEL_TYPE as EMBEDDING_BAG # compact student for distillation
+from weights import publish_model # atomic switch of the served model directory
+
+TIERS = ["beginner", "compulsory", "intermediate", "advanced"]
+MAX_LENGTH = 32
+
+
+def build_vocabulary(knowledge):
+    """Creates the sorted "Master List" of unique skills the AI will learn."""
+    skills = set()
+    for job in knowledge.values():
+        for tier in TIERS:
+            skills.update(job.get(tier, []))
+    return sorted(skills)
 
-# 1. Load Knowledge and sync ALL_SKILLS
-with open('skills_knowledge.json', 'r') as f:
-    knowledge = json.load(f)
 
-# This creates the "Master List" the AI will learn
-ALL_SKILLS = []
-for job in knowledge.values():
-    for tier in ["beginner", "compulsory", "intermediate", "advanced"]:
-        tier_skills = job.get(tier, [])
-        for skill in tier_skills:
-            if skill not in ALL_SKILLS:
-                ALL_SKILLS.append(skill)
-ALL_SKILLS = sorted(ALL_SKILLS)
+def build_targets(knowledge, skill_index):
+    """Multi-hot label matrix (one row per job title) built through a skill → column dict."""
+    targets = torch.zeros(len(knowledge), len(skill_index), dtype=torch.float)
+    for row, tiers in enumerate(knowledge.values()):
+        for tier in TIERS:
+            for s in tiers.get(tier, []):
+                col = skill_index.get(s)
+                if col is not None:
+                    targets[row, col] = 1
+    return targets
+
 
 class CareerDataset(Dataset):
-    """Custom Dataset for mapping job titles to multi-hot skill vectors."""
-    def __init__(self, knowledge, tokenizer):
-        self.samples = []
-        for job_title, tiers in knowledge.items():
-            target_vector = np.zeros(len(ALL_SKILLS))
-            for tier in ["beginner", "compulsory", "intermediate", "advanced"]:
-                tier_skills = tiers.get(tier, [])
-                for s in tier_skills:
-                    if s in ALL_SKILLS:
-                        target_vector[ALL_SKILLS.index(s)] = 1
-            self.samples.append((job_title, target_vector))
-        self.tokenizer = tokenizer
-
-    def __len__(self): return len(self.samples)
+    """Custom Dataset for mapping job titles to multi-hot skill vectors (tokenized once up front)."""
+    def __init__(self, knowledge, tokenizer, skill_index, titles=None, targets=None):
+        """Pass `titles` and `targets` directly (e.g. teacher soft labels) to bypass the knowledge file."""
+        self.titles = list(titles if titles is not None else knowledge.keys())
+        inputs = tokenizer(self.titles, padding='max_length', max_length=MAX_LENGTH,
+                           truncation=True, return_tensors="pt")
+        self.input_ids = inputs['input_ids']
+        self.attention_mask = inputs['attention_mask']
+        self.targets = targets if targets is not None else build_targets(knowledge, skill_index)
+
+    def __len__(self): return len(self.titles)
 
     def __getitem__(self, idx):
-        title, target = self.samples[idx]
-        inputs = self.tokenizer(title, padding='max_length', max_length=32, truncation=True, return_tensors="pt")
-        return inputs['input_ids'].squeeze(0), inputs['attention_mask'].squeeze(0), torch.tensor(target, dtype=torch.float)
+        return self.input_ids[idx], self.attention_mask[idx], self.targets[idx]
 
-# Setup
-tokenizer = BertTokenizer.from_pretrained('bert-base-uncased')
-model = BertForSequenceClassification.from_pretrained('bert-base-uncased', num_labels=len(ALL_SKILLS))
-dataset = CareerDataset(knowledge, tokenizer)
-loader = DataLoader(dataset, batch_size=4, shuffle=True)
 
-optimizer = AdamW(model.parameters(), lr=5e-5)
-model.train()
+def train(model, loader, epochs, lr=5e-5, grad_accum=1, bf16=False, log_every=5, params=None, stop_fn=None):
+    """
+    Fine-tunes `model` with BCE-with-logits loss.
 
-print(f"Training on {len(ALL_SKILLS)} unique skills across {len(knowledge)} job titles...")
+    Args:
+        grad_accum: Number of batches whose gradients are summed before each optimizer step.
+        bf16: Run forward passes under CPU bfloat16 autocast (weights and loss stay fp32).
+        params: Parameters to optimize (defaults to all model parameters).
+        stop_fn: Optional callable(epoch, model) → bool checked after every epoch for early stopping.
 
-# Training Loop
-for epoch in range(20): # 20 epochs is enough for this tiny set
-    total_loss = 0
-    for ids, mask, targets in loader:
+    Returns:
+        dict with epochs run, final average loss and overall samples/sec.
+    """
+    optimizer = AdamW(params if params is not None else model.parameters(), lr=lr)
+    loss_fn = torch.nn.BCEWithLogitsLoss()
+
+    total_samples, total_time, avg_loss, epochs_run = 0, 0.0, 0.0, 0
+    for epoch in range(epochs):
+        model.train()
+        total_loss, epoch_samples = 0.0, 0
+        start = time.perf_counter()
         optimizer.zero_grad()
-        outputs = model(ids, attention_mask=mask).logits
-        loss = torch.nn.BCEWithLogitsLoss()(outputs, targets)
-        loss.backward()
-        optimizer.step()
-        total_loss += loss.item()
-    
-    if epoch % 5 == 0:
-        print(f"Epoch {epoch} | Loss: {total_loss/len(loader):.4f}")
-
-# Save the Brain
-output_dir = 'final_skill_model'
-if not os.path.exists(output_dir): os.makedirs(output_dir)
-
-model.save_pretrained(output_dir)
-tokenizer.save_pretrained(output_dir)
-
-# Save the metadata including the full tiered structure for each domain
-# This removes dependency on skills_knowledge.json during prediction
-with open(os.path.join(output_dir, 'skill_meta.json'), 'w') as f:
-    json.dump({
-        "all_skills": ALL_SKILLS,
-        "structured_data": knowledge
-    }, f, indent=4)
-
-print("✅ Model trained and saved successfully with full structural metadata!")
+        for step, (ids, mask, targets) in enumerate(loader, start=1):
+            with torch.autocast(device_type="cpu", dtype=torch.bfloat16, enabled=bf16):
+                outputs = model(ids, attention_mask=mask).logits
+            loss = loss_fn(outputs.float(), targets)
+            (loss / grad_accum).backward()
+            if step % grad_accum == 0 or step == len(loader):
+                optimizer.step()
+                optimizer.zero_grad()
+            total_loss += loss.item()
+            epoch_samples += ids.size(0)
+        elapsed = time.perf_counter() - start
+        total_samples += epoch_samples
+        total_time += elapsed
+        avg_loss = total_loss / len(loader)
+        epochs_run = epoch + 1
+
+        if epoch % log_every == 0:
+            print(f"Epoch {epoch} | Loss: {avg_loss:.4f} | {epoch_samples / elapsed:.1f} samples/sec")
+        if stop_fn is not None and stop_fn(epoch, model):
+            print(f"Epoch {epoch} | Loss: {avg_loss:.4f} | converged, stopping early")
+            break
+
+    model.eval()
+    throughput = total_samples / total_time if total_time else 0.0
+    print(f"Trained {epochs_run} epochs | {throughput:.1f} samples/sec overall")
+    return {"epochs": epochs_run, "loss": avg_loss, "samples_per_sec": throughput}
+
+
+def save_artifacts(output_dir, model, tokenizer, all_skills, knowledge, extra_meta=None):
+    """Saves model, tokenizer and skill_meta.json (vocabulary + full tiered structure)."""
+    if not os.path.exists(output_dir): os.makedirs(output_dir)
+
+    model.save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+
+    # Save the metadata including the full tiered structure for each domain
+    # This removes dependency on skills_knowledge.json during prediction
+    with open(os.path.join(output_dir, 'skill_meta.json'), 'w') as f:
+        json.dump({
+            "all_skills": all_skills,
+            "structured_data": knowledge,
+            **(extra_meta or {})
+        }, f, indent=4)
+
+
+# ---------------------------------------------------------------------------
+# Distillation into a compact student
+# ---------------------------------------------------------------------------
+
+_SENIORITY = ["Senior", "Junior", "Lead", "Principal", "Associate", "Entry Level", "Staff"]
+_SUFFIXES = ["Intern", "Trainee", "II", "Specialist", "(Remote)"]
+_SWAPS = [("Developer", "Engineer"), ("Engineer", "Developer"), (" and ", " & "), ("Developer", "Dev")]
+
+
+def augment_titles(titles, per_title=40, seed=13):
+    """
+    Realistic variants of each canonical title (seniority, suffixes, word swaps,
+    dropped words, casing) used as the distillation transfer set.
+    """
+    rng = random.Random(seed)
+    out = []
+    for title in titles:
+        base = re.sub(r"\s*\(.*?\)", "", title).strip() or title
+        variants = {title, title.lower(), base, base.lower()}
+        for a, b in _SWAPS:
+            if a in base:
+                variants.add(base.replace(a, b))
+        words = base.split()
+        if len(words) > 1:
+            variants.update(" ".join(words[:i] + words[i + 1:]) for i in range(len(words)))
+        candidates = [f"{p} {v}" for p in _SENIORITY for v in list(variants)]
+        candidates += [f"{v} {s}" for s in _SUFFIXES for v in list(variants)]
+        rng.shuffle(candidates)
+        variants.update(candidates[:max(0, per_title - len(variants))])
+        out.extend(sorted(variants))
+    return list(dict.fromkeys(out))
+
+
+@torch.no_grad()
+def predict_probs(model, tokenizer, titles, batch_size=64):
+    """Sigmoid outputs for a list of titles."""
+    model.eval()
+    chunks = []
+    for i in range(0, len(titles), batch_size):
+        inputs = tokenizer(titles[i:i + batch_size], padding=True, truncation=True,
+                           max_length=MAX_LENGTH, return_tensors="pt")
+        chunks.append(torch.sigmoid(model(inputs['input_ids'], attention_mask=inputs['attention_mask']).logits))
+    return torch.cat(chunks)
+
+
+def agreement_report(teacher_probs, student_probs, threshold=0.5):
+    """How closely the student's thresholded labels reproduce the teacher's."""
+    t, s = teacher_probs > threshold, student_probs > threshold
+    inter = (t & s).sum(dim=1).float()
+    union = (t | s).sum(dim=1).float()
+    jaccard = torch.where(union > 0, inter / union.clamp(min=1), torch.ones_like(union))
+    return {
+        "label_agreement": round((t == s).float().mean().item(), 4),
+        "exact_match": round((t == s).all(dim=1).float().mean().item(), 4),
+        "mean_jaccard": round(jaccard.mean().item(), 4),
+        "mean_abs_prob_diff": round((teacher_probs - student_probs).abs().mean().item(), 4),
+    }
+
+
+def _latency_ms(model, tokenizer, titles, repeats=20):
+    inputs = tokenizer(titles, padding=True, truncation=True, max_length=MAX_LENGTH, return_tensors="pt")
+    with torch.no_grad():
+        model(inputs['input_ids'], attention_mask=inputs['attention_mask'])
+        start = time.perf_counter()
+        for _ in range(repeats):
+            model(inputs['input_ids'], attention_mask=inputs['attention_mask'])
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def build_student(kind, teacher, tokenizer, num_labels, layers=2):
+    """Either an EmbeddingBag MLP or a few-layer BERT initialised from the teacher's lower layers."""
+    if kind == EMBEDDING_BAG:
+        return EmbeddingBagSkillModel(tokenizer.vocab_size, num_labels, pad_token_id=tokenizer.pad_token_id)
+    config = teacher.config.__class__.from_dict(teacher.config.to_dict())
+    config.num_hidden_layers = layers
+    student = BertForSequenceClassification(config)
+    keep = {k: v for k, v in teacher.state_dict().items()
+            if not k.startswith("bert.encoder.layer.") or int(k.split(".")[3]) < layers}
+    student.load_state_dict(keep, strict=False)
+    return student
+
+
+def distill(args):
+    """Trains a compact student on the teacher's sigmoid outputs over augmented titles."""
+    with open(os.path.join(args.teacher_dir, 'skill_meta.json'), 'r') as f:
+        meta = json.load(f)
+    all_skills, knowledge = meta['all_skills'], meta.get('structured_data', {})
+
+    tokenizer = BertTokenizer.from_pretrained(args.teacher_dir, local_files_only=True)
+    teacher = BertForSequenceClassification.from_pretrained(args.teacher_dir, local_files_only=True)
+    teacher.eval()
+
+    canonical = list(knowledge.keys())
+    variants = [t for t in augment_titles(canonical) if t not in knowledge]
+    held_out = variants[::10]
+    train_titles = canonical + [t for i, t in enumerate(variants) if i % 10]
+
+    print(f"Labelling {len(train_titles)} titles with the teacher...")
+    soft_targets = predict_probs(teacher, tokenizer, train_titles)
+
+    student = build_student(args.student, teacher, tokenizer, len(all_skills), layers=args.student_layers)
+    dataset = CareerDataset(knowledge, tokenizer, None, titles=train_titles, targets=soft_targets)
+    loader = DataLoader(dataset, batch_size=args.batch_size, shuffle=True)
+    lr = args.lr if args.lr is not None else (1e-3 if args.student == EMBEDDING_BAG else 5e-5)
+    print(f"Distilling into a {args.student} student ({sum(p.numel() for p in student.parameters()):,} params)...")
+    train(student, loader, args.epochs, lr=lr, grad_accum=args.grad_accum, bf16=args.bf16)
+
+    report = {
+        "canonical": agreement_report(predict_probs(teacher, tokenizer, canonical),
+                                      predict_probs(student, tokenizer, canonical)),
+        "held_out_variants": agreement_report(predict_probs(teacher, tokenizer, held_out),
+                                              predict_probs(student, tokenizer, held_out)),
+        "teacher_params": sum(p.numel() for p in teacher.parameters()),
+        "student_params": sum(p.numel() for p in student.parameters()),
+        "teacher_batch_latency_ms": round(_latency_ms(teacher, tokenizer, canonical), 2),
+        "student_batch_latency_ms": round(_latency_ms(student, tokenizer, canonical), 2),
+    }
+    print(json.dumps(report, indent=2))
+
+    model_type = EMBEDDING_BAG if args.student == EMBEDDING_BAG else "bert"
+    save_artifacts(args.output_dir, student, tokenizer, all_skills, knowledge,
+                   extra_meta={"model_type": model_type, "distilled_from": args.teacher_dir,
+                               "distillation_report": report})
+    print(f"✅ Student saved to {args.output_dir}. Serve it with SKILL_MODEL_PATH={args.output_dir}")
+
+
+# ---------------------------------------------------------------------------
+# Incremental warm-start retraining
+# ---------------------------------------------------------------------------
+
+def diff_knowledge(old, new):
+    """What changed between the structured_data a model was trained on and the current knowledge."""
+    old_skills, new_skills = set(build_vocabulary(old)), set(build_vocabulary(new))
+    changed = [d for d in new if d in old
+               and any(sorted(old[d].get(t, [])) != sorted(new[d].get(t, [])) for t in TIERS)]
+    # next_steps and any other non-tier field are served from skill_meta.json but never trained on
+    roadmap = [d for d in new if d in old and d not in changed
+               and {k: v for k, v in old[d].items() if k not in TIERS} != {k: v for k, v in new[d].items() if k not in TIERS}]
+    return {
+        "added_domains": [d for d in new if d not in old],
+        "removed_domains": [d for d in old if d not in new],
+        "changed_domains": changed,
+        "roadmap_domains": roadmap,
+        "added_skills": sorted(new_skills - old_skills),
+        "removed_skills": sorted(old_skills - new_skills),
+    }
+
+
+def needs_retraining(diff):
+    """True if the diff touches any training label (roadmap-only edits just need new metadata)."""
+    return any(v for k, v in diff.items() if k != "roadmap_domains")
+
+
+def update_structured_data(base_dir, output_dir, meta, knowledge, diff):
+    """Copies the base model to `output_dir` and writes the new knowledge into its skill_meta.json."""
+    shutil.copytree(base_dir, output_dir, dirs_exist_ok=True)
+    with open(os.path.join(output_dir, 'skill_meta.json'), 'w') as f:
+        json.dump({**meta, "structured_data": knowledge, "incremental_update": {**diff, "epochs": 0}}, f, indent=4)
+
+
+def expand_vocabulary(old_skills, diff):
+    """Keeps existing label columns in place and appends new skills at the end."""
+    removed = set(diff["removed_skills"])
+    return [s for s in old_skills if s not in removed] + diff["added_skills"]
+
+
+def resize_classifier(model, old_skills, new_skills):
+    """
+    Rebuilds the classification head for `new_skills`, copying the trained row for
+    every skill that already existed. New rows start near zero with a negative bias
+    so untouched titles keep predicting "not required" for them.
+    """
+    old_head = model.classifier
+    old_index = {s: i for i, s in enumerate(old_skills)}
+    head = torch.nn.Linear(old_head.in_features, len(new_skills))
+    with torch.no_grad():
+        head.weight.normal_(0.0, model.config.initializer_range)
+        head.bias.fill_(old_head.bias.min().item())
+        for new_i, skill in enumerate(new_skills):
+            old_i = old_index.get(skill)
+            if old_i is not None:
+                head.weight[new_i] = old_head.weight[old_i]
+                head.bias[new_i] = old_head.bias[old_i]
+    model.classifier = head
+    model.num_labels = len(new_skills)
+    model.config.num_labels = len(new_skills)
+    model.config.id2label = {i: s for i, s in enumerate(new_skills)}
+    model.config.label2id = {s: i for i, s in enumerate(new_skills)}
+    return model
+
+
+def changed_label_mask(old_knowledge, new_knowledge, new_skills, diff):
+    """Boolean (titles × skills) mask of the label cells the update actually changes."""
+    skill_index = {s: i for i, s in enumerate(new_skills)}
+    new_targets = build_targets(new_knowledge, skill_index)
+    retained_old = {d: old_knowledge[d] for d in new_knowledge if d in old_knowledge}
+    old_targets = torch.zeros_like(new_targets)
+    rows = {d: i for i, d in enumerate(new_knowledge)}
+    if retained_old:
+        old_targets[[rows[d] for d in retained_old]] = build_targets(retained_old, skill_index)
+    mask = new_targets != old_targets
+    for d in diff["added_domains"]:
+        mask[rows[d]] = True # Brand new titles: every label is new to the model
+    for s in diff["added_skills"]:
+        mask[:, skill_index[s]] = True # New columns must learn their 0s as well as their 1s
+    return mask
+
+
+def incremental(args):
+    """Warm-starts from the current model and fine-tunes only until the changed labels converge."""
+    with open(os.path.join(args.base_dir, 'skill_meta.json'), 'r') as f:
+        meta = json.load(f)
+    if meta.get('model_type', 'bert') != 'bert':
+        raise SystemExit("Incremental mode needs the BERT teacher; re-run --mode distill afterwards for a student.")
+    if os.path.realpath(args.output_dir) == os.path.realpath(args.base_dir):
+        raise SystemExit("--output-dir must be a new directory: the base model may be live (its weights are mmapped).")
+    with open(args.knowledge, 'r') as f:
+        knowledge = json.load(f)
+
+    old_skills, old_knowledge = meta['all_skills'], meta.get('structured_data', {})
+    diff = diff_knowledge(old_knowledge, knowledge)
+    if knowledge == old_knowledge:
+        print("No knowledge changes.")
+        return
+    print(json.dumps({k: v for k, v in diff.items() if v}, indent=2))
+    if not needs_retraining(diff):
+        update_structured_data(args.base_dir, args.output_dir, meta, knowledge, diff)
+        print(f"✅ structured_data updated in {args.output_dir} (no retraining needed)")
+        publish(args)
+        return
+
+    new_skills = expand_vocabulary(old_skills, diff)
+    skill_index = {s: i for i, s in enumerate(new_skills)}
+    tokenizer = BertTokenizer.from_pretrained(args.base_dir, local_files_only=True)
+    model = BertForSequenceClassification.from_pretrained(args.base_dir, local_files_only=True)
+    resize_classifier(model, old_skills, new_skills)
+
+    dataset = CareerDataset(knowledge, tokenizer, skill_index)
+    loader = DataLoader(dataset, batch_size=args.batch_size, shuffle=True)
+    changed = changed_label_mask(old_knowledge, knowledge, new_skills, diff)
+    print(f"{int(changed.sum())} changed label cells across {int(changed.any(dim=1).sum())} titles")
+
+    targets = dataset.targets.bool()
+
+    def probabilities(m):
+        with torch.no_grad():
+            m.eval()
+            return torch.sigmoid(m(dataset.input_ids, attention_mask=dataset.attention_mask).logits)
+
+    # Cells the base model already gets right; cells it got wrong cannot regress and must not block stopping
+    keep = ((probabilities(model) > 0.5) == targets) & ~changed
+
+    def converged(epoch, m):
+        # Changed cells must be confidently right and no previously-correct cell may regress
+        probs = probabilities(m)
+        confident = torch.where(targets, probs > 0.5 + args.margin, probs < 0.5 - args.margin)
+        correct = (probs > 0.5) == targets
+        return bool(confident[changed].all()) and bool(correct[keep].all())
+
+    params = model.classifier.parameters() if args.freeze_encoder else None
+    stats = train(model, loader, args.max_epochs, lr=args.lr or 5e-5, grad_accum=args.grad_accum,
+                  bf16=args.bf16, log_every=1, params=params, stop_fn=converged)
+
+    save_artifacts(args.output_dir, model, tokenizer, new_skills, knowledge,
+                   extra_meta={"model_type": "bert", "incremental_update": {**diff, "epochs": stats["epochs"]}})
+    print(f"✅ Incremental update saved to {args.output_dir} after {stats['epochs']} epochs")
+    publish(args)
+
+
+def publish(args):
+    """Switches the served model to the finished output directory (default output only)."""
+    if args.publish_to:
+        publish_model(args.output_dir, args.publish_to)
+        print(f"✅ {args.publish_to} now points to {args.output_dir}; the hot-reload watcher picks it up")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the job-title → skills classifier.")
+    parser.add_argument('--mode', choices=['train', 'distill', 'incremental'], default='train')
+    parser.add_argument('--knowledge', default='skills_knowledge.json')
+    parser.add_argument('--output-dir', default=None,
+                        help="Defaults to final_skill_model (train), final_skill_model_student (distill) "
+                             "or a new published <base-dir>-<timestamp> (incremental)")
+    parser.add_argument('--epochs', type=int, default=None,
+                        help="Defaults to 20 (train) or 60 (distill)")
+    parser.add_argument('--batch-size', type=int, default=None, help="Defaults to 4 (train) or 32 (distill)")
+    parser.add_argument('--grad-accum', type=int, default=1, help="Batches per optimizer step")
+    parser.add_argument('--lr', type=float, default=None, help="Defaults to 5e-5 (1e-3 for the embedding_bag student)")
+    parser.add_argument('--bf16', action='store_true', help="CPU bfloat16 autocast for forward passes")
+    # Distillation
+    parser.add_argument('--teacher-dir', default='final_skill_model')
+    parser.add_argument('--student', choices=[EMBEDDING_BAG, 'bert'], default=EMBEDDING_BAG)
+    parser.add_argument('--student-layers', type=int, default=2, help="Encoder layers for the bert student")
+    # Incremental warm start
+    parser.add_argument('--base-dir', default='final_skill_model', help="Model to warm-start from")
+    parser.add_argument('--max-epochs', type=int, default=20, help="Upper bound before convergence")
+    parser.add_argument('--margin', type=float, default=0.2, help="Confidence margin around 0.5 for changed labels")
+    parser.add_argument('--freeze-encoder', action='store_true', help="Only train the classification head")
+    args = parser.parse_args()
+
+    distilling = args.mode == 'distill'
+    args.publish_to = None
+    if args.output_dir is None:
+        if distilling:
+            args.output_dir = 'final_skill_model_student'
+        elif args.mode == 'incremental':
+            # A fresh release next to the base; the base path (a symlink) is switched to it when done
+            args.output_dir = f"{os.path.normpath(args.base_dir)}-{time.strftime('%Y%m%d-%H%M%S')}"
+            args.publish_to = args.base_dir
+        else:
+            args.output_dir = 'final_skill_model'
+    if args.epochs is None:
+        args.epochs = 60 if distilling else 20 # 20 epochs is enough for this tiny set
+    if args.batch_size is None:
+        args.batch_size = 32 if distilling else 4
+    return args
+
+
+def main():
+    args = parse_args()
+    if args.mode == 'distill':
+        distill(args)
+        return
+    if args.mode == 'incremental':
+        incremental(args)
+        return
+
+    # 1. Load Knowledge and sync ALL_SKILLS
+    with open(args.knowledge, 'r') as f:
+        knowledge = json.load(f)
+    all_skills = build_vocabulary(knowledge)
+    skill_index = {s: i for i, s in enumerate(all_skills)}
+
+    # Setup
+    tokenizer = BertTokenizer.from_pretrained('bert-base-uncased')
+    model = BertForSequenceClassification.from_pretrained('bert-base-uncased', num_labels=len(all_skills))
+    dataset = CareerDataset(knowledge, tokenizer, skill_index)
+    loader = DataLoader(dataset, batch_size=args.batch_size, shuffle=True)
+
+    print(f"Training on {len(all_skills)} unique skills across {len(knowledge)} job titles...")
+    train(model, loader, args.epochs, lr=args.lr or 5e-5, grad_accum=args.grad_accum, bf16=args.bf16)
+
+    # Save the Brain
+    save_artifacts(args.output_dir, model, tokenizer, all_skills, knowledge)
+    print("✅ Model trained and saved successfully with full structural metadata!")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+Read-only, memory-mapped loading of safetensors weights.
+
+`from_pretrained` copies every tensor into the worker's private heap, so N
+workers hold N copies of the same read-only weights. Here each tensor is a
+view into a private (copy-on-write) mmap of the .safetensors file instead:
+pages come from the OS page cache and are shared by every process that maps
+the file, including workers that load after a hot reload. Inference never
+writes to weights, so the pages stay shared.
+
+Falls back to the regular loaders when the artifacts are not safetensors or
+the installed torch cannot map files.
+
+A mapped file must never be rewritten in place: a truncate-and-rewrite under
+a live mapping gives the workers SIGBUS or a mix of old and new weights.
+Publish each model as a new directory and switch SKILL_MODEL_PATH (a
+symlink) to it with publish_model(), or `python weights.py --publish DIR`.
+The predictor resolves the link when it loads, so a hot reload maps the new
+release and live workers keep the untouched old one.
+"""
+
+import argparse # Publish CLI
+import json # safetensors header
+import logging # Fallback diagnostics
+import os # Environment configuration and paths
+import struct # safetensors header length
+import time # Names for moved-aside directories
+import torch # Storages, tensors and modules
+
+logger = logging.getLogger(__name__)
+
+MODEL_MMAP = os.environ.get('MODEL_MMAP', '1').strip().lower() not in ('0', 'false', 'no', '')
+
+_DTYPES = {
+    "F64": torch.float64, "F32": torch.float32, "F16": torch.float16, "BF16": torch.bfloat16,
+    "I64": torch.int64, "I32": torch.int32, "I16": torch.int16, "I8": torch.int8,
+    "U8": torch.uint8, "BOOL": torch.bool,
+}
+
+
+def load_safetensors_mmap(path):
+    """
+    Returns {name: tensor} where every tensor aliases a read-only page-cache mapping
+    of `path`. Tensors whose offset is not aligned to their dtype are copied.
+    """
+    with open(path, 'rb') as f:
+        (header_len,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(header_len))
+    header.pop("__metadata__", None)
+    data_start = 8 + header_len
+
+    size = os.path.getsize(path)
+    # shared=False → MAP_PRIVATE: clean pages are the page cache's; a stray write only copies that page
+    storage = torch.UntypedStorage.from_file(path, shared=False, nbytes=size)
+    raw = torch.empty(0, dtype=torch.uint8).set_(storage)
+
+    tensors = {}
+    for name, info in header.items():
+        dtype = _DTYPES[info["dtype"]]
+        begin, end = info["data_offsets"]
+        chunk = raw[data_start + begin:data_start + end]
+        itemsize = torch.empty(0, dtype=dtype).element_size()
+        if (data_start + begin) % itemsize:
+            chunk = chunk.clone()  # Unaligned: a private copy is the only way to reinterpret it
+        tensors[name] = chunk.view(dtype).view(info["shape"])
+    return tensors
+
+
+def assign_state_dict(model, state_dict):
+    """
+    Replaces the model's parameters with the given tensors (no copy). Raises
+    ValueError if a parameter is missing so callers can fall back.
+    """
+    missing, unexpected = model.load_state_dict(state_dict, strict=False, assign=True)
+    params = {name for name, _ in model.named_parameters()}
+    missing_params = [k for k in missing if k in params]
+    if missing_params:
+        raise ValueError(f"weights file lacks {len(missing_params)} parameters, e.g. {missing_params[0]}")
+    if unexpected:
+        logger.info("[WEIGHTS] Ignoring %d unexpected tensors, e.g. %s", len(unexpected), unexpected[0])
+    model.eval()
+    return model
+
+
+def load_bert_classifier(model_dir):
+    """BertForSequenceClassification over mmapped weights, or from_pretrained as the fallback."""
+    from transformers import BertConfig, BertForSequenceClassification
+    weights_path = os.path.join(model_dir, 'model.safetensors')
+    if MODEL_MMAP and os.path.exists(weights_path):
+        try:
+            config = BertConfig.from_pretrained(model_dir, local_files_only=True)
+            with torch.no_grad():
+                # The randomly initialised parameters are dropped as soon as they are reassigned
+                model = BertForSequenceClassification(config)
+            return assign_state_dict(model, load_safetensors_mmap(weights_path))
+        except Exception as e:
+            logger.warning("[WEIGHTS] mmap load of %s failed (%s); falling back to from_pretrained", model_dir, e)
+    return BertForSequenceClassification.from_pretrained(model_dir, local_files_only=True)
+
+
+def mapped_files(model_dir):
+    """Absolute paths of the weight files a model in `model_dir` maps."""
+    return [os.path.join(model_dir, n) for n in sorted(os.listdir(model_dir)) if n.endswith('.safetensors')]
+
+
+def publish_model(release_dir, model_path):
+    """
+    Points `model_path` at `release_dir` by atomically replacing a symlink. A plain
+    directory at `model_path` (the pre-symlink layout) is first renamed aside to
+    `<model_path>.legacy-<time>`; workers that already mapped its files are unaffected.
+    Never write into a published release afterwards.
+    """
+    release_dir = os.path.abspath(release_dir)
+    model_path = os.path.abspath(model_path)
+    if not os.path.isfile(os.path.join(release_dir, 'skill_meta.json')):
+        raise ValueError(f"{release_dir} has no skill_meta.json; not a model directory")
+    if os.path.realpath(model_path) == os.path.realpath(release_dir):
+        return model_path
+    if os.path.isdir(model_path) and not os.path.islink(model_path):
+        legacy = f"{model_path}.legacy-{time.strftime('%Y%m%d-%H%M%S')}"
+        os.rename(model_path, legacy)
+        logger.info("[WEIGHTS] Moved %s aside to %s", model_path, legacy)
+    link = f"{model_path}.publishing"
+    if os.path.lexists(link):
+        os.remove(link)
+    os.symlink(release_dir, link, target_is_directory=True)
+    os.replace(link, model_path)
+    logger.info("[WEIGHTS] %s → %s", model_path, release_dir)
+    return model_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Atomically publish a model directory for serving.")
+    parser.add_argument('--publish', required=True, metavar='DIR', help="New model directory (never written again)")
+    parser.add_argument('--model-path', default=os.environ.get('SKILL_MODEL_PATH', 'final_skill_model'),
+                        help="Symlink the app serves from (SKILL_MODEL_PATH)")
+    args = parser.parse_args()
+    publish_model(args.publish, args.model_path)
+    print(f"✅ {args.model_path} → {os.path.abspath(args.publish)}")
+
+
+if __name__ == "__main__":
+    main()